@@ -2,22 +2,38 @@ __all__ = []
 
 from .atom import *
 from .bond import *
+from .cache import *
+from .electrostatics import *
+from .graph import *
 from .job import *
 from .molecule import *
+from .neighbours import *
 from .periodic_table import *
+from .rdf import *
 from .results import *
+from .rmsd import *
 from .sc import *
 from .settings import *
 from .thermo import *
+from .trajectory import *
 from .utils import *
+from .xyz import *
 
 __all__ += atom.__all__
 __all__ += bond.__all__
+__all__ += cache.__all__
+__all__ += electrostatics.__all__
+__all__ += graph.__all__
 __all__ += job.__all__
 __all__ += molecule.__all__
+__all__ += neighbours.__all__
 __all__ += periodic_table.__all__
+__all__ += rdf.__all__
 __all__ += results.__all__
+__all__ += rmsd.__all__
 __all__ += sc.__all__
 __all__ += settings.__all__
 __all__ += thermo.__all__
-__all__ += utils.__all__
\ No newline at end of file
+__all__ += trajectory.__all__
+__all__ += utils.__all__
+__all__ += xyz.__all__
\ No newline at end of file
@@ -2,57 +2,234 @@ from .periodic_table import PeriodicTable as PT
 import math
 import numpy as np
 
-__all__ = ['Atom']
+__all__ = ['Atom', 'AtomTable']
+
+
+class AtomTable:
+    """Struct-of-arrays storage for the atoms of a system, with one row per atom.
+    |Atom| instances are lightweight views onto a row of a table, so that
+    large systems store their data in a handful of contiguous arrays rather
+    than in hundreds of thousands of Python objects.
+
+    Columns:
+
+    * ``atnum`` -- atomic numbers
+    * ``coords`` -- (N, 3) array of x,y,z coordinates in angstroms
+    * ``mol`` -- fragment number of each atom, -1 if not yet assigned
+    * ``index`` -- index of each atom in the system, starting from 1. -1 if not assigned
+
+    ``version`` is incremented whenever coordinates are changed through an
+    |Atom| or |Molecule|, so that results derived from the coordinates can
+    tell when they are out of date.
+    ``released`` is incremented whenever atoms are bound to the table, or
+    moved from it to another, so that a |Molecule| can tell cheaply when its
+    atoms may no longer be the rows of its table.
+
+    >>> table = AtomTable([1, 8, 1], [[0.76, 0.59, 0], [0, 0, 0], [-0.76, 0.59, 0]])
+    >>> atoms = table.atoms()
+    """
+
+    def __init__(self, atnums, coords, mol=None, index=None):
+        self.atnum = np.array(atnums, dtype=np.int16).reshape(-1)
+        num_atoms = len(self.atnum)
+        self.coords = np.array(coords, dtype=float).reshape(num_atoms, 3)
+        if mol is None:
+            self.mol = np.full(num_atoms, -1, dtype=np.int32)
+        else:
+            self.mol = np.array(mol, dtype=np.int32).reshape(num_atoms)
+        if index is None:
+            self.index = np.full(num_atoms, -1, dtype=np.int32)
+        else:
+            self.index = np.array(index, dtype=np.int32).reshape(num_atoms)
+        self.version = 0
+        self.released = 0
+
+    def __len__(self):
+        return len(self.atnum)
+
+    def __repr__(self):
+        return f'AtomTable of {len(self)} atoms'
+
+    @classmethod
+    def from_atoms(cls, atoms):
+        """Returns a new table holding a copy of the data of each atom passed in"""
+        rows = [(atom._table, atom._row) for atom in atoms]
+        return cls(
+            [table.atnum[row] for table, row in rows],
+            [table.coords[row] for table, row in rows],
+            mol=[table.mol[row] for table, row in rows],
+            index=[table.index[row] for table, row in rows],
+        )
+
+    def atoms(self):
+        """Returns a list of |Atom| instances, one view for each row"""
+        return [Atom._view(self, row) for row in range(len(self))]
+
+    def bind(self, atoms):
+        """Points each atom passed in at the matching row of this table"""
+        previous = set()
+        for row, atom in enumerate(atoms):
+            if atom._table is not self:
+                previous.add(atom._table)
+            atom._table = self
+            atom._row = row
+        for table in previous:
+            table.released += 1
+        self.released += 1
+
 
 class Atom:
     """A class representing a atom in 3 dimensional euclidean space.
     An instance has the following attributes:
 
     * ``atnum`` -- atomic symbol, equal to zero for a dummy atom
-    * ``coords`` -- tuple of x,y,z coordinates
+    * ``coords`` -- array of x,y,z coordinates. When the atom is part of a |Molecule|, this is a read-only view onto one row of the molecule's coordinate array, so changes made to the molecule are seen by the atom. Move the atom by assigning to ``coords``, or with ``translate`` or ``move_to``, so that the molecule knows its fragments are out of date
     * ``bonds`` -- list of bonds that this atom is a part of
-    * ``mol`` -- molecule this atom is a part of. Assigned programmatically when a molecule is separated using the *mol.separate* method, or can be assigned manually if building up a molecule from scratch
+    * ``mol`` -- number of the molecule (fragment) this atom is a part of. Assigned programmatically when a molecule is separated using the *mol.separate* method, or can be assigned manually if building up a molecule from scratch
 
     Access these properties directly:
     * ``x``, ``y``, ``z`` -- for atom coordinates
     * ``symbol`` -- read or write the atom symbol directly
 
+    Atomic number, coordinates, molecule and index are stored in a row of an
+    |AtomTable|, shared with the other atoms of a |Molecule|. An atom created
+    on its own is given a table of one row.
+
     >>> a = Atom('H', coords = (1,2,3))
 
     """
+    __slots__ = ('_table', '_row', '_bonds', '_connected_atoms', '_h_bonded_to',
+                 'fragment', 'number')
+
     def __init__(self, symbol = None, atnum = 0, coords = None, mol = None, bonds = None):
         if symbol is not None:
-            self.symbol = symbol
-            self.atnum = PT.get_atnum(self)
-        else:
-            self.atnum = atnum
-            self.symbol = PT.get_symbol(self)
-
-        self.mass = PT.get_mass(self)
-        self.mol = mol
-        self.bonds = bonds or []
-        self.connected_atoms = []
-        self.h_bonded_to = []
-        self.fragment = None
+            atnum = PT.symbol_to_atnum.get(symbol.capitalize())
+            if atnum is None:
+                raise ValueError(f'Atom: Unknown element {symbol}')
 
         if coords is None:
-            self.coords = [0, 0, 0]
-        elif len(coords) == 3:
-            self.coords = [float(i) for i in coords]
-        else:
+            coords = (0, 0, 0)
+        elif len(coords) != 3:
+            raise TypeError('Atom: Invalid coordinates given')
+
+        self._table = AtomTable([atnum], [[float(i) for i in coords]],
+                                mol=[-1 if mol is None else mol])
+        self._row = 0
+        self._bonds = bonds or None
+        self._connected_atoms = None
+        self._h_bonded_to = None
+        self.fragment = None
+
+    @classmethod
+    def _view(cls, table, row):
+        """Returns an atom backed by an existing row of an |AtomTable|"""
+        atom = cls.__new__(cls)
+        atom._table = table
+        atom._row = row
+        atom._bonds = None
+        atom._connected_atoms = None
+        atom._h_bonded_to = None
+        atom.fragment = None
+        return atom
+
+    @property
+    def atnum(self):
+        return self._table.atnum.item(self._row)
+
+    @atnum.setter
+    def atnum(self, value):
+        self._table.atnum[self._row] = value
+
+    @property
+    def symbol(self):
+        return PT.get_symbol(self)
+
+    @symbol.setter
+    def symbol(self, value):
+        atnum = PT.symbol_to_atnum.get(value.capitalize())
+        if atnum is None:
+            raise ValueError(f'Atom: Unknown element {value}')
+        self.atnum = atnum
+
+    @property
+    def mass(self):
+        return PT.get_mass(self)
+
+    @property
+    def mol(self):
+        mol = self._table.mol.item(self._row)
+        return None if mol < 0 else mol
+
+    @mol.setter
+    def mol(self, value):
+        self._table.mol[self._row] = -1 if value is None else value
+
+    @property
+    def index(self):
+        index = self._table.index.item(self._row)
+        if index < 0:
+            raise AttributeError("'Atom' object has no attribute 'index'")
+        return index
+
+    @index.setter
+    def index(self, value):
+        self._table.index[self._row] = value
+
+    # lists are only created when first used, as most atoms never need them
+    @property
+    def bonds(self):
+        if self._bonds is None:
+            self._bonds = []
+        return self._bonds
+
+    @bonds.setter
+    def bonds(self, value):
+        self._bonds = value
+
+    @property
+    def connected_atoms(self):
+        if self._connected_atoms is None:
+            self._connected_atoms = []
+        return self._connected_atoms
+
+    @connected_atoms.setter
+    def connected_atoms(self, value):
+        self._connected_atoms = value
+
+    @property
+    def h_bonded_to(self):
+        if self._h_bonded_to is None:
+            self._h_bonded_to = []
+        return self._h_bonded_to
+
+    @h_bonded_to.setter
+    def h_bonded_to(self, value):
+        self._h_bonded_to = value
+
+    @property
+    def coords(self):
+        view = self._table.coords[self._row]
+        view.flags.writeable = False
+        return view
+
+    @coords.setter
+    def coords(self, values):
+        if len(values) != 3:
             raise TypeError('Atom: Invalid coordinates given')
+        self._table.coords[self._row] = values
+        self._table.version += 1
 
     @property
     def x(self):
-        return self.coords[0]
+        return self._table.coords.item(self._row, 0)
 
     @property
     def y(self):
-        return self.coords[1]
+        return self._table.coords.item(self._row, 1)
 
     @property
     def z(self):
-        return self.coords[2]
+        return self._table.coords.item(self._row, 2)
 
     def __repr__(self):
         """Unambiguous representation of an |Atom| instance"""
@@ -80,17 +257,23 @@ class Atom:
 
     def translate(self, vector):
         """Move atom in space by passing a vector in angstroms"""
-        self.coords = [i + j for i, j in zip(self, vector)]
+        self._table.coords[self._row] += vector
+        self._table.version += 1
 
     def move_to(self, vector):
         """Move atom in space to the values, in angstroms, given in this vector. The vector passed represents a point in euclidean space"""
-        self.coords = [i for i in vector]
+        self.coords = vector
 
     def distance_to(self, vector):
         """Measure the distance between the atom and a point in space, given as a vector in angstroms"""
         # pythagoras in 3D
+        # plain floats are much quicker than numpy scalars for three values
+        if isinstance(vector, Atom):
+            vector = vector.coords
+        if isinstance(vector, np.ndarray):
+            vector = vector.tolist()
         dist = 0.0
-        for i,j in zip(self, vector):
+        for i, j in zip(self._table.coords[self._row].tolist(), vector):
             dist += (i - j)**2
         return dist ** 0.5
 
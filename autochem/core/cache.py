@@ -0,0 +1,175 @@
+from .utils import parallel_map, sniff_log_type
+import json
+import os
+import sqlite3
+
+__all__ = ['ResultsCache']
+
+# bump whenever a parser changes what it extracts, so that results cached
+# by older versions are parsed again
+PARSER_VERSION = 2
+
+# stands for no valid entry, as None is stored for logs with nothing to report
+_MISSING = object()
+
+
+def default_cache_path():
+    """~/.cache/autochem/results.sqlite, or under $XDG_CACHE_HOME if set"""
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(root, 'autochem', 'results.sqlite')
+
+
+class ResultsCache:
+    """
+    On-disk cache of results extracted from log files, kept in an SQLite
+    database (by default ~/.cache/autochem/results.sqlite). Each result is
+    stored against the absolute path of the log and the kind of result, and
+    is only used while the log has the same size and modification time, and
+    the parsers are the same version, as when it was stored. Values must be
+    JSON serialisable, or numpy scalars and arrays, which come back as
+    numbers and lists; tuples come back as lists. Values that cannot be
+    stored are still returned, just not cached.
+
+    With `enabled` False, or if the database cannot be opened, every result
+    is worked out again and nothing is stored.
+
+    Usage:
+        >>> with ResultsCache() as cache:
+        ...     for log in logs:
+        ...         data = cache.get(log, 'energies', lambda: parse(log))
+    """
+
+    def __init__(self, path=None, enabled=True):
+        self.path = path or default_cache_path()
+        self.connection = None
+        self._pending = 0
+        self._types = {}
+        if not enabled:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=30)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'path TEXT, kind TEXT, size INTEGER, mtime INTEGER, '
+                'version INTEGER, value TEXT, PRIMARY KEY (path, kind))'
+            )
+        except (OSError, sqlite3.Error) as e:
+            print(f'Results cache unavailable ({e}), parsing every file')
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+
+    def _lookup(self, log, kind):
+        """(key, value) for `log`, with value _MISSING if nothing valid is stored"""
+        path = os.path.abspath(log)
+        stat = os.stat(path)
+        key = (path, kind, stat.st_size, stat.st_mtime_ns, PARSER_VERSION)
+        row = self.connection.execute(
+            'SELECT value FROM results WHERE path = ? AND kind = ? '
+            'AND size = ? AND mtime = ? AND version = ?',
+            key,
+        ).fetchone()
+        return key, _MISSING if row is None else json.loads(row[0])
+
+    def _store(self, key, value):
+        """Stores `value`, unless it cannot be written as JSON"""
+        try:
+            text = json.dumps(value, default=_as_json)
+        except (TypeError, ValueError) as e:
+            print(f'{key[0]}: {key[1]} not cached, {e}')
+            return
+        self.connection.execute(
+            'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+            key + (text,),
+        )
+        self._pending += 1
+        if self._pending >= 500:
+            self.connection.commit()
+            self._pending = 0
+
+    def get(self, log, kind, compute):
+        """
+        Returns the result of `kind` for `log` from the cache, or calls
+        `compute` to work it out and stores it. Exceptions from `compute`
+        are passed on, and nothing is stored.
+        """
+        if self.connection is None:
+            return compute()
+        key, value = self._lookup(log, kind)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        self._store(key, value)
+        return value
+
+    def log_type(self, log):
+        """
+        Package that wrote `log`, as found by |sniff_log_type|. Kept in
+        memory too, so each log is only looked at once per run.
+        """
+        if log not in self._types:
+            self._types[log] = self.get(log, 'type', lambda: sniff_log_type(log))
+        return self._types[log]
+
+    def calculations(self, logs):
+        """The logs that were written by a quantum chemistry package"""
+        return [log for log in logs if self.log_type(log) is not None]
+
+    def map(self, func, logs, kind, jobs=None):
+        """
+        Returns `func(log, log_type)` for every log, in order, as for |get|,
+        where log_type is from |log_type|, so workers need not look at the
+        file again to find it. Logs not in the cache are parsed on a pool of
+        `jobs` processes (see |parallel_map|). A log that raises an
+        exception is reported and gives None, without stopping the rest or
+        being stored.
+        """
+        logs = list(logs)
+        values = [None] * len(logs)
+        missing = []
+        for pos, log in enumerate(logs):
+            if self.connection is None:
+                missing.append((pos, None))
+                continue
+            key, values[pos] = self._lookup(log, kind)
+            if values[pos] is _MISSING:
+                values[pos] = None
+                missing.append((pos, key))
+
+        tasks = [(func, logs[pos], self.log_type(logs[pos])) for pos, _ in missing]
+        parsed = parallel_map(_guarded, tasks, jobs=jobs)
+        for (pos, key), (value, error) in zip(missing, parsed):
+            if error is not None:
+                print(f'{logs[pos]}: skipped, {error}')
+                continue
+            values[pos] = value
+            if key is not None:
+                self._store(key, value)
+        return values
+
+
+def _as_json(value):
+    """Numpy scalars and arrays as plain Python numbers and lists"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _guarded(args):
+    """Runs func(log, log_type) in a worker, returning (value, error message)"""
+    func, log, log_type = args
+    try:
+        return func(log, log_type), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
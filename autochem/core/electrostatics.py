@@ -0,0 +1,198 @@
+from .neighbours import as_cell, minimum_image
+from .rmsd import element_order, fit_deviations, fragment_rows, matched_order
+import numpy as np
+
+__all__ = ['COULOMB_CONSTANT', 'charge_templates', 'coulomb_matrix',
+           'fragment_charges', 'fragment_positions', 'template_charges']
+
+# e^2 / (4 pi epsilon_0), in kJ/mol Å
+COULOMB_CONSTANT = 1389.35
+
+
+def _pair_with_template(coords, starts, atnums, reference):
+    """
+    Orders the atoms of one fragment in M configurations, an (M, n, 3)
+    array, to pair up with the atoms of a template at `reference`,
+    returning an (M, n) array of indices. Each of the orders in `starts` is
+    tried in turn, for all the configurations left at once, and kept where
+    it fits: where every atom lies within half the shortest distance
+    between two atoms of the same element of the template, so that pairing
+    atoms up with their nearest neighbours could not change anything. The
+    first configuration left after that is paired up with |matched_order|,
+    starting from the principal axes only if that does not fit either, and
+    its order is tried on the rest. Orders that fit are added to `starts`.
+    """
+    atnums = np.asarray(atnums)
+    same = atnums[:, None] == atnums[None, :]
+    np.fill_diagonal(same, False)
+    if not same.any():
+        return np.tile(starts[0], (len(coords), 1))
+    diff = reference[:, None, :] - reference[None, :, :]
+    tolerance = np.sqrt((diff * diff).sum(axis=-1)[same].min()) / 2
+
+    orders = np.empty(coords.shape[:2], dtype=int)
+    left = np.arange(len(coords))
+    tried = 0
+    while len(left):
+        if tried < len(starts):
+            order = starts[tried]
+            fits = fit_deviations(reference, coords[left][:, order]).max(axis=1) < tolerance
+        else:
+            start, first = starts[0], coords[left[0]]
+            order = start[matched_order(reference, first[start], atnums)]
+            if fit_deviations(reference, first[order]).max() >= tolerance:
+                order = start[matched_order(reference, first[start], atnums, axes=True)]
+            fits = fit_deviations(reference, coords[left][:, order]).max(axis=1) < tolerance
+            if fits[0]:
+                starts.append(order)
+            # the best there is for this one, even if it does not fit
+            fits[0] = True
+        tried += 1
+        orders[left[fits]] = order
+        left = left[~fits]
+    return orders
+
+
+def charge_templates(calculations):
+    """
+    Builds the charges to put on each kind of fragment from finished
+    calculations, given as (|Molecule|, list of atomic charges) pairs, such
+    as those from |read_charges|. Charges are averaged over every fragment
+    of the same name, atom by atom. The first fragment of each name sets
+    the order of its atoms; the atoms of every other fragment of that name
+    are paired up with them by fitting the two onto each other (see
+    |matched_order|), so that hydrogens of a methyl group, say, are not
+    mixed up between configurations. Atoms that only differ by a rotation
+    the fit cannot see, such as those of a methyl group that has turned by
+    a third, still get averaged together. Returns a dictionary of
+    {name: (atomic numbers, charges, coordinates of the first fragment)}.
+    """
+    atnums, coords, totals, counts = {}, {}, {}, {}
+    for mol, charges in calculations:
+        charges = np.asarray(charges, dtype=float)
+        for frag in mol.fragments.values():
+            name = frag['name']
+            rows = fragment_rows(mol, frag)
+            if name not in atnums:
+                atnums[name] = tuple(mol.atnums[rows].tolist())
+                coords[name] = mol.coord_array[rows]
+                totals[name] = np.zeros(len(rows))
+                counts[name] = 0
+            elif tuple(mol.atnums[rows].tolist()) != atnums[name]:
+                raise ValueError(f'charge_templates: Fragments named {name} have different atoms')
+            else:
+                order = _pair_with_template(mol.coord_array[None, rows], [np.arange(len(rows))],
+                                            atnums[name], coords[name])
+                rows = rows[order[0]]
+            totals[name] += charges[rows]
+            counts[name] += 1
+    return {name: (atnums[name], totals[name] / counts[name], coords[name]) for name in atnums}
+
+
+def fragment_charges(coords, atnums, fragments, templates, orders=None):
+    """
+    Puts charges from |charge_templates| on every atom of M configurations
+    of the same atoms in the same fragments. `coords` is an (M, N, 3) array
+    (or a single (N, 3) array), `atnums` the atomic number of each atom, and
+    `fragments` a list of (name, rows) for each fragment, where rows are the
+    indices of its atoms. Returns an (M, N) array of charges (or N).
+
+    The ways the atoms of a fragment have been found to pair up with those
+    of its template are kept in `orders`, a dictionary of {(name, atomic
+    numbers of its atoms as listed): [orders]}. Pass the same dictionary
+    every time, and known pairings are only checked, for all
+    configurations at once, before any atoms are matched up again.
+    """
+    coords = np.asarray(coords, dtype=float)
+    single = coords.ndim == 2
+    coords = coords.reshape(-1, *coords.shape[-2:])
+    atnums = np.asarray(atnums)
+    orders = {} if orders is None else orders
+    charges = np.zeros(coords.shape[:2])
+    configs = np.arange(len(coords))[:, None]
+    for name, rows in fragments:
+        if name not in templates:
+            raise ValueError(f"fragment_charges: No charges for {name}")
+        template_atnums, values, template_coords = templates[name]
+        rows = np.asarray(rows, dtype=int)
+        starts = orders.setdefault((name, tuple(atnums[rows].tolist())), [])
+        if not starts:
+            start = element_order(coords[0, rows], atnums[rows])
+            if tuple(atnums[rows[start]].tolist()) != template_atnums:
+                raise ValueError(f"fragment_charges: Atoms of {name} do not match its charges")
+            starts.append(start)
+        paired = _pair_with_template(coords[:, rows], starts, template_atnums, template_coords)
+        charges[configs, rows[paired]] = values
+    return charges[0] if single else charges
+
+
+def template_charges(mol, templates, orders=None):
+    """
+    Puts charges from |charge_templates| on every atom of a |Molecule|,
+    fragment by fragment, pairing up the atoms of each fragment with those
+    of its template as |fragment_charges| does. Returns an array of charges
+    in the order of the atoms.
+    """
+    fragments = [(frag['name'], [atom.index - 1 for atom in frag['atoms']])
+                 for frag in mol.fragments.values()]
+    return fragment_charges(mol.coord_array, mol.atnums, fragments, templates, orders)
+
+
+def fragment_positions(mol):
+    """
+    Returns the keys of the fragments of a |Molecule|, and the position of
+    each atom's fragment in that list (-1 for atoms in no fragment), as used
+    for the labels of |coulomb_matrix|
+    """
+    keys = np.array(sorted(mol.fragments), dtype=int)
+    fragment_keys = mol.fragment_keys
+    positions = np.searchsorted(keys, fragment_keys)
+    return keys, np.where(fragment_keys >= 0, positions, -1)
+
+
+def coulomb_matrix(coords, charges, labels, num_fragments=None, cell=None):
+    """
+    Point charge interaction energy, in kJ/mol, between every pair of
+    fragments. `coords` is an (N, 3) array, or an (M, N, 3) array of M
+    configurations of the same atoms, such as the frames of a |Trajectory|;
+    `charges` is an array of N charges, or M x N if they differ between
+    configurations. `labels` gives the fragment of each atom, numbered from 0
+    (-1 for atoms to leave out), e.g. from |fragment_positions|. Pairs of
+    atoms within a fragment are not counted, so the diagonal is 0.
+
+    Configurations are worked through in batches, so that the N x N
+    distances of a batch fit comfortably in memory. Returns a (F, F) array,
+    or (M, F, F) for many configurations. The estimated interaction energy
+    of a configuration is the sum of the upper triangle.
+
+    Usage:
+        >>> keys, labels = fragment_positions(mol)
+        >>> energies = coulomb_matrix(mol.coord_array, charges, labels)
+        >>> np.triu(energies, 1).sum()
+    """
+    coords = np.asarray(coords, dtype=float)
+    single = coords.ndim == 2
+    coords = coords.reshape(-1, *coords.shape[-2:])
+    num_configs, num_atoms = coords.shape[:2]
+    charges = np.broadcast_to(np.asarray(charges, dtype=float), (num_configs, num_atoms))
+    labels = np.asarray(labels, dtype=int)
+    cell = as_cell(cell)
+    if num_fragments is None:
+        num_fragments = labels.max(initial=-1) + 1
+
+    one_hot = (labels[:, None] == np.arange(num_fragments)).astype(float)
+    between = (labels[:, None] != labels[None, :]) & (labels[:, None] >= 0) & (labels[None, :] >= 0)
+    batch = max(1, 2 ** 21 // max(num_atoms * num_atoms, 1))
+    energies = np.empty((num_configs, num_fragments, num_fragments))
+    for start in range(0, num_configs, batch):
+        stop = start + batch
+        diff = coords[start:stop, :, None, :] - coords[start:stop, None, :, :]
+        if cell is not None:
+            diff = minimum_image(diff, cell)
+        dists = np.sqrt((diff * diff).sum(axis=-1))
+        inverse = np.divide(1.0, dists, out=np.zeros_like(dists), where=between)
+        q = charges[start:stop]
+        pairs = q[:, :, None] * q[:, None, :] * inverse
+        energies[start:stop] = one_hot.T @ pairs @ one_hot
+    energies *= COULOMB_CONSTANT
+    return energies[0] if single else energies
@@ -0,0 +1,67 @@
+import numpy as np
+
+__all__ = ["DisjointSet", "connected_components"]
+
+
+class DisjointSet:
+    """
+    Union-find structure over the integers 0 to n - 1, used to group bonded
+    atoms into fragments. Finding the root of an item compresses the path
+    behind it, so repeated lookups are close to constant time.
+
+    >>> ds = DisjointSet(4)
+    >>> ds.union(0, 2)
+    >>> ds.find(2)
+    0
+    """
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, item):
+        """Returns the root of the set containing `item`"""
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        # path compression
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, a, b):
+        """Merges the sets containing `a` and `b`"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+    def labels(self):
+        """
+        Returns an array giving the set of each item, with sets numbered from
+        0 in order of their lowest item
+        """
+        labels = np.empty(len(self.parent), dtype=int)
+        numbers = {}
+        for item in range(len(self.parent)):
+            root = self.find(item)
+            if root not in numbers:
+                numbers[root] = len(numbers)
+            labels[item] = numbers[root]
+        return labels
+
+
+def connected_components(num_nodes, i, j):
+    """
+    Groups `num_nodes` nodes joined by the edges i[k]--j[k] into connected
+    components. Returns an array of the component of each node, numbered
+    from 0 in order of the lowest node in each component.
+    """
+    ds = DisjointSet(num_nodes)
+    for a, b in zip(np.asarray(i).tolist(), np.asarray(j).tolist()):
+        ds.union(a, b)
+    return ds.labels()
@@ -1,6 +1,9 @@
 from .periodic_table import PeriodicTable as PT
-from .atom import Atom
+from .atom import Atom, AtomTable
+from .graph import connected_components
+from .neighbours import as_cell, bonded_pairs, make_whole, minimum_image, neighbour_pairs
 from .utils import sort_elements
+from .xyz import read_xyz_arrays
 
 import re
 import os
@@ -8,8 +11,81 @@ import numpy as np
 import math
 import itertools
 import sys
+from collections import Counter, namedtuple
 
-__all__ = ['Molecule']
+__all__ = ['DistancePairs', 'FragmentContacts', 'Molecule']
+
+DistancePairs = namedtuple('DistancePairs', ['i', 'j', 'dist'])
+DistancePairs.__doc__ = """
+Sparse distances from |Molecule.distance_matrix|: arrays of atom indices
+i and j (starting from 0, i < j) and the distance between each pair
+"""
+
+class _AtomList(list):
+    """
+    List of the atoms of a |Molecule|, with a ``version`` that is
+    incremented whenever atoms are added, removed or replaced, so that the
+    molecule knows when its |AtomTable| needs checking again
+    """
+
+    def __init__(self, atoms=()):
+        super().__init__(atoms)
+        self.version = 0
+
+    def __setitem__(self, index, value):
+        self.version += 1
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self.version += 1
+        super().__delitem__(index)
+
+    def __iadd__(self, atoms):
+        self.version += 1
+        return super().__iadd__(atoms)
+
+    def __imul__(self, n):
+        self.version += 1
+        return super().__imul__(n)
+
+    def append(self, atom):
+        self.version += 1
+        super().append(atom)
+
+    def extend(self, atoms):
+        self.version += 1
+        super().extend(atoms)
+
+    def insert(self, index, atom):
+        self.version += 1
+        super().insert(index, atom)
+
+    def pop(self, index=-1):
+        self.version += 1
+        return super().pop(index)
+
+    def remove(self, atom):
+        self.version += 1
+        super().remove(atom)
+
+    def clear(self):
+        self.version += 1
+        super().clear()
+
+    def sort(self, *, key=None, reverse=False):
+        self.version += 1
+        super().sort(key=key, reverse=reverse)
+
+    def reverse(self):
+        self.version += 1
+        super().reverse()
+
+
+FragmentContacts = namedtuple('FragmentContacts', ['keys', 'min_dist', 'closest', 'contacts'])
+FragmentContacts.__doc__ = """
+Contacts between every pair of fragments, from |Molecule.fragment_contacts|.
+Rows and columns follow the fragment keys in `keys`
+"""
 
 
 class Molecule:
@@ -43,11 +119,29 @@ class Molecule:
         name of xyz file used to create the molecule
     coords: list 
         list of `Atom` objects for every atom in the molecule
+    atom_table: AtomTable
+        struct-of-arrays store of atomic numbers, coordinates, fragment
+        numbers and indices, one row per atom in `coords`. Each `Atom` is a
+        view onto its row, so the two always agree
+    coord_array: np.ndarray
+        read-only (N, 3) array of cartesian coordinates; the coords column
+        of `atom_table`
     fragments: dict
         format of {number: subdict} created when `self.separate()` is called.
         The subdict contains the keys: type (string), name (string),
         atoms (list of `Atom` instances), charge (int), mult (int), 
-        elements (list of atomic symbols)
+        elements (list of atomic symbols).
+        Fragmentation is lazy: `self.separate()` is run the first time
+        `fragments`, `ionic`, `overall_charge` or `overall_mult` is used,
+        and again only if the coordinates have changed since.
+    cell: np.ndarray or None
+        3 x 3 array of lattice vectors, one per row, for a periodic system
+        such as a box taken from an MD run. Passed in as the three box
+        lengths of an orthorhombic cell, or the three lattice vectors of a
+        triclinic cell. Bonds, hydrogen bonds and distances then use the
+        nearest periodic image of each atom. Run `self.make_whole()` to
+        join up molecules split across the boundaries before writing
+        coordinates out.
 
     """
 
@@ -230,12 +324,32 @@ class Molecule:
         **Dication_radicals
     }
 
+    # fragment database categories, in the order they are checked:
+    # (class attribute, type, charge, multiplicity)
+    categories = (
+        ('Cations', 'cation', 1, 1),
+        ('Anions', 'anion', -1, 1),
+        ('Neutrals', 'neutral', 0, 1),
+        ('Radicals', 'radical', 0, 2),
+        ('Anion_radicals', 'anion-radical', -1, 2),
+        ('Cation_radicals', 'cation-radical', 1, 2),
+        ('Dications', 'dication', 2, 1),
+        ('Dication_radicals', 'dication-radical', 2, 2),
+    )
+
+    _db_index = None
+    _db_index_signature = None
+    # (path, mtime, size) of molecules.txt when last read
+    _user_additions_stamp = None
+
     def __init__(self,
                  using=None,
                  atoms=None,
                  group=None,
-                 bonds_to_split=None):
+                 bonds_to_split=None,
+                 cell=None):
         self.check_user_additions()
+        self.cell = as_cell(cell)
         if using is not None:
             self.xyz = using
             self.coords = self.read_xyz(self.xyz)
@@ -243,11 +357,9 @@ class Molecule:
             if len(atoms) == 0:
                 sys.exit('Error: atoms argument passed into Molecule is empty')
             if not isinstance(atoms[0], Atom):
-                self.coords = []
-                for atom in atoms:
-                    sym, *coords = atom
-                    a = Atom(symbol=sym, coords=coords)
-                    self.coords.append(a)
+                symbols = [atom[0] for atom in atoms]
+                coords = [atom[1:] for atom in atoms]
+                self.coords = AtomTable(PT.get_atnums(symbols), coords).atoms()
             else:
                 self.coords = atoms
 
@@ -260,8 +372,7 @@ class Molecule:
             self.bonds_to_split = bonds_to_split
             self.split_on_bonds = True
 
-        for index, atom in enumerate(self.coords):
-            atom.index = index + 1
+        self.atom_table.index[:] = np.arange(1, len(self.coords) + 1)
 
         if hasattr(self, 'coords'):
             # self.complex used in input files
@@ -274,11 +385,10 @@ class Molecule:
                 "mult": 1,
                 "elements": sort_elements(self.coords)
             }
-        self.calc_overall_charge_and_mult()
 
     def __repr__(self):
         els = [i[0] for i in self.complex['elements']]
-        if not hasattr(self, 'fragments'):
+        if not self._fragments_current():
             return f'Molecule of {len(self.coords)} atoms. Elements: {els}'
         return self._repr()
 
@@ -300,20 +410,117 @@ class Molecule:
     def __iter__(self):
         return iter(self.coords)
 
+    @property
+    def coords(self):
+        """List of the |Atom| instances of the system"""
+        return self._coords
+
+    @coords.setter
+    def coords(self, atoms):
+        self._coords = atoms if isinstance(atoms, _AtomList) else _AtomList(atoms)
+
+    def _table_stamp(self):
+        """
+        What the check of the atom table depends on: the list of atoms, its
+        version, and how many times atoms of the table have been bound to
+        another table
+        """
+        table = getattr(self, '_atom_table', None)
+        released = None if table is None else table.released
+        return self._coords, self._coords.version, table, released
+
+    def _atoms_use_table(self, table):
+        """Checks that each atom in self.coords is a view onto its own row of table"""
+        return len(table) == len(self.coords) and all(
+            atom._table is table and atom._row == row
+            for row, atom in enumerate(self.coords))
+
+    def _bind_atoms(self):
+        """
+        Copies the data of every atom into one |AtomTable|, then points each
+        atom at its own row of that table. Atoms that are already the rows of
+        one table, in order, keep that table.
+        """
+        old = getattr(self, '_atom_table', None)
+        if self.coords and self._atoms_use_table(self.coords[0]._table):
+            self._atom_table = self.coords[0]._table
+        else:
+            self._atom_table = AtomTable.from_atoms(self.coords)
+            self._atom_table.bind(self.coords)
+        # fragments survive the move to a new table if no atom has moved
+        if (old is not None and self._fragments_current(old)
+                and np.array_equal(old.coords, self._atom_table.coords)):
+            self._fragments_stamp = (self._atom_table, self._atom_table.version)
+
+    @property
+    def atom_table(self):
+        """
+        Returns the |AtomTable| backing the atoms in self.coords. If atoms
+        have been added or handed to another molecule since the table was
+        built, the table is rebuilt from the atoms.
+        """
+        table = getattr(self, '_atom_table', None)
+        checked = getattr(self, '_table_checked', None)
+        current = self._table_stamp()
+        if (table is None or checked is None or checked[0] is not current[0]
+                or checked[1] != current[1] or checked[2] is not current[2]
+                or checked[3] != current[3]):
+            # only looked at atom by atom when something may have changed
+            if table is None or not self._atoms_use_table(table):
+                self._bind_atoms()
+            self._table_checked = self._table_stamp()
+        return self._atom_table
+
+    @property
+    def coord_array(self):
+        """
+        Returns a read-only view of the (N, 3) array of coordinates backing
+        the atoms in self.coords. Move atoms with self.translate or through
+        each |Atom|, so that the fragments are found again.
+        """
+        view = self.atom_table.coords.view()
+        view.flags.writeable = False
+        return view
+
     def translate(self, vector, frag=None):
         """
         Apply the vector to every atom in the system.
         Note that if fragmented, can specify which fragment to translate,
-        by specifying a key of self.fragments
+        by specifying a key of self.fragments. Moving the whole system
+        changes no bonds, so the fragments (including any edits made to
+        them) are kept. A single fragment can be moved into contact with
+        another, so its fragments are only kept if no atom of the moved
+        fragment is bonded to a different set of atoms outside it.
         """
-        for atom in self.coords:
-            atom.translate(vector)
-
-        if frag is not None:
-            if not hasattr(self, 'fragments'):
+        table = self.atom_table
+        separated = self._fragments_current()
+        if frag is None:
+            table.coords += vector
+            unchanged = separated
+        else:
+            if not separated:
                 raise AttributeError('Must run self.separate() first')
-            for atom in self.fragments[frag]:
-                atom.translate(vector)
+            indices = [atom.index - 1 for atom in self._fragments[frag]['atoms']]
+            before = self._contacts_outside(indices)
+            table.coords[indices] += vector
+            unchanged = np.array_equal(before, self._contacts_outside(indices))
+        table.version += 1
+        if unchanged:
+            self._fragments_stamp = (table, table.version)
+
+    def _contacts_outside(self, indices):
+        """
+        Boolean array of which atoms (indices starting from 0) are close
+        enough to be bonded to each atom in indices, with the atoms in
+        indices themselves left out
+        """
+        coords = self.coord_array
+        outside = np.ones(len(coords), dtype=bool)
+        outside[indices] = False
+        radii = PT.vdw_radii[self.atnums]
+        diff = minimum_image(coords[indices, None, :] - coords[None, outside, :], self.cell)
+        limit = radii[indices, None] + radii[None, outside]
+        return (diff * diff).sum(axis=2) < limit * limit
 
     def formula(self, as_dict=False, as_latex=False, as_html=False):
         """
@@ -351,44 +558,92 @@ class Molecule:
                 string += f"{sym}{number}"
             return string
 
+    @property
+    def atnums(self):
+        """
+        Returns an array of the atomic number of every atom, in the same order
+        as self.coords. Use it to look up properties of every atom at once,
+        i.e. PT.vdw_radii[mol.atnums]
+        """
+        return self.atom_table.atnum.astype(int)
+
     @property
     def mass(self):
         """
         Returns molecular mass in g mol⁻¹
         """
-        formula = self.formula(as_dict=True)
-        mass = 0
-        for element, number in formula.items():
-            element = Atom(element)  # PT.x requires Atom objects
-            mass += PT.get_mass(element) * number
+        mass = PT.masses[self.atnums].sum()
         return f"{mass:.2f} g mol⁻¹"
 
-    def calc_overall_charge_and_mult(self):
+    def _fragments_current(self, table=None):
         """
-        Checks system for overall charge and multiplicity
+        Checks that fragments have been found, and that no coordinates have
+        changed since
         """
-        if not hasattr(self, 'fragments'):
+        stamp = getattr(self, '_fragments_stamp', None)
+        if table is None:
+            table = self._atom_table
+        return stamp is not None and stamp[0] is table and stamp[1] == table.version
+
+    def invalidate_fragments(self):
+        """
+        Discards the fragments found so far, so that the system is separated
+        again the next time they are used. Only needed after writing directly
+        into self.atom_table.coords; moving atoms through the |Atom| or
+        |Molecule| methods does this automatically.
+        """
+        self._fragments_stamp = None
+
+    @property
+    def fragments(self):
+        if not self._fragments_current():
             self.separate()
-        if self.split_on_bonds:
-            self.fragment_on_bonds()
-        self.overall_charge = Molecule.get_charge(self.fragments)
-        self.overall_mult = Molecule.get_multiplicity(self.fragments)
+        return self._fragments
+
+    @fragments.setter
+    def fragments(self, value):
+        self._fragments = value
+        self._fragments_stamp = (self._atom_table, self._atom_table.version)
+
+    @property
+    def ionic(self):
+        """
+        Ionic network of the system- only present if the system contains
+        ionic and non-ionic fragments
+        """
+        if not self._fragments_current():
+            self.separate()
+        if getattr(self, '_ionic', None) is None:
+            raise AttributeError("'Molecule' object has no attribute 'ionic'")
+        return self._ionic
+
+    @ionic.setter
+    def ionic(self, value):
+        self._ionic = value
+
+    @property
+    def overall_charge(self):
+        return Molecule.get_charge(self.fragments)
+
+    @property
+    def overall_mult(self):
+        return Molecule.get_multiplicity(self.fragments)
+
+    def calc_overall_charge_and_mult(self):
+        """
+        Checks system for overall charge and multiplicity, separating the
+        system into fragments if not already done
+        """
+        return self.overall_charge, self.overall_mult
 
     def read_xyz(self, using):
         """
         Reads coordinates of an xyz file and return a list of |Atom| objects,
         one for each atom
         """
-        coords = []
-        with open(using, "r") as f:
-            for coord in f.readlines()[2:]:
-                line = coord.split()
-                for val in PT.ptable.values():
-                    if line[0] == val[0]:
-                        coords.append(
-                            Atom(line[0],
-                                 coords=tuple(float(i) for i in line[1:4])))
-        return coords
+        symbols, coords = read_xyz_arrays(using)
+        # one table for the whole file, rather than one per atom
+        return AtomTable(PT.get_atnums(symbols), coords).atoms()
 
     def write_xyz(self, atoms, filename=None):
         """
@@ -404,74 +659,73 @@ class Molecule:
                         f"{atom.symbol:5s} {atom.x:>10.5f} {atom.y:>10.5f} {atom.z:>10.5f} \n"
                     )
 
-    def check_db(self):
+    @staticmethod
+    def composition_key(symbols):
         """
-        Checks fragments for a match in the database
+        Canonical, hashable composition of a list of atomic symbols- a sorted
+        tuple of (symbol, count) pairs. Two fragments with the same atoms in
+        any order give the same key.
         """
+        return tuple(sorted(Counter(symbols).items()))
 
-        symbols = {}
-        for frag, atoms in self.mol_dict.items():
-            symbols[frag] = [atom.symbol for atom in atoms]
+    @classmethod
+    def db_index(cls):
+        """
+        Returns a dictionary of {composition key: (rank, name, type, charge,
+        multiplicity)} covering every category of the molecule database,
+        including molecules added by the user. If entries share a
+        composition, the last one checked is used, as in the original linear
+        search, and rank is the position of the first entry checked with that
+        composition, which decides the order fragments are listed in.
+
+        The index is built once and reused, then rebuilt if a category of the
+        database changes size or is replaced. Call `invalidate_db_index` after
+        changing the atoms of an existing entry.
+        """
+        dbs = [getattr(cls, attr) for attr, *_ in cls.categories]
+        signature = tuple((id(db), len(db)) for db in dbs)
+        if Molecule._db_index is None or Molecule._db_index_signature != signature:
+            index = {}
+            rank = 0
+            for db, (_, mol_type, charge, mult) in zip(dbs, cls.categories):
+                for name, atom_list in db.items():
+                    key = cls.composition_key(atom_list)
+                    first = index[key][0] if key in index else rank
+                    index[key] = (first, name, mol_type, charge, mult)
+                    rank += 1
+            Molecule._db_index = index
+            Molecule._db_index_signature = signature
+        return Molecule._db_index
 
-        def check_dict(molecules_dict, symbols_dict, db):
-            """
-            Checking molecule database for a match, and returning the required attributes- 
-            name, atoms in molecule, type of molecule, charge, multiplicity, 
-            and elements present in the molecule"""
-            if db == Molecule.Anions:
-                charge = -1
-                mult = 1
-                mol_type = 'anion'
-            elif db == Molecule.Cations:
-                charge = 1
-                mult = 1
-                mol_type = 'cation'
-            elif db == Molecule.Neutrals:
-                charge = 0
-                mult = 1
-                mol_type = 'neutral'
-            elif db == Molecule.Radicals:
-                charge = 0
-                mult = 2
-                mol_type = 'radical'
-            elif db == Molecule.Dications:
-                charge = 2
-                mult = 1
-                mol_type = 'dication'
-            elif db == Molecule.Anion_radicals:
-                charge = -1
-                mult = 2
-                mol_type = 'anion-radical'
-            elif db == Molecule.Cation_radicals:
-                charge = 1
-                mult = 2
-                mol_type = 'cation-radical'
-            elif db == Molecule.Dication_radicals:
-                charge = 2
-                mult = 2
-                mol_type = 'dication-radical'
-
-            for name, atom_list in db.items():
-                for sym, molecule in symbols_dict.items():
-                    if sorted(molecule) == sorted(atom_list):
-                        data = {
-                            "type": mol_type,
-                            "name": name,
-                            "atoms": self.mol_dict[sym],
-                            "charge": charge,
-                            "multiplicity": mult,
-                            "elements": sort_elements(self.mol_dict[sym]),
-                            "frag_type": "frag"
-                        }
-                        molecules_dict[sym] = data
-            return molecules_dict
+    @classmethod
+    def invalidate_db_index(cls):
+        """Forces the database index to be rebuilt on next use"""
+        Molecule._db_index = None
+
+    def check_db(self):
+        """
+        Checks fragments for a match in the database
+        """
+        index = Molecule.db_index()
+        matches = []
+        for position, (frag, atoms) in enumerate(self.mol_dict.items()):
+            match = index.get(
+                Molecule.composition_key(atom.symbol for atom in atoms))
+            if match is not None:
+                matches.append((match[0], position, frag, match))
+        matches.sort()
 
         self.fragments = {}
-        for db in (Molecule.Cations, Molecule.Anions, Molecule.Neutrals,
-                   Molecule.Radicals, Molecule.Anion_radicals,
-                   Molecule.Cation_radicals, Molecule.Dications,
-                   Molecule.Dication_radicals):
-            self.fragments = check_dict(self.fragments, symbols, db)
+        for *_, frag, (_, name, mol_type, charge, mult) in matches:
+            self.fragments[frag] = {
+                "type": mol_type,
+                "name": name,
+                "atoms": self.mol_dict[frag],
+                "charge": charge,
+                "multiplicity": mult,
+                "elements": sort_elements(self.mol_dict[frag]),
+                "frag_type": "frag"
+            }
 
         #sort order of atoms
         for data in self.fragments.values():
@@ -587,22 +841,51 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         frag_indices = get_manual_assignments()
         update_mol_dictionary(frag_indices)
 
+    def find_bonded_pairs(self):
+        """
+        Returns the indices (starting from 0) of every pair of bonded atoms,
+        as two arrays i and j with i < j, sorted by i then j. Atoms are bonded
+        if closer together than the sum of their van der waals radii.
+        """
+        radii = PT.vdw_radii[self.atnums]
+        i, j, _ = bonded_pairs(self.coord_array, radii, self.cell)
+        return i, j
+
+    def _neighbour_lists(self, i, j):
+        """
+        Converts pairs of atom indices into a list, for each atom, of the
+        indices of the atoms it is paired with, in ascending order
+        """
+        neighbours = [[] for _ in self.coords]
+        for a, b in zip(i.tolist(), j.tolist()):
+            neighbours[a].append(b)
+            neighbours[b].append(a)
+        for indices in neighbours:
+            indices.sort()
+        return neighbours
+
+    def connect_atoms(self, i, j):
+        """
+        Adds each bonded pair of atoms (indices i and j, starting from 0) to
+        the connected_atoms list of both atoms. Connections are listed in
+        order of atom index.
+        """
+        neighbours = self._neighbour_lists(i, j)
+        for atom, indices in zip(self.coords, neighbours):
+            if not atom.connected_atoms:
+                atom.connected_atoms = [self.coords[k] for k in indices]
+                continue
+            existing = set(map(id, atom.connected_atoms))
+            for k in indices:
+                if id(self.coords[k]) not in existing:
+                    atom.connected_atoms.append(self.coords[k])
+
     def assign_neighbours(self):
         """
         Checks each atom, either per fragment or in whole list, for bonded 
         atoms by considering separation and van der waals radii
         """
-
-        for i, atom_i in enumerate(self.coords):
-            for j, atom_j in enumerate(self.coords):
-                if i != j:
-                    dist = atom_i.distance_to(atom_j)
-                    vdw_dist = PT.get_vdw(atom_i) + PT.get_vdw(atom_j)
-                    if dist < vdw_dist:
-                        if atom_j not in atom_i.connected_atoms:
-                            atom_i.connected_atoms.append(atom_j)
-                        if atom_i not in atom_j.connected_atoms:
-                            atom_j.connected_atoms.append(atom_i)
+        self.connect_atoms(*self.find_bonded_pairs())
 
     def add_ionic_network(self):
         """
@@ -623,22 +906,14 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
 
             return charge, multiplicity
 
-        coord_list = [coord for coord in self.coords]
-        for k, frag in self.fragments.items():
-            # remove neutrals
-            if frag['charge'] == 0:
-                for coord in frag['atoms']:
-                    # remove coord from coord_list
-                    for i, atom in enumerate(coord_list):
-                        if coord.index == atom.index:
-                            del coord_list[i]
-            # remove Li, Na, Cl, Br etc...
-            elif len(frag['atoms']) == 1:
-                for coord in frag['atoms']:
-                    # remove coord from coord_list
-                    for i, atom in enumerate(coord_list):
-                        if coord.index == atom.index:
-                            del coord_list[i]
+        removed = np.zeros(len(self.coords), dtype=bool)
+        for frag in self.fragments.values():
+            # remove neutrals, and Li, Na, Cl, Br etc...
+            if frag['charge'] == 0 or len(frag['atoms']) == 1:
+                removed[[atom.index - 1 for atom in frag['atoms']]] = True
+        coord_list = [
+            atom for atom, gone in zip(self.coords, removed.tolist()) if not gone
+        ]
         if len(coord_list) != len(self.coords) and len(coord_list) != 0:
             # split and add charges and multiplicities up
             # charge, multiplicity = ionic_mol_properties(coord_list)
@@ -744,6 +1019,12 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         distances along with van der waals radii. Note this function only works 
         with intermolecular fragments and cannot split molecules on bonds.
         """
+        # start afresh if separated before
+        self._ionic = None
+        self._fragment_index = None
+        self.frags_grouped_if_desired = False
+        if hasattr(self, 'fragments_after_merge'):
+            del self.fragments_after_merge
         self.split()
         self.check_db()
         self.renumber_molecules()
@@ -775,60 +1056,66 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         indicating which bond to break. For example, [(4,9)] indicates a bond between
         atoms 4 and 9 of the original xyz file that should be broken. 
         """
-        def remove_connection(connections, atom1, atom2):
-            if atom2 in connections[atom1]:
-                connections[atom1].remove(atom2)
-            if atom1 in connections[atom2]:
-                connections[atom2].remove(atom1)
-            return connections
-
-        connections = {
-            atom.index: [con.index for con in atom.connected_atoms]
+        num_atoms = len(self.coords)
+        # adjacency sets, 0-based
+        neighbours = [
+            {con.index - 1 for con in atom.connected_atoms}
             for atom in self
-        }
+        ]
         # apply split
         for bond in self.bonds_to_split:
-            a1, a2 = bond
-            connections = remove_connection(connections, a1, a2)
-
-        # convert indices back to atom objects
-        connections = {
-            k: [self.coords[i - 1] for i in v]
-            for k, v in connections.items()
-        }
-
-        # now have {original_atom: [connections_to_original_atom]}
-        # but need include original_atom in that dict
-
-        for k, v in connections.items():
-            # include as first, why not
-            v.insert(0, self.coords[k - 1])
-
-        # collect up frags after applying split
-        for index, connected_atoms in connections.items():
-            # now check rest of indices of connections
-            # for connections to any of current atoms in fragment
-            for index2, connected2 in connections.items():
-                if index != index2:
-                    if any(atom in connected2
-                           for atom in connected_atoms):  # frags are connected
-                        # add the rest of connected2 into connected_atoms and empty 'old' frag
-                        for a2 in connected2:
-                            if a2 not in connected_atoms:
-                                connected_atoms.append(a2)
-                        connections[index2] = []
-
-        connections = {
-            k: sorted(v, key=lambda atom: atom.index)
-            for k, v in connections.items() if len(v) != 0
-        }
+            a1, a2 = bond[0] - 1, bond[1] - 1
+            neighbours[a1].discard(a2)
+            neighbours[a2].discard(a1)
+
+        i = [a for a, cons in enumerate(neighbours) for b in cons if a < b]
+        j = [b for a, cons in enumerate(neighbours) for b in cons if a < b]
+        labels = connected_components(num_atoms, i, j)
+        members = [[] for _ in range(labels.max() + 1 if num_atoms else 0)]
+        for atom, label in enumerate(labels.tolist()):
+            members[label].append(atom)
+
+        def surviving_key(component):
+            """
+            Fragments are numbered as if each atom starts a group of itself
+            and its neighbours, and the groups are swept over in index order,
+            each one swallowing every group that shares an atom with it; the
+            number follows the atom whose group is left at the end. The sweep
+            is repeated here within one component, which only costs a single
+            pass when the atoms of the component are numbered along its bonds.
+            """
+            if len(component) == 1:
+                return component[0]
+            groups = {a: [a] + sorted(neighbours[a]) for a in component}
+            alive = list(component)
+            for key in component:
+                if len(alive) == 1:
+                    break
+                group = groups[key]
+                if not group:
+                    continue
+                seen = set(group)
+                remaining = []
+                for other in alive:
+                    if other == key:
+                        remaining.append(other)
+                    elif any(a in seen for a in groups[other]):
+                        for a in groups[other]:
+                            if a not in seen:
+                                seen.add(a)
+                                group.append(a)
+                        groups[other] = []
+                    else:
+                        remaining.append(other)
+                alive = remaining
+            return alive[0]
+
+        components = sorted(members, key=surviving_key)
 
         # redefine molecule number for each atom, starting from 1
         redefined = {}
-
-        for new_index, kv in enumerate(connections.items(), 1):
-            key, value = kv
-            redefined[new_index] = value
+        for new_index, component in enumerate(components, 1):
+            redefined[new_index] = [self.coords[a] for a in component]
 
         for k, v in redefined.items():
             for atom in v:
@@ -861,32 +1148,12 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
             in that order.
             If not found, returns a neutral species with no unpaired electrons.
             """
-            anions = [sorted(v) for v in Molecule.Anions]
-            cations = [sorted(v) for v in Molecule.Cations]
-            neutrals = [sorted(v) for v in Molecule.Neutrals]
-            rads = [sorted(v) for v in Molecule.Radicals]
-            dicats = [sorted(v) for v in Molecule.Dications]
-            an_rads = [sorted(v) for v in Molecule.Anion_radicals]
-            cat_rads = [sorted(v) for v in Molecule.Cation_radicals]
-            dicat_rads = [sorted(v) for v in Molecule.Dication_radicals]
-            if atoms in anions:
-                return -1, 1
-            elif atoms in cations:
-                return 1, 1
-            elif atoms in neutrals:
-                return 0, 1
-            elif atoms in rads:
-                return 0, 2
-            elif atoms in dicats:
-                return 2, 1
-            elif atoms in an_rads:
-                return -1, 2
-            elif atoms in cat_rads:
-                return 1, 2
-            elif atoms in dicat_rads:
-                return 2, 2
-            else:
+            match = Molecule.db_index().get(
+                Molecule.composition_key(atom.symbol for atom in atoms))
+            if match is None:
                 return 0, 1
+            *_, charge, mult = match
+            return charge, mult
 
         #sort order of atoms
         for data in self.fragments.values():
@@ -909,68 +1176,157 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
                 'frag_type': 'fragmented_on_bond'
             }
 
-    def distance_matrix(self):
+    def distance_matrix(self, condensed=False, cutoff=None, dtype=float, block_size=None):
         """
         Creates an N x N matrix of interatomic distances
         between every atom in the system. N = number of 
         atoms in system.
-        """
-        num_atoms = len(self.coords)
-        matrix = np.zeros((num_atoms, num_atoms))
 
-        for i, atom_i in enumerate(self.coords):
-            for j, atom_j in enumerate(self.coords):
-                matrix[i, j] = atom_i.distance_to(atom_j)
+        If `condensed` is True, only the upper triangle is returned, as a
+        flat array of the N(N-1)/2 distances in the order (0, 1), (0, 2), ...,
+        (0, N-1), (1, 2), ..., the same layout as scipy's `pdist`.
+
+        For large systems, where an N x N matrix will not fit in memory:
+
+        * `cutoff` returns only the distances under the cutoff, as a sparse
+          |DistancePairs| tuple of arrays i, j and dist, with i < j. These are
+          found with a cell list, so take time and memory in proportion to N.
+          `scipy.sparse.coo_matrix((dist, (i, j)), shape=(N, N))` converts
+          them to a scipy matrix, if wanted.
+        * `block_size` returns a generator of (start, block) tuples, where
+          block holds rows start to start + len(block) of the full matrix.
+        * `dtype=np.float32` halves the memory of the matrix or blocks.
+
+        For a periodic system, each distance is to the nearest image.
+
+        >>> for start, block in mol.distance_matrix(block_size=1000):
+        ...     nearest = block.min(axis=1)
+        """
+        coords = self.coord_array
+        num_atoms = len(coords)
+        if cutoff is not None:
+            return DistancePairs(*neighbour_pairs(coords, cutoff, self.cell))
+        if block_size is not None:
+            return self._distance_blocks(block_size, dtype)
+        if condensed:
+            matrix = np.empty(num_atoms * (num_atoms - 1) // 2, dtype=dtype)
+            start = 0
+            for i in range(num_atoms - 1):
+                diff = minimum_image(coords[i + 1:] - coords[i], self.cell)
+                stop = start + num_atoms - i - 1
+                matrix[start:stop] = np.sqrt((diff * diff).sum(axis=1))
+                start = stop
+            return matrix
+
+        matrix = np.empty((num_atoms, num_atoms), dtype=dtype)
+        # work in blocks of rows to avoid an N x N x 3 intermediate array
+        for start, block in self._distance_blocks(256, dtype):
+            matrix[start:start + len(block)] = block
         return matrix
 
+    def _distance_blocks(self, block_size, dtype=float):
+        """
+        Generator of (start, block) tuples, where block is rows start to
+        start + block_size of the distance matrix
+        """
+        coords = self.coord_array
+        for start in range(0, len(coords), block_size):
+            diff = minimum_image(
+                coords[start:start + block_size, None, :] - coords[None, :, :], self.cell)
+            yield start, np.sqrt((diff * diff).sum(axis=2)).astype(dtype, copy=False)
+
+    def fragment_contacts(self, cutoff=None):
+        """
+        Finds how close every pair of fragments come to each other. Returns a
+        |FragmentContacts| tuple of:
+
+        * keys -- keys of self.fragments, in the order of the rows and columns
+          of the matrices below
+        * min_dist -- F x F array of the shortest distance between an atom of
+          one fragment and an atom of the other, 0 along the diagonal
+        * closest -- F x F x 2 array of the indices (starting from 0) of the
+          two atoms that are closest, with closest[a, b, 0] in fragment a and
+          closest[a, b, 1] in fragment b. -1 along the diagonal
+        * contacts -- if a `cutoff` is given, F x F array of the number of
+          pairs of atoms closer than the cutoff, found with a cell list.
+          Otherwise None
+
+        Distances are worked out from one fragment to every atom at a time,
+        so memory use stays in proportion to N.
+
+        >>> contacts = mol.fragment_contacts(cutoff=2.5)
+        >>> contacts.min_dist[0, 1]
+        """
+        keys = list(self.fragments)
+        position = {key: pos for pos, key in enumerate(keys)}
+        labels = np.array([position.get(key, -1) for key in self.fragment_keys.tolist()],
+                          dtype=int)
+        coords = self.coord_array
+        num_frags = len(keys)
+
+        # columns grouped by fragment
+        columns = np.argsort(labels, kind='stable')
+        columns = columns[labels[columns] >= 0]
+        column_labels = labels[columns]
+        starts = np.searchsorted(column_labels, np.arange(num_frags))
+
+        min_dist = np.zeros((num_frags, num_frags))
+        closest = np.full((num_frags, num_frags, 2), -1, dtype=int)
+        for a in range(num_frags):
+            rows = np.nonzero(labels == a)[0]
+            diff = minimum_image(coords[rows, None, :] - coords[None, columns, :], self.cell)
+            dists = np.sqrt((diff * diff).sum(axis=2))
+            nearest = dists.argmin(axis=0)
+            column_min = dists[nearest, np.arange(len(columns))]
+            # sorted by fragment, then distance, so the closest atom of each
+            # fragment comes first
+            firsts = np.lexsort((column_min, column_labels))[starts]
+            min_dist[a] = column_min[firsts]
+            closest[a, :, 0] = rows[nearest[firsts]]
+            closest[a, :, 1] = columns[firsts]
+        np.fill_diagonal(min_dist, 0.0)
+        closest[np.arange(num_frags), np.arange(num_frags)] = -1
+
+        contacts = None
+        if cutoff is not None:
+            i, j, _ = neighbour_pairs(coords, cutoff, self.cell)
+            frag_i, frag_j = labels[i], labels[j]
+            keep = (frag_i >= 0) & (frag_j >= 0) & (frag_i != frag_j)
+            contacts = np.zeros((num_frags, num_frags), dtype=int)
+            np.add.at(contacts, (frag_i[keep], frag_j[keep]), 1)
+            contacts += contacts.T
+        return FragmentContacts(keys, min_dist, closest, contacts)
+
+    def make_whole(self):
+        """
+        For a periodic system, moves atoms across the cell boundaries so that
+        every molecule is in one piece, with each atom next to the atoms it is
+        bonded to. The first atom of each molecule stays where it is.
+        """
+        if self.cell is None:
+            return
+        i, j = self.find_bonded_pairs()
+        table = self.atom_table
+        table.coords[:] = make_whole(table.coords, self.cell, i, j)
+        table.version += 1
+
     def split(self):
         """
-        Split a system into fragments using van der waals radii. Modifies
-        attributes of atoms in self.coords directly in loop, instead of creating
-        a dictionary and appending to the dictionary as we go. This
-        significantly speeds up the fragmentation.
-        """
-        mol_count = 0
-        dists = self.distance_matrix()
-        for i, atom_i in enumerate(self.coords):
-            connected = False
-            for j, atom_j in enumerate(self.coords):
-                if i != j:
-                    vdw_dist = PT.get_vdw(atom_i) + PT.get_vdw(atom_j)
-                    if dists[i, j] < vdw_dist:
-                        # connected
-                        connected = True
-                        if atom_i not in atom_j.connected_atoms:
-                            atom_j.connected_atoms.append(atom_i)
-                        if atom_j not in atom_i.connected_atoms:
-                            atom_i.connected_atoms.append(atom_j)
-                        if atom_i.mol is None and atom_j.mol is None:
-                            atom_i.mol = mol_count
-                            atom_j.mol = mol_count
-                            mol_count += 1
-                        elif atom_i.mol is None and atom_j.mol is not None:
-                            atom_i.mol = atom_j.mol
-                        elif atom_j.mol is None and atom_i.mol is not None:
-                            atom_j.mol = atom_i.mol
-                        # if different assignments, remove original assignment
-                        # combine the two fragments together, as they are connected
-                        elif atom_i.mol is not None and atom_j.mol is not None:
-                            if atom_i.mol != atom_j.mol:
-                                orig = atom_j.mol
-                                for atom in self.coords:
-                                    if atom.mol is orig:
-                                        atom.mol = atom_i.mol
-            if not connected:
-                atom_i.mol = mol_count
-                mol_count += 1
-
-        nums = set([atom.mol for atom in self.coords])
-        self.mol_dict = {
-            val: [atom for atom in self.coords if atom.mol == val]
-            for val in nums
-        }
-        for mol in self.mol_dict.values():
-            mol.sort(key=lambda atom: atom.index)
+        Split a system into fragments using van der waals radii. Bonded pairs
+        are found with a cell list, then grouped into fragments with a
+        union-find structure, so that merging two partially built fragments
+        never requires relabelling atoms. Fragments are numbered from 0 in
+        order of their first atom.
+        """
+        i_pairs, j_pairs = self.find_bonded_pairs()
+        self.connect_atoms(i_pairs, j_pairs)
+        labels = connected_components(len(self.coords), i_pairs, j_pairs)
+
+        self.mol_dict = {label: [] for label in range(labels.max(initial=-1) + 1)}
+        # self.coords is in order of index, so each fragment is too
+        for atom, label in zip(self.coords, labels.tolist()):
+            atom.mol = label
+            self.mol_dict[label].append(atom)
 
     def find_h_bonds(self, distance=2.0):
         """
@@ -1003,100 +1359,100 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
                             return True
                 return False
 
-            def valid_atoms(atom1, atom2):
+            def atom_flags(atoms):
                 """
-                Checks if a bond is formed between a pair of atoms of the
-                correct type. This is achieved by checking the atoms
-                that the bonds are connected to, not involved in the bond.
-                For example, if an alkyl chain is close to an anion, this
-                function ignores any of those interactions.
+                Works out once per atom how it takes part in a hydrogen bond.
+                Returns the atomic numbers, a status for each atom and the row
+                of the first atom connected to each atom (-1 if none).
+
+                The status is 1 for an imidazolium C2-H proton, which may bond
+                to anything, -1 for alkyl protons and atoms that cannot hydrogen
+                bond, and 0 otherwise. Checking the pair atom1, atom2, the first
+                non-zero status decides, and the pair is valid if both are 0.
+                This removes, for example, an alkyl chain close to an anion.
                 """
-                # remove alkyl proton interactions
-                # need the atom.symbol == line,
-                # otherwise c-o --- h-o hydrogen
-                # bonds will fail (as c is not in
-                # h-bonders)
                 h_bonders = ['O', 'F', 'H', 'N']
-
-                # can't have two hydrogens for example
-                # if all(atom.symbol is 'H' for atom in (atom1, atom2)):
-                if atom1.symbol == atom2.symbol:
-                    return False
-                for atom in (atom1, atom2):
+                num_atoms = len(atoms)
+                status = np.zeros(num_atoms, dtype=int)
+                first_connected = np.full(num_atoms, -1, dtype=int)
+                for row, atom in enumerate(atoms):
+                    connected = atom.connected_atoms
+                    if connected:
+                        first_connected[row] = connected[0].index - 1
                     if atom.symbol == 'H':
                         if is_imid_c2_h(atom):  # exception
-                            return True
-                        if is_alkyl(atom):
-                            return False
-                    if atom.symbol not in h_bonders:
-                        return False
-                        for a in atom.connected_atoms:
-                            if a.symbol not in h_bonders:
-                                return False
-
-                return True
-
-            def within_hbond_distance(atom1, atom2, dist):
+                            status[row] = 1
+                        elif is_alkyl(atom):
+                            status[row] = -1
+                    elif atom.symbol not in h_bonders:
+                        status[row] = -1
+                return self.atnums, status, first_connected
+
+            def bond_angles(coords, a, b, c):
                 """
-                Checks that atoms are within hydrogen-bonding distances, set to
-                2 Å by default.
-                """
-                return atom1.distance_to(atom2) < dist
-
-            def bond_angle(atom1, atom2):
-                """
-                Returns the angle between two atoms.
+                Returns the angles ∠ABC in degrees, for arrays of rows of
+                atoms A, B and C.
 
                  A
-                 \ 
+                 \\ 
                    B --- C
 
-                Checks angle ∠ABC, when A is atom1, B is atom2 and C is the
-                connecting atom to atom2. There will probably be only one
-                connecting atom, but if there is more, only considering the
-                first in the list.
-                """
-                connected_to_atom2 = atom2.connected_atoms[0]
-                return atom2.angle_between(atom1.coords,
-                                           connected_to_atom2.coords)
-
-            def within_angle_tolerance(atom1, atom2):
+                A is atom1, B is atom2 and C is the first atom connected to
+                atom2.
                 """
-                Checks that a hydrogen bond is formed at a suitable angle, 45°
-                either side of linear.
-                """
-                return 225 > bond_angle(atom1, atom2) > 145
-
-            def valid_bond(atom1, atom2, dist):
-                """
-                Checks that two atoms forms a valid hydrogen bond.
-                """
-                if within_hbond_distance(atom1, atom2, dist) and \
-                within_angle_tolerance(atom1, atom2) and \
-                valid_atoms(atom1, atom2):
-                    return True
-                return False
+                to_a = minimum_image(coords[a] - coords[b], self.cell)
+                to_c = minimum_image(coords[c] - coords[b], self.cell)
+                num = (to_a * to_c).sum(axis=1)
+                denom = np.sqrt((to_a * to_a).sum(axis=1) * (to_c * to_c).sum(axis=1))
+                return np.degrees(np.arccos(np.clip(num / denom, -1, 1)))
 
             self.assign_neighbours()
-            frag_list = [frag['atoms'] for frag in self.fragments.values()]
-
-            counted = []
-            h_bonded = []
-            for i, mol in enumerate(frag_list):
-                for j, mol2 in enumerate(frag_list):
-                    if i != j:
-                        for atom1 in mol:
-                            for atom2 in mol2:
-                                if valid_bond(atom1, atom2, distance):
-                                    pair = sorted([atom1.index, atom2.index])
-                                    if pair not in counted:
-                                        dist = atom1.distance_to(atom2)
-                                        angle = bond_angle(atom1, atom2)
-                                        h_bonded.append(
-                                            [atom1, atom2, dist, angle])
-                                        counted.append(pair)
-
-            return h_bonded
+            coords = self.coord_array
+            atnums, status, first_connected = atom_flags(self.coords)
+
+            # position of each atom in the fragments, -1 if in none
+            frag_of = np.full(len(self.coords), -1, dtype=int)
+            place = np.zeros(len(self.coords), dtype=int)
+            for i, frag in enumerate(self.fragments.values()):
+                rows = [atom.index - 1 for atom in frag['atoms']]
+                frag_of[rows] = i
+                place[rows] = np.arange(len(rows))
+
+            # only atoms within the cutoff can be bonded, so take candidates
+            # from a neighbour search, between atoms of different fragments,
+            # each pair as both atom1, atom2 and atom2, atom1
+            i, j, dists = neighbour_pairs(coords, distance, self.cell)
+            keep = (frag_of[i] >= 0) & (frag_of[j] >= 0) & (frag_of[i] != frag_of[j])
+            i, j, dists = i[keep], j[keep], dists[keep]
+            one = np.concatenate([i, j])
+            two = np.concatenate([j, i])
+            dists = np.concatenate([dists, dists])
+
+            # atoms of the correct type, where atom2 is connected to something
+            # to measure the angle against
+            decided = np.where(status[one] != 0, status[one], status[two])
+            valid = (atnums[one] != atnums[two]) & (decided >= 0) & \
+                    (first_connected[two] >= 0)
+            one, two, dists = one[valid], two[valid], dists[valid]
+            angles = bond_angles(coords, one, two, first_connected[two])
+            # 45° either side of linear
+            valid = (225 > angles) & (angles > 145)
+            one, two, dists, angles = one[valid], two[valid], dists[valid], angles[valid]
+
+            # same order as looping over every pair of atoms of every pair of
+            # fragments, keeping the first time each pair of atoms is found
+            order = np.lexsort((place[two], place[one], frag_of[two], frag_of[one]))
+            one, two, dists, angles = one[order], two[order], dists[order], angles[order]
+            pairs = np.minimum(one, two) * len(coords) + np.maximum(one, two)
+            _, first = np.unique(pairs, return_index=True)
+            first.sort()
+
+            return [
+                [self.coords[a], self.coords[b], dist, angle]
+                for a, b, dist, angle in zip(one[first].tolist(), two[first].tolist(),
+                                             dists[first].tolist(),
+                                             angles[first].tolist())
+            ]
 
         def find_molecule_type(molecule):
             """
@@ -1121,12 +1477,13 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
             molecule1, atom1, molecule2, atom2, distance.
             """
             hbond_data = []
+            labels = self.fragment_labels()
 
             for bond in h_bonds:
                 one, two, dist, angle = bond
                 # dmso_1
-                mol_one_name = f"{self.fragments[one.mol]['name']}_{one.mol}"
-                mol_two_name = f"{self.fragments[two.mol]['name']}_{two.mol}"
+                mol_one_name = labels[one.index - 1]
+                mol_two_name = labels[two.index - 1]
 
                 group1 = find_molecule_type(mol_one_name)
                 group2 = find_molecule_type(mol_two_name)
@@ -1147,13 +1504,63 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         """
         Accepts an atom from the molecule, returning the name of the fragment containing that atom.
         """
+        keys = self.fragment_keys
+        if 0 < atom.index <= len(keys) and keys[atom.index - 1] >= 0:
+            return self.fragments[keys[atom.index - 1]]['name']
 
-        if not hasattr(self, 'fragments'):
-            self.separate()
-        for frag in self.fragments.values():
-            for a in frag['atoms']:
-                if a.index == atom.index:
-                    return frag['name']
+    def _index_fragments(self):
+        """
+        Maps each atom to the key of the fragment containing it, and each
+        fragment type to a mask of the atoms in fragments of that type. Built
+        again whenever self.fragments is replaced, or fragments are added,
+        removed or edited in place (as when grouping them together).
+        """
+        fragments = self.fragments
+        # the atom lists themselves are kept, so that they are compared by
+        # identity without an id being reused for a different list
+        stamp = [(key, frag['atoms'], len(frag['atoms']), frag['type'])
+                 for key, frag in fragments.items()]
+        index = getattr(self, '_fragment_index', None)
+        if index is not None and len(index[0]) == len(stamp) and all(
+                old[0] == new[0] and old[1] is new[1] and old[2:] == new[2:]
+                for old, new in zip(index[0], stamp)):
+            return index
+        num_atoms = len(self.coords)
+        keys = np.full(num_atoms, -1, dtype=int)
+        masks = {}
+        for key, frag in fragments.items():
+            rows = [atom.index - 1 for atom in frag['atoms']]
+            keys[rows] = key
+            if frag['type'] not in masks:
+                masks[frag['type']] = np.zeros(num_atoms, dtype=bool)
+            masks[frag['type']][rows] = True
+        self._fragment_index = (stamp, keys, masks)
+        return self._fragment_index
+
+    @property
+    def fragment_keys(self):
+        """
+        Array of the key in self.fragments of the fragment containing each
+        atom, in the order of self.coords. -1 for atoms in no fragment.
+        """
+        return self._index_fragments()[1]
+
+    @property
+    def category_masks(self):
+        """
+        Dictionary of fragment type (cation, anion, neutral...) to a boolean
+        array, True for each atom of self.coords in a fragment of that type
+        """
+        return self._index_fragments()[2]
+
+    def fragment_labels(self):
+        """
+        Returns a label of the form name_key for each atom in self.coords,
+        i.e. 'water_3', or None for atoms that are in no fragment
+        """
+        fragments = self.fragments
+        names = {key: f"{frag['name']}_{key}" for key, frag in fragments.items()}
+        return [names.get(key) for key in self.fragment_keys.tolist()]
 
     @classmethod
     def get_charge(cls, fragment_dict):
@@ -1181,61 +1588,75 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
     def check_user_additions(self):
         """
         Reads ~/.config/autochem/molecules.txt for 
-        any additional molecules
+        any additional molecules. The file is only parsed again if its
+        modification time or size has changed since it was last read, by
+        any instance in this process.
         """
         confdir = os.path.expanduser('~/.config/autochem/')
-        if not os.path.exists(confdir):
-            os.makedirs(confdir, exist_ok=True)
         userfile = os.path.join(confdir, 'molecules.txt')
-        # CREATE TEMPLATE FILE IF NOT EXISTS
-        if not os.path.isfile(userfile):
+        try:
+            stat = os.stat(userfile)
+        except FileNotFoundError:
+            # CREATE TEMPLATE FILE IF NOT EXISTS
+            os.makedirs(confdir, exist_ok=True)
             open(userfile, 'w+').writelines(self.mol_template())
-        # READ USER MOLECULES IF FILE EXISTS
-        else:
-            name = False
-            charge = False
-            mult = False
-            atoms = False
-            with open(userfile, 'r+') as f:
-                for line in f:
-                    # GET RID OF EXTRA SPACES AND ANYTHING AFTER A HASH
-                    line = line.strip()
-                    line = line.split('#')[0]
-                    # SPLIT INTO DESCRIPTOR AND VALUE
-                    line = line.split('=')
-                    # FIND IF ONE OF THE DESCRIPTORS AND ASSIGN VALUE
-                    if 'name' in line[0]:
-                        name = line[1]
-                    elif 'charge' in line[0]:
-                        charge = int(line[1])
-                    elif 'multiplicity' in line[0]:
-                        mult = int(line[1])
-                    elif 'atoms' in line[0]:
-                        atoms = line[1].split(',')
-                        for i in range(len(atoms)):
-                            atoms[i] = atoms[i].strip()
-
-                    # ONCE ALL DEFINED ADD TO DICTIONARY
-                    if not name is False and not charge is False:
-                        if not mult is False and not atoms is False:
-                            if charge == 0 and mult == 1:
-                                Molecule.Neutrals[name] = atoms
-                            elif charge == -1 and mult == 1:
-                                Molecule.Anions[name] = atoms
-                            if charge == 1 and mult == 1:
-                                Molecule.Cations[name] = atoms
-                            if charge == 0 and mult == 2:
-                                Molecule.Radicals[name] = atoms
-                            if charge == -1 and mult == 2:
-                                Molecule.Anion_radicals[name] = atoms
-                            if charge == 1 and mult == 2:
-                                Molecule.Cation_radicals[name] = atoms
-                            if charge == 2 and mult == 1:
-                                Molecule.Dications[name] = atoms
-                            if charge == 2 and mult == 2:
-                                Molecule.Dication_radicals[name] = atoms
-                            # RESET VARS
-                            name = False
-                            charge = False
-                            mult = False
-                            atoms = False
+            return
+        stamp = (userfile, stat.st_mtime_ns, stat.st_size)
+        if Molecule._user_additions_stamp == stamp:
+            return
+        # READ USER MOLECULES, FEEDING THEM INTO THE DATABASE
+        for name, charge, mult, atoms in Molecule.read_user_additions(userfile):
+            for attr, _, db_charge, db_mult in Molecule.categories:
+                if (charge, mult) == (db_charge, db_mult):
+                    getattr(Molecule, attr)[name] = atoms
+        Molecule.invalidate_db_index()
+        Molecule._user_additions_stamp = stamp
+
+    @classmethod
+    def invalidate_user_additions(cls):
+        """
+        Forces ~/.config/autochem/molecules.txt to be read again when the
+        next molecule is created
+        """
+        Molecule._user_additions_stamp = None
+
+    @staticmethod
+    def read_user_additions(userfile):
+        """
+        Parses a file of user-defined molecules, laid out as described in
+        `mol_template`, returning a list of (name, charge, multiplicity, atoms)
+        """
+        molecules = []
+        name = False
+        charge = False
+        mult = False
+        atoms = False
+        with open(userfile, 'r') as f:
+            for line in f:
+                # GET RID OF EXTRA SPACES AND ANYTHING AFTER A HASH
+                line = line.strip()
+                line = line.split('#')[0]
+                # SPLIT INTO DESCRIPTOR AND VALUE
+                line = line.split('=')
+                # FIND IF ONE OF THE DESCRIPTORS AND ASSIGN VALUE
+                if 'name' in line[0]:
+                    name = line[1]
+                elif 'charge' in line[0]:
+                    charge = int(line[1])
+                elif 'multiplicity' in line[0]:
+                    mult = int(line[1])
+                elif 'atoms' in line[0]:
+                    atoms = line[1].split(',')
+                    for i in range(len(atoms)):
+                        atoms[i] = atoms[i].strip()
+
+                # ONCE ALL DEFINED ADD TO LIST
+                if not name is False and not charge is False:
+                    if not mult is False and not atoms is False:
+                        molecules.append((name, charge, mult, atoms))
+                        # RESET VARS
+                        name = False
+                        charge = False
+                        mult = False
+                        atoms = False
+        return molecules
@@ -0,0 +1,283 @@
+import numpy as np
+
+from .graph import connected_components
+
+__all__ = ["as_cell", "bonded_pairs", "make_whole", "minimum_image", "neighbour_pairs"]
+
+# offsets to the neighbouring cells, keeping only one of each +/- pair so that
+# every pair of cells is visited once. (0, 0, 0) comes first.
+_HALF_SHELL = [(0, 0, 0)] + [
+    (i, j, k)
+    for i in (-1, 0, 1)
+    for j in (-1, 0, 1)
+    for k in (-1, 0, 1)
+    if (i, j, k) > (0, 0, 0)
+]
+
+
+def _expand(starts, counts):
+    """
+    For atoms whose neighbours lie in a slice [start, start + count) of the
+    sorted atom list, returns the position in the list of every neighbour,
+    along with the position of the atom that neighbour belongs to
+    """
+    total = counts.sum()
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(starts, counts) + offsets
+
+
+def _candidate_pairs(coords, cell_size):
+    """
+    Cell list search. Atoms are binned into cubic cells with sides of
+    `cell_size`, and only atoms in the same or adjacent cells are paired up.
+    Returns two arrays of atom indices, i and j, with every unordered pair
+    appearing once.
+    """
+    num_atoms = len(coords)
+    if num_atoms < 2:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    origin = coords.min(axis=0)
+    cells = np.floor((coords - origin) / cell_size).astype(np.int64)
+    shape = cells.max(axis=0) + 1
+    # flatten cell coordinates into one key per atom
+    keys = (cells[:, 0] * shape[1] + cells[:, 1]) * shape[2] + cells[:, 2]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    i_list, j_list = [], []
+    for offset in _HALF_SHELL:
+        neighbour = cells + offset
+        inside = np.all((neighbour >= 0) & (neighbour < shape), axis=1)
+        atoms = np.nonzero(inside)[0]
+        neighbour = neighbour[inside]
+        neighbour_keys = (neighbour[:, 0] * shape[1] +
+                          neighbour[:, 1]) * shape[2] + neighbour[:, 2]
+        starts = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        ends = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+        owner, position = _expand(starts, ends - starts)
+        i = atoms[owner]
+        j = order[position]
+        if offset == (0, 0, 0):
+            # same cell- keep each pair once, and never pair an atom with itself
+            keep = i < j
+            i, j = i[keep], j[keep]
+        i_list.append(i)
+        j_list.append(j)
+    return np.concatenate(i_list), np.concatenate(j_list)
+
+
+def as_cell(cell):
+    """
+    Returns a periodic cell as a 3 x 3 array with one lattice vector per
+    row. Accepts the three box lengths of an orthorhombic cell, or the three
+    lattice vectors of a triclinic cell. None is passed through, meaning no
+    periodicity.
+    """
+    if cell is None:
+        return None
+    cell = np.asarray(cell, dtype=float)
+    if cell.shape == (3,):
+        cell = np.diag(cell)
+    if cell.shape != (3, 3) or abs(np.linalg.det(cell)) < 1e-8:
+        raise ValueError(f"as_cell: Expected three box lengths or three lattice vectors, got {cell.tolist()}")
+    return cell
+
+
+def _widths(cell):
+    """Distance between each pair of opposite faces of the cell"""
+    volume = abs(np.linalg.det(cell))
+    return np.array([
+        volume / np.linalg.norm(np.cross(cell[(k + 1) % 3], cell[(k + 2) % 3]))
+        for k in range(3)
+    ])
+
+
+def _neighbour_shifts(cell):
+    """The 27 lattice translations to the cell and its neighbours, as a (27, 3) array"""
+    steps = np.array([-1, 0, 1])
+    grid = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+    return grid @ cell
+
+
+def minimum_image(vectors, cell):
+    """
+    Returns the shortest periodic image of each of an (..., 3) array of
+    vectors between atoms. Rounding the fractional coordinates is exact for
+    orthorhombic cells, and in any cell for vectors shorter than half its
+    smallest width, such as the pairs found by |neighbour_pairs|. In a
+    triclinic cell, longer vectors can have a shorter image than the
+    rounded one, so for those the images in the 26 neighbouring cells are
+    compared as well, which is exact unless the cell is more skewed than a
+    reduced cell (as MD codes write them).
+    """
+    if cell is None:
+        return vectors
+    frac = vectors @ np.linalg.inv(cell)
+    frac -= np.round(frac)
+    wrapped = frac @ cell
+    if not np.any(cell - np.diag(np.diagonal(cell))):
+        return wrapped
+    flat = wrapped.reshape(-1, 3)
+    half_width = _widths(cell).min() / 2
+    # rows of flat, in blocks to bound the memory of 27 images of each
+    long = np.nonzero((flat * flat).sum(axis=1) >= half_width * half_width)[0]
+    shifts = _neighbour_shifts(cell)
+    for start in range(0, len(long), 2 ** 16):
+        rows = long[start:start + 2 ** 16]
+        images = flat[rows, None, :] + shifts
+        best = (images * images).sum(axis=-1).argmin(axis=1)
+        flat[rows] = images[np.arange(len(rows)), best]
+    return flat.reshape(wrapped.shape)
+
+
+def _periodic_candidate_pairs(coords, cell, cutoff):
+    """
+    Cell list search in fractional coordinates, with cells wrapping around
+    the periodic boundaries. Returns two arrays of atom indices, i and j,
+    with every unordered pair appearing once.
+    """
+    widths = _widths(cell)
+    if cutoff > widths.min() / 2:
+        raise ValueError(
+            f"Cutoff of {cutoff} Å is more than half the smallest cell width, "
+            f"{widths.min():.3f} Å")
+    num_atoms = len(coords)
+    if num_atoms < 2:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    shape = np.maximum(np.floor(widths / cutoff).astype(np.int64), 1)
+    frac = coords @ np.linalg.inv(cell)
+    cells = np.floor((frac - np.floor(frac)) * shape).astype(np.int64) % shape
+    keys = (cells[:, 0] * shape[1] + cells[:, 1]) * shape[2] + cells[:, 2]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    i_list, j_list = [], []
+    for offset in _HALF_SHELL:
+        neighbour = (cells + offset) % shape
+        neighbour_keys = (neighbour[:, 0] * shape[1] +
+                          neighbour[:, 1]) * shape[2] + neighbour[:, 2]
+        starts = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        ends = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+        owner, position = _expand(starts, ends - starts)
+        i, j = owner, order[position]
+        if offset == (0, 0, 0):
+            keep = i < j
+            i, j = i[keep], j[keep]
+        i_list.append(i)
+        j_list.append(j)
+    i, j = np.concatenate(i_list), np.concatenate(j_list)
+    if shape.min() >= 3:
+        return i, j
+    # with fewer than three cells along an axis, offsets wrap round onto the
+    # same cell, so the same pair can be found more than once
+    keep = i != j
+    i, j = np.minimum(i[keep], j[keep]), np.maximum(i[keep], j[keep])
+    pairs = np.unique(i * num_atoms + j)
+    return pairs // num_atoms, pairs % num_atoms
+
+
+def _candidates(coords, cutoff, cell):
+    if cell is None:
+        return _candidate_pairs(coords, cutoff)
+    return _periodic_candidate_pairs(coords, cell, cutoff)
+
+
+def _pair_distances(coords, i, j, cell=None):
+    diff = minimum_image(coords[i] - coords[j], cell)
+    return np.sqrt((diff * diff).sum(axis=1))
+
+
+def _sorted_pairs(i, j, dists):
+    """Returns pairs as i < j, sorted by i then j"""
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    order = np.lexsort((j, i))
+    return i[order], j[order], dists[order]
+
+
+def neighbour_pairs(coords, cutoff, cell=None):
+    """
+    Finds every pair of points closer together than `cutoff`, in near-linear
+    time using a cell list. Returns three arrays, i, j and distance, with
+    i < j, sorted by i then j. If a periodic `cell` is given (see
+    |as_cell|), distances are to the nearest periodic image.
+
+    Usage:
+        >>> i, j, dists = neighbour_pairs(mol.coord_array, 2.0)
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    if cutoff <= 0:
+        empty = np.empty(0, dtype=int)
+        return empty, empty, np.empty(0)
+    i, j = _candidates(coords, cutoff, as_cell(cell))
+    dists = _pair_distances(coords, i, j, as_cell(cell))
+    keep = dists < cutoff
+    return _sorted_pairs(i[keep], j[keep], dists[keep])
+
+
+def bonded_pairs(coords, radii, cell=None):
+    """
+    Finds every pair of atoms closer together than the sum of their radii,
+    i.e. the van der Waals radii used by |Molecule| to decide connectivity.
+    The cell list is sized on the largest possible sum of two radii. Returns
+    three arrays, i, j and distance, with i < j, sorted by i then j. If a
+    periodic `cell` is given, distances are to the nearest periodic image.
+
+    Usage:
+        >>> radii = PT.vdw_radii[mol.atnums]
+        >>> i, j, dists = bonded_pairs(mol.coord_array, radii)
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=float)
+    cutoff = 2 * radii.max() if len(radii) > 0 else 0.0
+    if cutoff <= 0:
+        empty = np.empty(0, dtype=int)
+        return empty, empty, np.empty(0)
+    i, j = _candidates(coords, cutoff, as_cell(cell))
+    dists = _pair_distances(coords, i, j, as_cell(cell))
+    keep = dists < radii[i] + radii[j]
+    return _sorted_pairs(i[keep], j[keep], dists[keep])
+
+
+def make_whole(coords, cell, i, j):
+    """
+    Returns a copy of `coords` with every molecule split across the periodic
+    boundaries made whole. Atoms bonded by the pairs i[k]--j[k] are moved to
+    the periodic image nearest to the atom they are bonded to, working
+    outwards from the lowest numbered atom of each molecule, which stays
+    where it is. All atoms the same number of bonds from the first atom are
+    moved together.
+    """
+    coords = np.array(coords, dtype=float).reshape(-1, 3)
+    cell = as_cell(cell)
+    num_atoms = len(coords)
+    if cell is None or num_atoms == 0:
+        return coords
+    i, j = np.asarray(i, dtype=int), np.asarray(j, dtype=int)
+    # adjacency in compressed rows: neighbours of atom a are
+    # targets[first[a]:first[a + 1]]
+    sources = np.concatenate([i, j])
+    targets = np.concatenate([j, i])
+    order = np.argsort(sources, kind="stable")
+    targets = targets[order]
+    first = np.searchsorted(sources[order], np.arange(num_atoms + 1))
+
+    # breadth-first search from the first atom of every molecule at once
+    labels = connected_components(num_atoms, i, j)
+    _, frontier = np.unique(labels, return_index=True)
+    placed = np.zeros(num_atoms, dtype=bool)
+    placed[frontier] = True
+    whole = coords.copy()
+    while len(frontier):
+        owner, position = _expand(first[frontier], first[frontier + 1] - first[frontier])
+        parents, children = frontier[owner], targets[position]
+        new = ~placed[children]
+        parents, children = parents[new], children[new]
+        # an atom bonded to two atoms of the frontier is placed once
+        children, unique = np.unique(children, return_index=True)
+        parents = parents[unique]
+        whole[children] = whole[parents] + minimum_image(
+            coords[children] - coords[parents], cell)
+        placed[children] = True
+        frontier = children
+    return whole
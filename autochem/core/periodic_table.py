@@ -1,3 +1,5 @@
+import numpy as np
+
 __all__ = ['PeriodicTable']
 
 class PeriodicTable:
@@ -126,15 +128,28 @@ class PeriodicTable:
     ptable[117] = ['Ts', 294.00000, 2.00 ,  8, 0.000]
     ptable[118] = ['Og', 294.00000, 2.00 ,  8, 0.000]
                                                
+    # lookup tables built once from ptable. Property arrays are indexed by
+    # atomic number, so properties of many atoms can be gathered at once:
+    # PeriodicTable.vdw_radii[atnums]
+    symbol_to_atnum = {val[0]: key for key, val in ptable.items()}
+    masses = np.array([val[1] for val in ptable.values()])
+    radii = np.array([val[2] for val in ptable.values()])
+    connectors = np.array([val[3] for val in ptable.values()])
+    vdw_radii = np.array([val[4] for val in ptable.values()])
+
     def __init__(self): 
         raise AttributeError('The PeriodicTable class cannot be instantiated.')
 
     @classmethod
     def get_atnum(cls, atom):
         """Converts symbol to atomic number"""
-        for key in cls.ptable.keys():
-            if cls.ptable[key][0] == atom.symbol.capitalize():
-                return key
+        return cls.symbol_to_atnum.get(atom.symbol.capitalize())
+
+    @classmethod
+    def get_atnums(cls, symbols):
+        """Converts an iterable of symbols to an array of atomic numbers"""
+        lookup = cls.symbol_to_atnum
+        return np.array([lookup[sym.capitalize()] for sym in symbols], dtype=int)
 
     @classmethod
     def get_symbol(cls, atom):
@@ -144,24 +159,19 @@ class PeriodicTable:
     @classmethod
     def get_radius(cls, atom):
         """Returns atomic radius for a given element"""
-        atnum = cls.get_atnum(atom)
-        return float(cls.ptable[atom.atnum][2])
+        return float(cls.radii[atom.atnum])
     
     @classmethod
     def get_mass(cls, atom):
         """Returns atomic mass for a given element"""
-        atnum = cls.get_atnum(atom)
-        return float(cls.ptable[atom.atnum][1])
+        return float(cls.masses[atom.atnum])
 
     @classmethod
     def get_connectors(cls, atom):
         """Returns number of possible attachments to a given element"""
-        atnum = cls.get_atnum(atom)
-        return int(cls.ptable[atom.atnum][-2])
+        return int(cls.connectors[atom.atnum])
     
     @classmethod
     def get_vdw(cls, atom):
         """Returns van der waals radius of a given element"""
-        atnum = cls.get_atnum(atom)
-        return float(cls.ptable[atom.atnum][-1])
-        
+        return float(cls.vdw_radii[atom.atnum])
@@ -0,0 +1,230 @@
+from .molecule import Molecule
+from .neighbours import minimum_image, neighbour_pairs
+from .periodic_table import PeriodicTable as PT
+from .utils import parallel_map
+
+import os
+import numpy as np
+
+__all__ = ['RDF', 'rdf_from_files', 'select_positions']
+
+
+def select_positions(mol, selection):
+    """
+    Picks out the points of a |Molecule| used for one side of an RDF.
+    Returns positions as an (M, 3) array, the fragment key of each point
+    (-1 for atoms in no fragment) and an id for each point, which is the same
+    for the same point however it was selected. `selection` is one of
+
+        'O'         every atom of an element
+        'water'     centre of each fragment of a name, or of a type such as
+                    'cation' or 'anion'
+        'water:O'   atoms of an element in fragments of a name or type
+
+    For periodic systems, fragment centres are taken with each atom at its
+    nearest image to the first atom of the fragment.
+    """
+    coords = mol.coord_array
+    if selection in PT.symbol_to_atnum:
+        rows = np.nonzero(mol.atnums == PT.symbol_to_atnum[selection])[0]
+        return coords[rows], mol.fragment_keys[rows], rows
+
+    frag_sel, _, element = selection.partition(':')
+    keys = [key for key, frag in mol.fragments.items()
+            if frag_sel in (frag['name'], frag['type'])]
+    if element:
+        if element not in PT.symbol_to_atnum:
+            raise ValueError(f'select_positions: Unknown element {element!r} in {selection!r}')
+        labels = mol.fragment_keys
+        rows = np.nonzero(np.isin(labels, keys)
+                          & (mol.atnums == PT.symbol_to_atnum[element]))[0]
+        return coords[rows], labels[rows], rows
+
+    centres = np.empty((len(keys), 3))
+    for pos, key in enumerate(keys):
+        rows = [atom.index - 1 for atom in mol.fragments[key]['atoms']]
+        first = coords[rows[0]]
+        centres[pos] = first + minimum_image(coords[rows] - first, mol.cell).mean(axis=0)
+    keys = np.array(keys, dtype=int)
+    return centres, keys, len(coords) + keys
+
+
+class RDF:
+    """
+    Radial distribution function and coordination numbers between two
+    selections of points (see |select_positions|), accumulated over any
+    number of structures, such as clusters or frames of a |Trajectory|.
+    Each structure adds to a histogram of pair distances up to `r_max` Å, in
+    bins of `bin_width` Å; pairs are found with a cell list, so each
+    structure takes near-linear time. With `intermolecular`, pairs within
+    the same fragment are not counted.
+
+    Histograms of the same selections and bins can be added together, so
+    structures can be shared out between processes and the results summed
+    (see |rdf_from_files|).
+
+    Instance Attributes
+    -------------------
+    edges: np.ndarray
+        edges of the distance bins, from 0 to r_max
+    counts: np.ndarray
+        number of pairs in each bin, over all structures, counted from both
+        ends when `second` is the same as `first`
+    structures: int
+        number of structures added
+    num_first: int
+        number of `first` points, over all structures
+    pair_density: float or None
+        sum, over all structures, of the number of pairs that could be
+        counted divided by the volume. None if a structure was added without
+        a volume, since g(r) then cannot be normalised.
+
+    Usage:
+        >>> rdf = RDF('c1mim', 'bf4', r_max=12.0)
+        >>> for mol in Trajectory(using='md.xyz', cell=[40, 40, 40]):
+        ...     rdf.add(mol)
+        >>> rdf.r, rdf.g()
+        >>> rdf.coordination_number(6.5)
+    """
+
+    def __init__(self, first, second=None, r_max=10.0, bin_width=0.05, intermolecular=True):
+        self.first = first
+        self.second = first if second is None else second
+        self.r_max = float(r_max)
+        self.bin_width = float(bin_width)
+        self.intermolecular = intermolecular
+        num_bins = int(np.ceil(self.r_max / self.bin_width))
+        self.edges = np.arange(num_bins + 1) * self.bin_width
+        self.edges[-1] = self.r_max
+        self.counts = np.zeros(num_bins)
+        self.structures = 0
+        self.num_first = 0
+        self.pair_density = 0.0
+
+    def __repr__(self):
+        return (f'RDF of {self.first}-{self.second} over {self.structures} structures, '
+                f'0-{self.r_max} Å')
+
+    @property
+    def r(self):
+        """Centre of each distance bin"""
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    def _compatible(self, other):
+        return ((self.first, self.second, self.intermolecular)
+                == (other.first, other.second, other.intermolecular)
+                and np.array_equal(self.edges, other.edges))
+
+    def __iadd__(self, other):
+        if not self._compatible(other):
+            raise ValueError('RDF: Can only add RDFs of the same selections and bins')
+        self.counts += other.counts
+        self.structures += other.structures
+        self.num_first += other.num_first
+        if self.pair_density is None or other.pair_density is None:
+            self.pair_density = None
+        else:
+            self.pair_density += other.pair_density
+        return self
+
+    def add(self, mol, volume=None):
+        """
+        Adds the pair distances of one |Molecule| to the histogram. The
+        volume for normalising g(r) is that of the molecule's periodic cell,
+        or `volume` in Å^3 for a cluster; without either, only coordination
+        numbers are available.
+        """
+        pos_a, labels_a, ids_a = select_positions(mol, self.first)
+        same = self.second == self.first
+        if same:
+            pos_b, labels_b, ids_b = pos_a, labels_a, ids_a
+            i, j, dists = neighbour_pairs(pos_a, self.r_max, mol.cell)
+        else:
+            pos_b, labels_b, ids_b = select_positions(mol, self.second)
+            i, j, dists = neighbour_pairs(np.concatenate([pos_a, pos_b]), self.r_max, mol.cell)
+            cross = (i < len(pos_a)) & (j >= len(pos_a))
+            i, j, dists = i[cross], j[cross] - len(pos_a), dists[cross]
+
+        # the same point selected twice, or two points in one fragment
+        excluded = ids_a[i] == ids_b[j]
+        if self.intermolecular:
+            excluded |= (labels_a[i] == labels_b[j]) & (labels_a[i] >= 0)
+        bins = np.minimum((dists[~excluded] / self.bin_width).astype(int), len(self.counts) - 1)
+        hist = np.bincount(bins, minlength=len(self.counts))
+        self.counts += 2 * hist if same else hist
+        self.structures += 1
+        self.num_first += len(pos_a)
+
+        if mol.cell is not None:
+            volume = abs(np.linalg.det(mol.cell))
+        if volume is None or self.pair_density is None:
+            self.pair_density = None
+            return self
+        # every pair that could have been counted, at any distance
+        shared = np.intersect1d(ids_a, ids_b)
+        num_excluded = len(shared)
+        if self.intermolecular:
+            keys, count_a = np.unique(labels_a[labels_a >= 0], return_counts=True)
+            count_b = np.array([np.count_nonzero(labels_b == key) for key in keys.tolist()], dtype=int)
+            num_excluded += int((count_a * count_b).sum())
+            # shared points in a fragment are already counted as intramolecular
+            shared_labels = labels_a[np.isin(ids_a, shared)]
+            num_excluded -= np.count_nonzero(shared_labels >= 0)
+        self.pair_density += (len(pos_a) * len(pos_b) - num_excluded) / volume
+        return self
+
+    def g(self):
+        """
+        Returns g(r) at the centre of each bin: the number of pairs found at
+        each distance, relative to the number expected for points spread
+        evenly through the volume
+        """
+        if not self.pair_density:
+            raise ValueError('RDF.g: Needs a cell or volume for every structure added')
+        shells = 4 / 3 * np.pi * np.diff(self.edges ** 3)
+        return self.counts / (self.pair_density * shells)
+
+    def coordination_number(self, cutoff=None):
+        """
+        Average number of `second` points within each distance of a `first`
+        point. Returns the running coordination number at the upper edge of
+        every bin, or the value at `cutoff` (interpolated between bin edges),
+        usually the first minimum of g(r).
+        """
+        if not self.num_first:
+            raise ValueError('RDF.coordination_number: No structures added')
+        running = np.concatenate([[0.0], np.cumsum(self.counts)]) / self.num_first
+        if cutoff is None:
+            return running[1:]
+        if cutoff > self.r_max:
+            raise ValueError(f'RDF.coordination_number: cutoff {cutoff} is past r_max {self.r_max}')
+        return float(np.interp(cutoff, self.edges, running))
+
+
+def _rdf_of_files(args):
+    files, first, second, kwargs, cell, volume = args
+    rdf = RDF(first, second, **kwargs)
+    for file in files:
+        rdf.add(Molecule(using=file, cell=cell), volume=volume)
+    return rdf
+
+
+def rdf_from_files(files, first, second=None, cell=None, volume=None, jobs=1, **kwargs):
+    """
+    Accumulates an |RDF| over many xyz files, one structure each. The files
+    are shared out between a pool of `jobs` processes (serially by default,
+    0 or None for every core), each building its own histogram, and the
+    histograms are summed at the end. `cell` or `volume` applies to every
+    file; other keyword arguments are passed to |RDF|.
+
+    >>> rdf = rdf_from_files(glob.glob('clusters/*.xyz'), 'c1mim', 'water:O', volume=8000)
+    """
+    files = list(files)
+    # one histogram per chunk of files, about four chunks per worker
+    num_chunks = 1 if jobs == 1 else 4 * (jobs or os.cpu_count() or 1)
+    chunks = [files[n::num_chunks] for n in range(min(len(files), num_chunks))]
+    total = RDF(first, second, **kwargs)
+    for rdf in parallel_map(_rdf_of_files, [(chunk, first, second, kwargs, cell, volume)
+                                            for chunk in chunks], jobs=jobs, chunksize=1):
+        total += rdf
+    return total
@@ -0,0 +1,221 @@
+import numpy as np
+
+__all__ = ["canonical_coords", "element_order", "fit_deviations", "fragment_rows",
+           "kabsch_rmsd", "matched_order", "matched_rmsd", "rmsd_matrix"]
+
+
+def _centred(coords):
+    coords = np.asarray(coords, dtype=float)
+    return coords - coords.mean(axis=-2, keepdims=True)
+
+
+def kabsch_rmsd(reference, others):
+    """
+    Root mean square deviation between `reference`, an (N, 3) array, and
+    each of `others`, an (M, N, 3) array (or a single (N, 3) array), after
+    moving each onto the reference with the rotation that fits them best
+    (the Kabsch algorithm). Atoms must already be in matching order. All M
+    structures are aligned at once, with one batched singular value
+    decomposition.
+
+    >>> kabsch_rmsd(mol1.coord_array, mol2.coord_array)
+    """
+    reference = _centred(reference)
+    others = np.asarray(others, dtype=float)
+    single = others.ndim == 2
+    others = _centred(others.reshape(-1, *reference.shape))
+    # covariance matrix of each structure with the reference
+    covariance = np.einsum("mni,nj->mij", others, reference)
+    u, singular, vt = np.linalg.svd(covariance)
+    # flip the smallest axis wherever the best fit would be a reflection
+    sign = np.sign(np.linalg.det(u) * np.linalg.det(vt))
+    singular[:, -1] *= np.where(sign == 0, 1, sign)
+    squared = ((others * others).sum(axis=(1, 2)) + (reference * reference).sum()
+               - 2 * singular.sum(axis=1))
+    rmsd = np.sqrt(np.maximum(squared, 0.0) / len(reference))
+    return rmsd[0] if single else rmsd
+
+
+def _rotation(reference, other):
+    """
+    Rotation matrix R that best fits centred `other` @ R onto centred
+    `reference`, or a stack of them if `other` is a stack of structures
+    """
+    u, _, vt = np.linalg.svd(np.swapaxes(other, -1, -2) @ reference)
+    sign = np.sign(np.linalg.det(u) * np.linalg.det(vt))
+    u[..., :, -1] *= np.where(sign == 0, 1.0, sign)[..., None]
+    return u @ vt
+
+
+def fit_deviations(reference, others):
+    """
+    Distance of each atom of `others`, an (M, N, 3) array (or a single
+    (N, 3) array), from the same atom of `reference` once moved onto it
+    with the best fitting rotation, as for |kabsch_rmsd|. Returns an (M, N)
+    array (or N).
+    """
+    reference = _centred(reference)
+    others = np.asarray(others, dtype=float)
+    single = others.ndim == 2
+    others = _centred(others.reshape(-1, *reference.shape))
+    moved = others @ _rotation(reference, others)
+    deviations = np.linalg.norm(moved - reference, axis=-1)
+    return deviations[0] if single else deviations
+
+
+def _greedy_match(reference, moved):
+    """
+    Pairs up each reference atom with a different moved atom, closest pairs
+    first. Returns the index of the moved atom paired with each reference atom.
+    """
+    diff = reference[:, None, :] - moved[None, :, :]
+    dists = (diff * diff).sum(axis=2)
+    match = np.full(len(reference), -1)
+    used = np.zeros(len(moved), dtype=bool)
+    for pair in np.argsort(dists, axis=None).tolist():
+        ref, mov = divmod(pair, len(moved))
+        if match[ref] < 0 and not used[mov]:
+            match[ref] = mov
+            used[mov] = True
+    return match
+
+
+def _axes_rotations(reference, other):
+    """
+    The four rotations that line up the principal axes of centred `other`
+    with those of centred `reference`, one for each way round the axes can
+    point
+    """
+    _, ref_axes = np.linalg.eigh(reference.T @ reference)
+    _, other_axes = np.linalg.eigh(other.T @ other)
+    # flip the last axis if needed, so that none of them is a reflection
+    flip = np.sign(np.linalg.det(other_axes) * np.linalg.det(ref_axes)) or 1.0
+    return [other_axes @ np.diag([a, b, a * b * flip]) @ ref_axes.T
+            for a, b in ([1, 1], [1, -1], [-1, 1], [-1, -1])]
+
+
+def matched_order(reference, other, groups, iterations=3, axes=False):
+    """
+    Pairs up the atoms of two (N, 3) structures whose atoms may be listed in
+    a different order within each group, e.g. the hydrogens of a methyl
+    group, or two water molecules swapped over. `groups` labels the atoms
+    that may be swapped with each other. The structures are aligned, each
+    atom is paired with the nearest atom of its group in the other
+    structure, and the two steps are repeated until the pairing stops
+    changing, starting from the order given. A wrong first guess can get
+    stuck on a near symmetric fit, such as the two oxygens of a carboxylic
+    acid swapped over; with `axes`, the search is also started from each
+    way of lining up the principal axes of the two structures, and the
+    pairing with the lowest RMSD is kept. That is five times the work, so
+    is best kept for single molecules. Returns the index of the atom of
+    `other` paired with each atom of `reference`.
+    """
+    reference, other = _centred(reference), _centred(other)
+    groups = np.asarray(groups)
+    members = [np.nonzero(groups == group)[0] for group in np.unique(groups)]
+    members = [rows for rows in members if len(rows) > 1]
+    identity = np.arange(len(reference))
+    if not members:
+        return identity
+    rotations = [_rotation(reference, other)]
+    if axes:
+        rotations += _axes_rotations(reference, other)
+    best, best_rmsd = identity, np.inf
+    for rotation in rotations:
+        order = identity
+        for _ in range(iterations):
+            moved = other @ rotation
+            new = order.copy()
+            for rows in members:
+                new[rows] = rows[_greedy_match(reference[rows], moved[rows])]
+            if np.array_equal(new, order):
+                break
+            order = new
+            rotation = _rotation(reference, other[order])
+        if len(rotations) == 1:
+            return order
+        rmsd = kabsch_rmsd(reference, other[order])
+        if rmsd < best_rmsd:
+            best, best_rmsd = order, rmsd
+    return best
+
+
+def matched_rmsd(reference, other, groups, iterations=3):
+    """
+    Kabsch RMSD between two (N, 3) structures after pairing up their atoms
+    within each group with |matched_order|
+    """
+    order = matched_order(reference, other, groups, iterations)
+    return kabsch_rmsd(reference, np.asarray(other, dtype=float)[order])
+
+
+def rmsd_matrix(structures):
+    """
+    Returns an M x M array of the Kabsch RMSD between every pair of an
+    (M, N, 3) array of structures, with atoms in matching order
+    """
+    structures = np.asarray(structures, dtype=float)
+    matrix = np.zeros((len(structures), len(structures)))
+    for m in range(len(structures) - 1):
+        matrix[m, m + 1:] = kabsch_rmsd(structures[m], structures[m + 1:])
+        matrix[m + 1:, m] = matrix[m, m + 1:]
+    return matrix
+
+
+def element_order(coords, atnums):
+    """
+    Order of a group of atoms, given by an (N, 3) array of coordinates and
+    their atomic numbers, by element, then by distance from their centre
+    """
+    coords = np.asarray(coords, dtype=float)
+    from_centre = np.linalg.norm(coords - coords.mean(axis=0), axis=1)
+    return np.lexsort((from_centre, atnums))
+
+
+def fragment_rows(mol, frag):
+    """
+    Rows of the atoms of a fragment of a |Molecule|, ordered by
+    |element_order|. This is a starting guess at lining up the atoms of two
+    configurations: atoms at about the same distance, such as the hydrogens
+    of a methyl group, can come out in either order, so pair them up with
+    |matched_order| where it matters.
+    """
+    rows = np.array([atom.index - 1 for atom in frag["atoms"]], dtype=int)
+    return rows[element_order(mol.coord_array[rows], mol.atnums[rows])]
+
+
+def canonical_coords(mol):
+    """
+    Reorders the atoms of a |Molecule| so that two configurations of the
+    same system can be compared atom by atom, whatever order their xyz files
+    list the atoms in. Fragments are ordered by name, then by distance of
+    their centre from the centre of the system. Atoms within each fragment
+    are ordered by |fragment_rows|. Atoms in no known fragment come last,
+    ordered by element, then by distance from the centre of the system.
+    Returns a key describing the composition, which must match for two
+    configurations to be compared, the reordered (N, 3) array of
+    coordinates, and a label for each atom that is the same for atoms of the
+    same element in fragments of the same name, or of the same element in no
+    fragment, for use with |matched_rmsd|.
+    """
+    coords = mol.coord_array
+    atnums = mol.atnums
+    centre = coords.mean(axis=0)
+    from_centre = np.linalg.norm(coords - centre, axis=1)
+    frags = []
+    for frag in mol.fragments.values():
+        rows = fragment_rows(mol, frag)
+        frag_centre = coords[rows].mean(axis=0)
+        frags.append((frag["name"], np.linalg.norm(frag_centre - centre), rows))
+    frags.sort(key=lambda frag: (frag[0], frag[1]))
+    names = [frag[0] for frag in frags]
+    unassigned = np.nonzero(mol.fragment_keys < 0)[0]
+    unassigned = unassigned[np.lexsort((from_centre[unassigned], atnums[unassigned]))]
+    rows = np.concatenate([frag[2] for frag in frags] + [unassigned]).astype(int)
+    key = (tuple(names), len(unassigned), tuple(atnums[rows].tolist()))
+    # atoms in no fragment share one label, so are grouped by element only
+    frag_labels = np.concatenate(
+        [np.full(len(frag[2]), names.index(frag[0])) for frag in frags]
+        + [np.full(len(unassigned), len(names))]).astype(int)
+    groups = frag_labels * (atnums.max(initial=0) + 1) + atnums[rows]
+    return key, coords[rows], groups
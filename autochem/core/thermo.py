@@ -5,6 +5,7 @@ from glob import glob
 import re
 import subprocess
 import sys
+import tempfile
 
 __all__ = ['thermo_data', 'freq_data_gamess', 'freq_data_gauss']
 
@@ -20,29 +21,29 @@ def get_filetype(file):
             return 'gauss'
 
 
-def write_geom_input(atoms):
+def write_geom_input(atoms, directory='.'):
     """
-    Writes 'geom.input' from the list of |Atom| objects passed in.
+    Writes 'geom.input' in `directory` from the list of |Atom| objects passed in.
     """
-    with open('geom.input', 'w') as new:
+    with open(os.path.join(directory, 'geom.input'), 'w') as new:
         for atom in atoms:
             new.write(
                 f"{atom.symbol:5s} {int(atom.atnum):3} {atom.x:>15.10f} {atom.y:>15.10f} {atom.z:>15.10f} \n"
             )
 
 
-def write_freq_out_file(results):
+def write_freq_out_file(results, directory='.'):
     """
-    Writes freq.out using the frequencies of the `results` dictionary.
+    Writes freq.out in `directory` using the frequencies of the `results` dictionary.
     Note all of the list is written to the file, so any removal of 
     rotations and translations must occur before using this function.
     """
-    with open("freq.out", "w") as output:
+    with open(os.path.join(directory, "freq.out"), "w") as output:
         for i in results['Frequencies [cm-1]']:
             output.write(f"{i:.3f}\n")
 
 
-def thermo_initial_geom_gamess(file):
+def thermo_initial_geom_gamess(file, directory='.'):
     """
     Parses GAMESS output for the initial geometry.
     Takes the nuclear coordinates from the 'coord 0 vib 0' run,
@@ -61,7 +62,7 @@ def thermo_initial_geom_gamess(file):
             _, sym, x, y, z = line.split()
             x, y, z = map(lambda v: float(v) * BOHR_TO_ANG, (x, y, z))
             atoms.append(Atom(symbol=sym, coords=(x, y, z)))
-    write_geom_input(atoms)
+    write_geom_input(atoms, directory)
 
 
 def rm_additional_rots_and_trans(results):
@@ -74,7 +75,7 @@ def rm_additional_rots_and_trans(results):
     return results
 
 
-def thermo_initial_geom_gauss(file):
+def thermo_initial_geom_gauss(file, directory='.'):
     """
     Parses Gaussian frequency calculation log file for the initial 
     geometry. Note that coordinates here are stored in .job files by     
@@ -94,10 +95,10 @@ def thermo_initial_geom_gauss(file):
             x, y, z = map(float, (x, y, z))
             atoms.append(Atom(symbol=sym, coords=(x, y, z)))
 
-    write_geom_input(atoms)
+    write_geom_input(atoms, directory)
 
 
-def freq_data_gamess(file):
+def freq_data_gamess(file, directory='.'):
     """Parses GAMESS hessian log files for frequency data"""
     regex = '[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$'
     found_region = False
@@ -126,11 +127,11 @@ def freq_data_gamess(file):
     }  # keys used as headers for csv
 
     results = rm_additional_rots_and_trans(results)
-    write_freq_out_file(results)
+    write_freq_out_file(results, directory)
     return results
 
 
-def freq_data_gauss(file):
+def freq_data_gauss(file, directory='.'):
     """Parses Gaussian frequency log files for frequency data"""
     freqs = []
     ints = []
@@ -151,15 +152,15 @@ def freq_data_gauss(file):
     }  # keys used as headers for csv
 
     results = rm_additional_rots_and_trans(results)
-    write_freq_out_file(results)
+    write_freq_out_file(results, directory)
 
     return results
 
 
-def run(file, mult, temp):
+def run(file, mult, temp, directory='.'):
     """
-    Calls thermo.exe with geom.input and freq.out written to the same 
-    directory.
+    Calls thermo.exe in `directory`, where geom.input and freq.out have
+    been written.
     """
     thermo_exe = os.path.join(os.path.dirname(os.path.realpath(__file__)),
                               'thermo.exe')
@@ -167,14 +168,15 @@ def run(file, mult, temp):
                          shell=True,
                          stdin=subprocess.PIPE,
                          stdout=subprocess.PIPE,
+                         cwd=directory,
                          universal_newlines=True)
     newline = os.linesep
     commands = ['y', 'y', 'y', mult, temp]
     p.communicate(newline.join(commands))
 
 
-def read_fort():
-    with open('fort.10', 'r') as f:
+def read_fort(directory='.'):
+    with open(os.path.join(directory, 'fort.10'), 'r') as f:
         fort = [line for line in f.readlines()]
     return fort
 
@@ -201,23 +203,19 @@ def grep_data(fort):
     return data
 
 
-def cleanup():
-    os.system('rm fort.10 moments geom.input freq.out')
-
-
-def setup_and_run_fortran_script(file, mult, temp):
+def setup_and_run_fortran_script(file, mult, temp, directory='.'):
     """
-    Runs fortran script to produce 'fort.10' files etc...
+    Runs fortran script in `directory` to produce 'fort.10' files etc...
     """
     filetype = get_filetype(file)
     if filetype == 'gamess':
-        thermo_initial_geom_gamess(file)
-        freq_data_gamess(file)
-        run(file, mult, temp)
+        thermo_initial_geom_gamess(file, directory)
+        freq_data_gamess(file, directory)
+        run(file, mult, temp, directory)
     if filetype == 'gauss':
-        thermo_initial_geom_gauss(file)
-        freq_data_gauss(file)
-        run(file, mult, temp)
+        thermo_initial_geom_gauss(file, directory)
+        freq_data_gauss(file, directory)
+        run(file, mult, temp, directory)
 
 
 def thermo_data(file, mult, temp):
@@ -227,9 +225,12 @@ def thermo_data(file, mult, temp):
     produced in the GAMESS files have been shown to be 
     inaccurate. At < 300 cm⁻¹, rigid rotor fails, and the fortran code 
     implements hindered rotor.
+
+    The fortran code reads and writes files of fixed names in its working
+    directory, so each call runs it in its own temporary directory, and
+    several logs can be worked through at once.
     """
-    setup_and_run_fortran_script(file, mult, temp)
-    fort = read_fort()
-    data = grep_data(fort)
-    cleanup()
-    return data
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_and_run_fortran_script(file, mult, temp, tmp)
+        fort = read_fort(tmp)
+    return grep_data(fort)
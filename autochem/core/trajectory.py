@@ -0,0 +1,221 @@
+from .atom import AtomTable
+from .graph import connected_components
+from .molecule import Molecule
+from .neighbours import minimum_image
+from .periodic_table import PeriodicTable as PT
+from .xyz import iter_xyz_frames
+import numpy as np
+
+__all__ = ['Trajectory']
+
+
+class Trajectory:
+    """
+    A series of frames of the same system, such as snapshots of an MD run.
+    Every frame has the same atoms in the same order, so the system is only
+    split into fragments once, on the first frame. Later frames reuse those
+    fragments as long as every bond of the first frame is still within
+    bonding distance.
+
+    Instance Attributes
+    -------------------
+    symbols: list
+        atomic symbol of each atom
+    coords: np.ndarray
+        (n_frames, N, 3) array of cartesian coordinates
+    comments: list
+        comment line of each frame, if read from an xyz file
+    reference: Molecule
+        |Molecule| of the first frame, holding the fragments shared by every
+        frame
+
+    Keyword arguments such as `group` or `bonds_to_split` are passed on to
+    each |Molecule| created.
+
+    Usage:
+        >>> traj = Trajectory(using='md.xyz')
+        >>> traj.topology_holds()
+        array([ True,  True, ...])
+        >>> hbonds = traj.h_bonds()
+    """
+
+    def __init__(self, using=None, symbols=None, coords=None, use_mmap=False, **kwargs):
+        if using is not None:
+            symbols, frames, self.comments = None, [], []
+            for frame in iter_xyz_frames(using, use_mmap=use_mmap):
+                if symbols is None:
+                    symbols = frame.symbols
+                elif frame.symbols != symbols:
+                    raise ValueError(
+                        f'Trajectory: Frame {len(frames) + 1} of {using} has '
+                        'different atoms to the first frame')
+                frames.append(frame.coords)
+                self.comments.append(frame.comment)
+            if not frames:
+                raise ValueError(f'Trajectory: No frames found in {using}')
+            coords = np.stack(frames)
+        elif symbols is None or coords is None:
+            raise ValueError('Trajectory: Must give a path to an xyz file, or symbols and coords')
+        else:
+            self.comments = []
+        self.symbols = list(symbols)
+        self.coords = np.array(coords, dtype=float).reshape(-1, len(self.symbols), 3)
+        self.atnums = PT.get_atnums(self.symbols)
+        self.kwargs = kwargs
+        self.reference = self._molecule(0)
+        self.reference.separate()
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __repr__(self):
+        return f'Trajectory of {len(self)} frames, {len(self.symbols)} atoms each'
+
+    def __getitem__(self, frame):
+        return self.molecule(frame)
+
+    def __iter__(self):
+        for frame in range(len(self)):
+            yield self.molecule(frame)
+
+    def _molecule(self, frame):
+        atoms = AtomTable(self.atnums, self.coords[frame]).atoms()
+        return Molecule(atoms=atoms, **self.kwargs)
+
+    def bonded_pairs(self):
+        """
+        Returns the pairs of atoms bonded in the first frame, and the
+        distance within which each pair is still counted as bonded
+        """
+        if not hasattr(self, '_bonds'):
+            i, j = self.reference.find_bonded_pairs()
+            radii = PT.vdw_radii[self.reference.atnums]
+            self._bonds = i, j, radii[i] + radii[j]
+        return self._bonds
+
+    def topology_holds(self, frames=None, contacts=False):
+        """
+        Checks that every bond of the first frame is still within bonding
+        distance, for all frames at once. Returns an array of booleans, one
+        for each frame, or for each of `frames` if given. Only bonded
+        distances are checked, so molecules coming together are not noticed,
+        unless `contacts` is True: then no two atoms of different fragments
+        may have come within bonding distance either. That takes the
+        distance between every pair of atoms, so is best kept for small
+        systems.
+        """
+        coords = self.coords if frames is None else self.coords[frames]
+        i, j, cutoff = self.bonded_pairs()
+        diff = minimum_image(coords[..., i, :] - coords[..., j, :], self.reference.cell)
+        dists = np.sqrt((diff * diff).sum(axis=-1))
+        holds = np.all(dists < cutoff, axis=-1)
+        if contacts:
+            holds &= ~self._fragments_touch(coords)
+        return holds
+
+    def _fragments_touch(self, coords):
+        """
+        For each of an (M, N, 3) array of frames (or a single frame), whether
+        any two atoms not joined by bonds in the first frame are within
+        bonding distance
+        """
+        single = coords.ndim == 2
+        coords = coords.reshape(-1, *coords.shape[-2:])
+        # molecules joined by bonds in the first frame, including those split
+        # into separate fragments on purpose with bonds_to_split
+        i, j, _ = self.bonded_pairs()
+        pieces = connected_components(len(self.atnums), i, j)
+        apart = pieces[:, None] != pieces[None, :]
+        radii = PT.vdw_radii[self.atnums]
+        bonding = (radii[:, None] + radii[None, :]) ** 2
+        touch = np.zeros(len(coords), dtype=bool)
+        batch = max(1, 2 ** 21 // max(coords.shape[1] ** 2, 1))
+        for start in range(0, len(coords), batch):
+            diff = coords[start:start + batch, :, None, :] - coords[start:start + batch, None, :, :]
+            diff = minimum_image(diff, self.reference.cell)
+            touch[start:start + batch] = np.any(((diff * diff).sum(axis=-1) < bonding) & apart,
+                                                 axis=(1, 2))
+        return touch[0] if single else touch
+
+    def molecule(self, frame):
+        """
+        Returns a |Molecule| of one frame. If the bonds of the first frame
+        still hold, the fragments of the first frame are copied over onto the
+        atoms of this frame; otherwise, the molecule is left to find its own.
+        """
+        if frame < 0:
+            frame += len(self)
+        if frame == 0:
+            return self.reference
+        mol = self._molecule(frame)
+        if self.topology_holds(frame):
+            self._copy_fragments(mol)
+        return mol
+
+    def _copy_fragments(self, mol):
+        ref = self.reference
+        for atom, ref_atom in zip(mol.coords, ref.coords):
+            atom.fragment = ref_atom.fragment
+            atom.number = ref_atom.number
+        mol.atom_table.mol[:] = ref.atom_table.mol
+
+        def copy(frag):
+            frag = dict(frag)
+            frag['atoms'] = [mol.coords[atom.index - 1] for atom in frag['atoms']]
+            return frag
+
+        mol.fragments = {k: copy(frag) for k, frag in ref.fragments.items()}
+        if hasattr(ref, 'ionic'):
+            mol.ionic = copy(ref.ionic)
+
+    def centroids(self):
+        """
+        Returns an (n_frames, n_fragments, 3) array of the centre of each
+        fragment in each frame, with fragments in the order of
+        self.reference.fragments. For periodic systems, centres are taken
+        with each atom at its nearest image to the first atom of its
+        fragment, as for |select_positions|.
+        """
+        keys = list(self.reference.fragments)
+        position = {key: pos for pos, key in enumerate(keys)}
+        labels = np.array([position.get(key, -1)
+                           for key in self.reference.fragment_keys.tolist()])
+        rows = np.nonzero(labels >= 0)[0]
+        order = rows[np.argsort(labels[rows], kind='stable')]
+        counts = np.bincount(labels[rows], minlength=len(keys))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        coords = self.coords[:, order]
+        cell = self.reference.cell
+        if cell is not None:
+            anchors = self.coords[:, np.repeat(order[starts], counts)]
+            coords = anchors + minimum_image(coords - anchors, cell)
+        sums = np.add.reduceat(coords, starts, axis=1)
+        return sums / counts[:, None]
+
+    def centroid_displacements(self):
+        """
+        Returns an (n_frames, n_fragments) array of the distance each
+        fragment centre has moved from the first frame, to its nearest
+        periodic image for periodic systems
+        """
+        centroids = self.centroids()
+        diff = minimum_image(centroids - centroids[0], self.reference.cell)
+        return np.sqrt((diff * diff).sum(axis=-1))
+
+    def centroid_distances(self):
+        """
+        Returns an (n_frames, n_fragments, n_fragments) array of the distance
+        between the centres of every pair of fragments in each frame, to the
+        nearest periodic image for periodic systems
+        """
+        centroids = self.centroids()
+        diff = minimum_image(centroids[:, :, None, :] - centroids[:, None, :, :],
+                             self.reference.cell)
+        return np.sqrt((diff * diff).sum(axis=-1))
+
+    def h_bonds(self, distance=2.0):
+        """
+        Runs |Molecule.find_h_bonds| on every frame, returning one list of
+        hydrogen bond data for each frame
+        """
+        return [mol.find_h_bonds(distance) for mol in self]
@@ -1,11 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
 import csv
+import mmap
 import os
 import pandas as pd
 import re
 import sys
 import time
-from .atom import Atom
+from .atom import Atom, AtomTable
 from .periodic_table import PeriodicTable as PT
+from .xyz import read_xyz_arrays
 
 __all__ = [
     "assign_molecules_from_dict_keys",
@@ -14,15 +17,19 @@ __all__ = [
     "consecutive",
     "df_from_namedtuples",
     "eof",
+    "find_last",
     "get_files",
     "get_log_type",
     "list_of_dicts_to_one_level_dict",
     "module_exists",
+    "parallel_map",
     "read_file",
     "read_xyz",
     "remove_nones_from_dict",
     "responsive_table",
+    "reverse_lines",
     "search_dict_recursively",
+    "sniff_log_type",
     "sort_data",
     "sort_elements",
     "timeit",
@@ -87,30 +94,55 @@ def read_file(file):
             pass
 
 
+# banners of each package, in order of preference for a line naming several
+_LOG_BANNERS = (
+    ("gamess", (b"GAMESS",)),
+    ("psi", (b"Psi4", b"PSI4")),
+    ("gaussian", (b"Gaussian",)),
+    ("orca", (b"O   R   C   A",)),
+)
+_ANY_LOG_BANNER = re.compile(
+    b"|".join(re.escape(banner) for _, banners in _LOG_BANNERS for banner in banners)
+)
+SNIFF_BYTES = 64 * 1024
+
+
+def sniff_log_type(file, size=SNIFF_BYTES):
+    """
+    Returns the package that wrote a log file- "gamess", "psi", "gaussian" or
+    "orca"- or None if it is not a log of a calculation. Only the first
+    `size` bytes, then the last `size` bytes, are searched for a banner, so
+    large output that is not from a calculation, such as SLURM output, is
+    not read to the end.
+    """
+    with open(file, "rb") as f:
+        chunks = [f.read(size)]
+        end = f.seek(0, os.SEEK_END)
+        if end > size:
+            f.seek(max(end - size, size))
+            chunks.append(f.read())
+    for chunk in chunks:
+        match = _ANY_LOG_BANNER.search(chunk)
+        if match is None:
+            continue
+        start = chunk.rfind(b"\n", 0, match.start()) + 1
+        stop = chunk.find(b"\n", match.start())
+        line = chunk[start:] if stop == -1 else chunk[start:stop]
+        for log_type, banners in _LOG_BANNERS:
+            if any(banner in line for banner in banners):
+                return log_type
+    return None
+
+
 def get_log_type(file):
-    for line in read_file(file):
-        if "PSI4" in line:
-            return "psi4"
-        elif "GAMESS" in line:
-            return "gamess"
-        elif "Gaussian" in line:
-            return "gaussian"
-        elif "O   R   C   A" in line:
-            return "orca"
+    log_type = sniff_log_type(file)
+    return "psi4" if log_type == "psi" else log_type
 
 
 def read_xyz(using):
     """Reads coordinates of an xyz file and return a list of |Atom| objects, one for each atom"""
-    coords = []
-    with open(using, "r") as f:
-        for coord in f.readlines()[2:]:
-            line = coord.split()
-            for val in PT.ptable.values():
-                if line[0] == val[0]:
-                    coords.append(
-                        Atom(line[0], coords=tuple(float(i) for i in line[1:4]))
-                    )
-    return coords
+    symbols, coords = read_xyz_arrays(using)
+    return AtomTable(PT.get_atnums(symbols), coords).atoms()
 
 
 def write_xyz(atoms, filename=None):
@@ -170,6 +202,27 @@ def get_files(directory, ext, filepath_includes=None):
     return sorted(file_list)
 
 
+def parallel_map(func, items, jobs=None, chunksize=None):
+    """
+    Applies `func` to every item on a pool of `jobs` processes (all cores if
+    None or 0, 1 to run serially), returning the results in the order of
+    `items`. Items are sent to the workers in chunks, about four per worker
+    unless `chunksize` is given, so that many small files do not cost one
+    round trip each. `func` must be defined at the top level of a module.
+
+    Usage:
+        >>> energies = parallel_map(parse_file, get_files('.', ("log", "out")), jobs=8)
+    """
+    items = list(items)
+    if jobs == 1 or len(items) < 2:
+        return [func(item) for item in items]
+    workers = min(jobs or os.cpu_count() or 1, len(items))
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, items, chunksize=chunksize))
+
+
 def module_exists(module_name):
     try:
         __import__(module_name)
@@ -189,8 +242,7 @@ def sort_elements(lst):
     els = []
     elements = set([atom.symbol for atom in lst])
     for i in elements:
-        atom = Atom(i)
-        els.append((i, float(PT.get_atnum(atom))))
+        els.append((i, float(PT.symbol_to_atnum[i.capitalize()])))
     sorted_els = sorted(els, key=lambda val: val[1])
     return sorted_els
 
@@ -442,23 +494,70 @@ def responsive_table(data, strings, min_width=13, decimal_places=5):
     print("+" + "-" * line_length + "+")
 
 
+def reverse_lines(file, text=None):
+    """
+    Yields the lines of a file from the end backwards, or only the lines
+    holding `text`, as (byte offset of the start of the line, line). The
+    file is memory mapped and searched with `rfind`, so only the pages
+    between the end and the lines wanted are read, however large the file.
+
+    Usage:
+        >>> for offset, line in reverse_lines('calc.log', 'TOTAL ENERGY ='):
+        ...     if len(line.split()) == 4:
+        ...         break
+    """
+    needle = None if text is None else text.encode()
+    with open(file, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with data:
+            end = len(data)
+            while end > 0:
+                if needle is None:
+                    pos = end - 1
+                else:
+                    pos = data.rfind(needle, 0, end)
+                    if pos == -1:
+                        return
+                start = data.rfind(b"\n", 0, pos) + 1
+                stop = data.find(b"\n", pos)
+                stop = len(data) if stop == -1 else stop + 1
+                yield start, data[start:stop].decode(errors="replace")
+                end = start
+
+
+def find_last(file, text):
+    """
+    Returns (byte offset, line) of the last line of a file holding `text`,
+    or None, see |reverse_lines|
+    """
+    return next(reverse_lines(file, text), None)
+
+
 def eof(file, percFile):
-    # OPEN IN BYTES
+    """
+    Returns the lines of the last `percFile` of a file, given as a decimal.
+    Anything printed before that fraction of the file is missed, so
+    |find_last| and |reverse_lines| are better for finding the last of
+    something.
+    """
     with open(file, "rb") as f:
-        f.seek(0, 2)  # Seek @ EOF
-        fsize = f.tell()  # Get size
-        Dsize = int(percFile * fsize)
-        f.seek(max(fsize - Dsize, 0), 0)  # Set pos @ last n chars lines
-        lines = f.readlines()  # Read to end
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return []
+        with data:
+            lines = data[max(len(data) - int(percFile * len(data)), 0):].splitlines(keepends=True)
 
     # RETURN DECODED LINES
     for i in range(len(lines)):
         try:
             lines[i] = lines[i].decode("utf-8")
-        except:
+        except UnicodeDecodeError:
             lines[i] = "CORRUPTLINE"
-            print("eof function passed a corrupt line in file ", File)
-        # FOR LETTER IN SYMBOL
+            print("eof function passed a corrupt line in file ", file)
     return lines
 
 
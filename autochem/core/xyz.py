@@ -0,0 +1,101 @@
+import mmap
+from collections import namedtuple
+
+import numpy as np
+
+from .periodic_table import PeriodicTable as PT
+
+__all__ = ["XYZFrame", "iter_xyz_frames", "read_xyz_arrays"]
+
+XYZFrame = namedtuple("XYZFrame", ["symbols", "coords", "comment"])
+XYZFrame.__doc__ = """
+One frame of an xyz file: a list of atomic symbols, an (N, 3) array of
+coordinates and the comment line
+"""
+
+
+def _parse_atom_lines(lines, valid=True):
+    """
+    Splits atom lines into symbols and an (N, 3) array of coordinates.
+    Lines that are blank or do not start with an element symbol are dropped,
+    unless `valid` is False, in which case they raise a ValueError.
+    """
+    parts = [line.split() for line in lines]
+    known = PT.symbol_to_atnum
+    keep = [p for p in parts if p and p[0] in known]
+    if not valid and len(keep) != len(parts):
+        bad = next(p for p in parts if not p or p[0] not in known)
+        raise ValueError(f"read_xyz: Unknown atom line {' '.join(bad)!r}")
+    symbols = [p[0] for p in keep]
+    if all(len(p) == 4 for p in keep):
+        # conversion of every value at once
+        values = [v for p in keep for v in p[1:]]
+    else:
+        # extra columns, such as atomic numbers or charges
+        values = [v for p in keep for v in p[1:4]]
+    coords = np.array(values, dtype=float).reshape(len(keep), 3)
+    return symbols, coords
+
+
+def read_xyz_arrays(using):
+    """
+    Reads the atoms of a single xyz file in bulk. Returns a list of atomic
+    symbols and an (N, 3) array of coordinates. As for |read_xyz|, every line
+    after the first two that starts with an element symbol is taken as an atom.
+
+    Usage:
+        >>> symbols, coords = read_xyz_arrays('water.xyz')
+    """
+    with open(using, "r") as f:
+        lines = f.read().splitlines()
+    return _parse_atom_lines(lines[2:])
+
+
+def iter_xyz_frames(using, use_mmap=False):
+    """
+    Generator of |XYZFrame| tuples for a multi-frame xyz file, such as the
+    trajectory of an optimisation or MD run. Each frame is a line with the
+    number of atoms, a comment line, and one line per atom. Only one frame is
+    held in memory at a time, and with `use_mmap` the file is memory mapped
+    rather than read through a buffered file, suited to files of many GB.
+
+    Usage:
+        >>> for frame in iter_xyz_frames('traj.xyz'):
+        ...     print(frame.comment, frame.coords.mean(axis=0))
+    """
+    with open(using, "rb") as f:
+        if use_mmap:
+            try:
+                source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return
+        else:
+            source = f
+        try:
+            readline = source.readline
+            while True:
+                header = readline()
+                if not header:
+                    break
+                if not header.strip():
+                    continue  # blank lines between frames
+                try:
+                    num_atoms = int(header.split()[0])
+                except ValueError:
+                    raise ValueError(
+                        f"iter_xyz_frames: Expected number of atoms in {using}, "
+                        f"found {header.decode(errors='replace').strip()!r}"
+                    )
+                comment = readline().decode().rstrip("\r\n")
+                lines = [readline() for _ in range(num_atoms)]
+                if num_atoms and not lines[-1]:
+                    raise ValueError(
+                        f"iter_xyz_frames: Last frame of {using} is incomplete"
+                    )
+                symbols, coords = _parse_atom_lines(
+                    b"".join(lines).decode().splitlines(), valid=False
+                )
+                yield XYZFrame(symbols, coords, comment)
+        finally:
+            if use_mmap:
+                source.close()
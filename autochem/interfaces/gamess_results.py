@@ -35,19 +35,42 @@ instance, really. Simple fix; instead of returning values, store in list and ret
 store the iteration number.
     """
 
+    markers = {
+        "run_title": ("RUN TITLE", "first"),
+        "terminated": ("EXECUTION OF GAMESS TERMINATED NORMALLY", "last"),
+        "equilibrium": ("EQUILIBRIUM GEOMETRY LOCATED", "first"),
+        "all_coords": ("COORDINATES OF ALL ATOMS ARE (ANGS)", "first"),
+        "runtyp": (re.compile(rb"(?i)RUNTYP="), "first"),  # input echo may be lower case
+        "nbody": ("NBODY", "first"),
+        "version": ("GAMESS VERSION =", "first"),
+        "euncorr_hf": ("Euncorr HF", "last"),
+        "ecorr_scs": ("E corr SCS", "last"),
+        "ecorr_mp2": ("E corr MP2", "last"),
+        "total_energy": ("TOTAL ENERGY =", "last"),
+        "basis": ("INPUT CARD> $BASIS", "first"),
+        "dfttyp": ("DFTTYP", "first"),
+        "pcm": ("INPUT FOR PCM SOLVATION CALCULATION", "first"),
+        "geometry_search": ("BEGINNING GEOMETRY SEARCH", "first"),
+        "multiplicity": (re.compile(rb"(?i)SPIN MULTIPLICITY"), "first"),
+        "occupied": ("ORBITALS ARE OCCUPIED", "first"),
+        "eigenvectors": ("EIGENVECTORS", "first"),
+        "modes": ("MODE FREQ(CM**-1)", "last"),
+    }
+
     def __init__(self, log):
         super().__init__(log)
 
     
     @property
     def title(self):
-        found = False
-        for line in self.read():    
-            if found:
-                if re.search('[A-Za-z0-9]', line):
-                    return line
-            if 'RUN TITLE' in line:
-                found = True
+        start = self._offset("run_title")
+        if start is None:
+            return None
+        lines = self.read_from(start)
+        next(lines)
+        for line in lines:
+            if re.search('[A-Za-z0-9]', line):
+                return line
  
     
     ################################
@@ -57,9 +80,7 @@ store the iteration number.
     ################################
 
     def completed(self):
-        return any(
-            "EXECUTION OF GAMESS TERMINATED NORMALLY" in line for line in self.eof(0.1)
-        )
+        return self._last("terminated") is not None
 
         ####NEEDS WORK####
         # CURRENTLY IF TERMINATES ABNORMALLY, RESULTS FROM THE CALC
@@ -71,11 +92,8 @@ store the iteration number.
     def get_error(self):
         super().get_error()
         if self.is_optimisation():
-            no_equil = True
-            for line in self.read():
-                # check for equilibrium coords
-                if "EQUILIBRIUM GEOMETRY LOCATED" in line:
-                    no_equil = False
+            # check for equilibrium coords
+            no_equil = self._first("equilibrium") is None
             if no_equil:
                 return "No equilibrium geometry found- need to resubmit with rerun.xyz"
             else:
@@ -89,19 +107,17 @@ store the iteration number.
 
     def get_runtype(self):
         """Returns type of calculation ran"""
-        for line in self.read():
-            if "RUNTYP=" in line.upper():
-                parts = line.split()
-                for p in parts:
-                    if "RUNTYP=" in p:
-                        return p.split("=")[1].lower()
+        for line in self._lines("runtyp"):
+            for p in line.split():
+                if "RUNTYP=" in p.upper():
+                    return p.split("=")[1].lower()
 
     @property
     def fmo_level(self):
         """Returns level of FMO calculation ran"""
-        for line in self.read():
-            if "NBODY" in line:
-                return int(line.split()[-1].split("=")[-1])  # FMO2 or 3
+        line = self._first("nbody")
+        if line is not None:
+            return int(line.split()[-1].split("=")[-1])  # FMO2 or 3
         return 0
 
     def get_equil_coords(self, output=None):
@@ -123,7 +139,10 @@ store the iteration number.
             else:
                 par_dir.append(part)
         MOLECULE_PARENT_DIR = "/".join(par_dir)
-        for line in self.read():
+        # nothing is collected before the first of either marker
+        starts = [self._offset("equilibrium"), self._offset("all_coords")]
+        starts = [start for start in starts if start is not None]
+        for line in self.read_from(min(starts)) if starts else ():
             if "EQUILIBRIUM GEOMETRY LOCATED" in line:
                 found_equil = True
             if "COORDINATES OF ALL ATOMS ARE (ANGS)" in line:  # store every coord list
@@ -185,9 +204,9 @@ store the iteration number.
 
     @property
     def version(self):
-        for line in self.read():
-            if "GAMESS VERSION =" in line:
-                return " ".join(line.split()[4:-1])
+        line = self._first("version")
+        if line is not None:
+            return " ".join(line.split()[4:-1])
 
     def fmo_mp2_data(self, mp2_type):
         """
@@ -200,14 +219,11 @@ store the iteration number.
         to return the correlated SCS energy, 'E corr SCS', or correlated
         MP2 energies, 'E corr MP2'.
         """
-        HF = ""
-        MP2 = ""
-        for line in self.eof(0.2):  # last values only
-            if "Euncorr HF" in line:
-                HF = line.split()[-1]
-            if f"E corr {mp2_type}" in line:
-                MP2 = line.split()[-1]
-
+        # last values only
+        HF, MP2 = (
+            line.split()[-1] if line is not None else ""
+            for line in (self._last("euncorr_hf"), self._last(f"ecorr_{mp2_type.lower()}"))
+        )
         HF, MP2 = map(float, (HF, MP2))
         return HF, MP2
 
@@ -216,10 +232,8 @@ store the iteration number.
         """
         Returns last occurrence of total energy.
         """
-        total = ""
-        for line in self.read():
-            if "TOTAL ENERGY =" in line:
-                total = line.split()[-1]
+        line = self._last("total_energy")
+        total = line.split()[-1] if line is not None else ""
         return float(total)
 
     @property
@@ -229,9 +243,9 @@ store the iteration number.
         """
 
         def raw_basis():
-            for line in self.read():
-                if "INPUT CARD> $BASIS" in line:
-                    return line.split()[-2].split("=")[1]
+            line = self._first("basis")
+            if line is not None:
+                return line.split()[-2].split("=")[1]
 
         basis = raw_basis()
         change_basis = {
@@ -252,17 +266,9 @@ store the iteration number.
         E(2T) as same spin energy. Then user can scale energies accordingly.
         If looking at optimisations, only the overall correlation energy is printed.
         """
-        HF = ""
-        MP2_opp = ""
-        MP2_same = ""
-        for line in self.eof(0.2):
-            line = line.split()
-            if "E(0)=" in line:
-                HF = line[-1]
-            if "E(2S)=" in line:
-                MP2_opp = line[-1]
-            if "E(2T)=" in line:
-                MP2_same = line[-1]
+        HF = self._last_item("E(0)=", -1)
+        MP2_opp = self._last_item("E(2S)=", -1)
+        MP2_same = self._last_item("E(2T)=", -1)
         HF, MP2_opp, MP2_same = map(float, (HF, MP2_opp, MP2_same))
         return HF, MP2_opp, MP2_same
 
@@ -270,14 +276,8 @@ store the iteration number.
         """
         Returns value of E(0) as HF, E(MP2) as the overall MP2 energy.
         """
-        HF = ""
-        MP2 = ""
-        for line in self.eof(0.2):
-            line = line.split()
-            if "E(0)=" in line:
-                HF = line[-1]
-            if "E(MP2)=" in line:
-                MP2 = line[1]
+        HF = self._last_item("E(0)=", -1)
+        MP2 = self._last_item("E(MP2)=", 1)
         HF, MP2 = map(float, (HF, MP2))
         return HF, MP2
 
@@ -289,29 +289,34 @@ store the iteration number.
         not with the addition of the energy of the solvent. In order to find
         that, search for 'THE P(2) CORRECTED MP2-CPCM ENERGY'.
         """
-        HF = ""
-        MP2 = ""
-        for line in self.eof(0.2):
-            line = line.split()
-            if "E(0)=" in line:
-                HF = line[-1]
-            if "E(MP2)=" in line:
-                MP2 = line[1]
+        HF = self._last_item("E(0)=", -1)
+        MP2 = self._last_item("E(MP2)=", 1)
 
         HF, MP2 = map(float, (HF, MP2))
         return HF, MP2
 
+    def _last_item(self, token, item):
+        """
+        Returns an item of the split line of the last line holding `token` as
+        a whole word, or an empty string. Lines are searched from the end of
+        the log, so only as much of it is read as is needed.
+        """
+        for _, line in self.reverse_lines(token):
+            parts = line.split()
+            if token in parts:
+                return parts[item]
+        return ""
+
     @property
     def dft_type(self):
         """
         Returns DFT type (DFTTYP=...)
         """
-        for line in self.read():
-            if "DFTTYP" in line:
-                line = line.split()
-                for val in line:
-                    if "DFTTYP" in val:
-                        return val.split("=")[1].upper()
+        line = self._first("dfttyp")
+        if line is not None:
+            for val in line.split():
+                if "DFTTYP" in val:
+                    return val.split("=")[1].upper()
 
     @property
     def fmo_dft_energy(self):
@@ -320,12 +325,9 @@ store the iteration number.
         """
         if "2019" in self.version:
             energy = ""
-            fmo = self.fmo_level
-            # issues with opening the same file twice, so store fmo level
-            # before looking for the line
-            for line in self.eof(0.1):
-                if f"Euncorr({fmo})=" in line:
-                    energy = line.split()[-1]
+            for _, line in self.reverse_lines(f"Euncorr({self.fmo_level})="):
+                energy = line.split()[-1]
+                break
             return float(energy)
 
     @property
@@ -337,7 +339,8 @@ store the iteration number.
         fmo = False
         mp2 = False
         scs = False
-        for line in self.read():
+        # by the run title, all data required is specified
+        for line in self.read_from(0, stop=self._offset("run_title")):
             if "FMO" in line:
                 fmo = True
             if "MPLEVL" in line:
@@ -347,7 +350,7 @@ store the iteration number.
             if "DFT" in line:
                 dft = True
             if "RUN TITLE" in line:
-                break  # by this point, all data required is specified
+                break
         types = {
             "fmo_scs": (fmo, scs),
             "fmo_mp2": (fmo, mp2),
@@ -387,12 +390,9 @@ store the iteration number.
         input file at the top though, so instead has to check when the 
         log file reports it.
         """
-        for line in self.read():
-            if "INPUT FOR PCM SOLVATION CALCULATION" in line:
-                return True
-            if "BEGINNING GEOMETRY SEARCH" in line:
-                break
-        return False
+        pcm = self._offset("pcm")
+        search = self._offset("geometry_search")
+        return pcm is not None and (search is None or pcm <= search)
 
     def get_data(self):
         """
@@ -434,9 +434,9 @@ store the iteration number.
 
     @property
     def multiplicity(self):
-        for line in self.read():
-            if "SPIN MULTIPLICITY" in line.upper():  # sometimes prints lower case
-                return int(line.split()[-1])
+        line = self._first("multiplicity")  # sometimes prints lower case
+        if line is not None:
+            return int(line.split()[-1])
 
     #################
     ### HOMO-LUMO ###
@@ -444,9 +444,9 @@ store the iteration number.
 
     @property
     def num_orbitals_occupied(self):
-        for line in self.read():
-            if "ORBITALS ARE OCCUPIED" in line:
-                return int(line.split()[0])
+        line = self._first("occupied")
+        if line is not None:
+            return int(line.split()[0])
 
     def _homo_lumo(self):
         """
@@ -454,7 +454,8 @@ store the iteration number.
         """
         found = False
         orbital_energies = []
-        for line in self.read():
+        start = self._offset("eigenvectors")
+        for line in self.read_from(start) if start is not None else ():
             if "EIGENVECTORS" in line:
                 found = True
             if "CPU" in line:
@@ -516,6 +517,21 @@ store the iteration number.
     def vib_get_geom(self):
         pass
 
+    def _vibrations(self):
+        """
+        Lines of the last table of vibrations, below the last
+        'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.'
+        """
+        regex = "[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$"
+        lines = []
+        start = self._offset("modes")
+        for line in self.read_from(start) if start is not None else ():
+            if re.search(regex, line):
+                lines.append(line)
+            elif lines:  # end of the table
+                break
+        return lines
+
     @property
     def frequencies(self):
         """
@@ -523,12 +539,7 @@ store the iteration number.
         Checks output below this line:
         'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.'
         """
-        vibs = []
-        regex = "[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$"
-        for line in self.eof(0.2):  # last 20 % of file
-            if re.search(regex, line):
-                vibs.append(float(line.split()[1]))
-        return vibs
+        return [float(line.split()[1]) for line in self._vibrations()]
 
     @property
     def intensities(self):
@@ -537,12 +548,7 @@ store the iteration number.
         Checks output below this line:
         'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.'
         """
-        ints = []
-        regex = "[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$"
-        for line in self.eof(0.2):  # last 20 % of file
-            if re.search(regex, line):
-                ints.append(float(line.split()[-1]))
-        return ints
+        return [float(line.split()[-1]) for line in self._vibrations()]
 
     def write_initial_geom_for_thermo(self):
         """Parses GAMESS inputs for the initial geometry"""
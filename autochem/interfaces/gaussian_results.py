@@ -15,6 +15,22 @@ class GaussianResults(Results):
     Class for obtaining results from Gaussian simulations. This class requires a log file to be read.
     """
 
+    markers = {
+        "error": ("Error termination", "last"),
+        "normal": ("Normal termination", "last"),
+        "step": (re.compile(rb"Initial command:|Entering Link 1 ="), "last"),
+        "symbolic": ("Symbolic", "first"),
+        "route": (re.compile(rb"(?m)^[ \t]*#"), "first"),
+        "hf": (re.compile(rb"(?m)^[ \t]E=[ \t]*-?[0-9]*.[0-9]*"), "last"),
+        "scf_done": ("SCF Done", "last"),
+        "charge_mult": (re.compile(rb"Charge.*Multiplicity|Multiplicity.*Charge"), "first"),
+        "occupied": ("Alpha  occ. eigenvalues", "first"),
+        "frequencies": ("Frequencies --", "all"),
+        "intensities": ("IR Inten    --", "all"),
+        "z_matrix": ("Symbolic Z-matrix:", "first"),
+        "excitations": ("Excitation energies and oscillator strengths", "first"),
+    }
+
     def __init__(self, log):
         super().__init__(log)
 
@@ -46,19 +62,20 @@ class GaussianResults(Results):
         if not opt and not freq:
             return "spec"
 
+    def _ended_with(self, name):
+        """
+        True if the final step of the log ended with a line for the marker
+        `name`. Each step of a --Link1-- job starts afresh with its own
+        initial command, and only the last step decides how the job ended.
+        """
+        found, steps = self._found(name), self._found("step")
+        return bool(found) and (not steps or steps[-1][0] < found[-1][0])
+
     def errored(self):
-        found = False
-        for line in self.eof(0.01):
-            if "Error termination" in line:
-                return True
-        return False
+        return self._ended_with("error")
 
     def completed(self):
-        found = False
-        for line in self.eof(0.01):
-            if "Normal termination" in line:
-                return True
-        return False
+        return self._ended_with("normal")
 
     def _calcall_equil_coords(self):
         """
@@ -171,12 +188,7 @@ class GaussianResults(Results):
         Symbolic Z-matrix
         ...
         """
-        lines = []
-        found = False
-        for line in self.read():
-            if "Symbolic" in line:
-                break
-            lines.append(line)
+        lines = list(self.read_from(0, stop=self._offset("symbolic")))
         return lines[-2].strip()
 
     @property
@@ -186,14 +198,11 @@ class GaussianResults(Results):
         Now accounts for more than one line.
         """
         lines = []
-        found = False
-        for line in self.read():
-            if re.search("^\s*?#P?", line.upper()):
-                found = True
-            if found:
-                if "------" in line:
-                    break
-                lines.append(line)
+        start = self._offset("route")
+        for line in self.read_from(start) if start is not None else ():
+            if "------" in line:
+                break
+            lines.append(line)
         formatted = []
         # drop leading spaces and trailing newlines
         for line in lines:
@@ -240,10 +249,8 @@ class GaussianResults(Results):
         """
         Returns last occurrence of Hartree-Fock energy.
         """
-        HF = ""
-        for line in self.read():
-            if re.search("^\sE=\s*-?[0-9]*.[0-9]*", line):
-                HF = line.split()[1]
+        line = self._last("hf")
+        HF = line.split()[1] if line is not None else ""
         return float(HF)
 
     @property
@@ -259,10 +266,8 @@ class GaussianResults(Results):
         """
         Returns last occurrence of DFT energy.
         """
-        dft = ""
-        for line in self.read():
-            if "SCF Done" in line:
-                dft = line.split()[4]
+        line = self._last("scf_done")
+        dft = line.split()[4] if line is not None else ""
         return float(dft)
 
     def get_data(self):
@@ -311,9 +316,9 @@ class GaussianResults(Results):
         """
         Returns multiplicity from the symbolic z-matrix section.
         """
-        for line in self.read():
-            if "Charge" in line and "Multiplicity" in line:
-                return int(line.split()[-1])
+        line = self._first("charge_mult")
+        if line is not None:
+            return int(line.split()[-1])
 
     def _homo_lumo(self):
         """
@@ -321,7 +326,8 @@ class GaussianResults(Results):
         """
         occupied = []
         lumo = ""
-        for line in self.read():
+        start = self._offset("occupied")
+        for line in self.read_from(start) if start is not None else ():
             if "Alpha  occ. eigenvalues" in line:
                 occupied += line.split()[4:]
             if "Alpha virt. eigenvalues" in line:
@@ -366,21 +372,11 @@ class GaussianResults(Results):
 
     @property
     def frequencies(self):
-        vibs = []
-        for line in self.read():
-            if "Frequencies --" in line:
-                vibs += line.split()[2:]
-        vibs = [float(v) for v in vibs]
-        return vibs
+        return [float(v) for line in self._lines("frequencies") for v in line.split()[2:]]
 
     @property
     def intensities(self):
-        ints = []
-        for line in self.read():
-            if "IR Inten    --" in line:
-                ints += line.split()[3:]
-        ints = [float(i) for i in ints]
-        return ints
+        return [float(i) for line in self._lines("intensities") for i in line.split()[3:]]
 
     def write_initial_geom_for_thermo(self):
         """
@@ -390,7 +386,8 @@ class GaussianResults(Results):
         atoms = []
         regex = "\s+[A-z]{1,2}(\s+-?[0-9]+\.[0-9]+){3}"
         found_coords = False
-        for line in self.read():
+        start = self._offset("z_matrix")
+        for line in self.read_from(start) if start is not None else ():
             if "Symbolic Z-matrix:" in line:
                 found_coords = True
             if line == "\n":
@@ -416,7 +413,8 @@ class GaussianResults(Results):
         waves = []
         waves_per_iter = []
         found_region = False
-        for line in self.read():
+        start = self._offset("excitations")
+        for line in self.read_from(start) if start is not None else ():
             if "Excitation energies and oscillator strengths" in line:
                 found_region = True
             if found_region:
@@ -438,7 +436,8 @@ class GaussianResults(Results):
         ints = []
         ints_per_iter = []
         found_region = False
-        for line in self.read():
+        start = self._offset("excitations")
+        for line in self.read_from(start) if start is not None else ():
             if "Excitation energies and oscillator strengths" in line:
                 found_region = True
             if found_region:
@@ -460,7 +459,8 @@ class GaussianResults(Results):
         vals = []
         vals_per_iter = []
         found_region = False
-        for line in self.read():
+        start = self._offset("excitations")
+        for line in self.read_from(start) if start is not None else ():
             if "Excitation energies and oscillator strengths" in line:
                 found_region = True
             if found_region:
@@ -16,6 +16,28 @@ class OrcaResults(Results):
     requires a log file to be read.
     """
 
+    markers = {
+        "terminated": ("****ORCA TERMINATED NORMALLY****", "last"),
+        "user_commands": ("> !", "first"),
+        "coords_file": ("The coordinates will be read from file", "first"),
+        "dft": ("Density Functional     Method          .... DFT", "first"),
+        "functional": ("Exchange Functional    Exchange", "first"),
+        "hamiltonian": ("Ab initio Hamiltonian  Method", "first"),
+        "num_atoms": ("Number of atoms", "first"),
+        "basis": ("Your calculation utilizes the basis:", "first"),
+        "total_energy": ("Total Energy       :", "first"),
+        "final_energy": ("FINAL SINGLE POINT ENERGY", "last"),
+        "multiplicity": ("Multiplicity", "first"),
+        "orbital_energies": ("ORBITAL ENERGIES", "first"),
+        "frequencies": ("Mode    freq (cm**-1)", "first"),
+        "transitions": ("TRANSITION ELECTRIC", "first"),
+        "converged": ("THE OPTIMIZATION HAS CONVERGED", "last"),
+        "cartesian": ("CARTESIAN COORDINATES (ANGSTROEM)", "last"),
+        "thermo_temp": ("THERMOCHEMISTRY AT", "all"),
+        "zero_point": ("Zero point energy", "all"),
+        "thermal_energy": ("Total thermal energy", "all"),
+    }
+
     def __init__(self, log):
         super().__init__(log)
 
@@ -47,10 +69,7 @@ class OrcaResults(Results):
         return "spec"
 
     def completed(self):
-        for line in self.eof(0.05):
-            if "****ORCA TERMINATED NORMALLY****" in line:
-                return True
-        return False
+        return self._last("terminated") is not None
 
     def is_optimisation(self):
         return "opt" in self.get_runtype()
@@ -66,66 +85,59 @@ class OrcaResults(Results):
         """
         Returns the ! ... line of the input file.
         """
-        for line in self.read():
-            if "> !" in line:
-                return line.lower()
+        line = self._first("user_commands")
+        if line is not None:
+            return line.lower()
 
     @property
     def title(self):
         """
         Returns xyz file with no extension. Used when writing new coords
         """
-        for line in self.read():
-            if "The coordinates will be read from file" in line:
-                return line.split()[-1].rsplit(".")[0]
+        line = self._first("coords_file")
+        if line is not None:
+            return line.split()[-1].rsplit(".")[0]
 
     @property
     def is_dft(self):
         """
         Used internally to decide if dft energies should be collected.
         """
-        for line in self.read():
-            if "Density Functional     Method          .... DFT" in line:
-                return True
-        return False
+        return self._first("dft") is not None
 
     @property
     def method(self):
         """
         Returns method used in calculation.
         """
-        for line in self.read():
-            # dft
-            if "Exchange Functional    Exchange" in line:
-                return line.split()[-1]
-            # HF
-            elif "Ab initio Hamiltonian  Method" in line:
-                return line.split()[-1].split("(")[0]
-            # MP2
-            # elif ....
+        found = self.scan(["functional", "hamiltonian"])
+        functional, hamiltonian = found["functional"], found["hamiltonian"]
+        # dft
+        if functional and (not hamiltonian or functional[0][0] <= hamiltonian[0][0]):
+            return functional[0][1].split()[-1]
+        # HF
+        elif hamiltonian:
+            return hamiltonian[0][1].split()[-1].split("(")[0]
+        # MP2
+        # elif ....
 
     @property
     def num_atoms(self):
-        for line in self.read():
-            if "Number of atoms" in line:
-                return int(line.split()[-1])
+        line = self._first("num_atoms")
+        if line is not None:
+            return int(line.split()[-1])
 
     def get_equil_coords(self):
         coords = []
-        found_coords = False
-        found_equil = False
         regex = "^\s+[A-z]+(\s+-?[0-9]+\.[0-9]+){3}$"
 
-        for line in self.eof(0.5):
-            if "THE OPTIMIZATION HAS CONVERGED" in line:
-                found_equil = True
-            if "CARTESIAN COORDINATES (ANGSTROEM)" in line:
-                found_coords = True
+        found_equil = self._last("converged") is not None
+        # last set of coordinates, up to the blank line after it
+        start = self._offset("cartesian")
+        for line in self.read_from(start) if start is not None else ():
             if line == "\n":
-                found_coords = False
-            if found_coords and re.search(regex, line):
-                if len(coords) == self.num_atoms:
-                    coords = []
+                break
+            if re.search(regex, line):
                 sym, x, y, z = line.split()
                 coords.append(Atom(sym, coords=[x, y, z]))
 
@@ -153,27 +165,27 @@ class OrcaResults(Results):
         """
         Returns basis set.
         """
-        for line in self.read():
-            if "Your calculation utilizes the basis:" in line:
-                return line.split()[-1]
+        line = self._first("basis")
+        if line is not None:
+            return line.split()[-1]
 
     @property
     def total_energy(self):
         """
         Returns total energy, printed for scf calculations.
         """
-        for line in self.read():
-            if "Total Energy       :" in line:
-                return float(line.split()[3].strip())
+        line = self._first("total_energy")
+        if line is not None:
+            return float(line.split()[3].strip())
 
     @property
     def final_single_point_energy(self):
         """
-        Returns the energies printed for single points.
+        Returns the last energy printed for single points.
         """
-        for line in self.eof(0.2):
-            if "FINAL SINGLE POINT ENERGY" in line:
-                return float(line.split()[-1])
+        line = self._last("final_energy")
+        if line is not None:
+            return float(line.split()[-1])
 
     @property
     def sp_data(self):
@@ -204,9 +216,9 @@ class OrcaResults(Results):
         """
         Return multiplicity.
         """
-        for line in self.read():
-            if "Multiplicity" in line:
-                return int(line.split()[-1])
+        line = self._first("multiplicity")
+        if line is not None:
+            return int(line.split()[-1])
 
     def _homo_lumo(self):
         """
@@ -217,7 +229,8 @@ class OrcaResults(Results):
         lumo = ""
         regex = r"^\s+[0-9]+(\s+-?[0-9]+.[0-9]+){3}"
         found = False
-        for line in self.read():
+        start = self._offset("orbital_energies")
+        for line in self.read_from(start) if start is not None else ():
             if "ORBITAL ENERGIES" in line:
                 found = True
             if found:
@@ -271,7 +284,8 @@ class OrcaResults(Results):
         """
         vibs = []
         found = False
-        for line in self.read():
+        start = self._offset("frequencies")
+        for line in self.read_from(start) if start is not None else ():
             if "Mode    freq (cm**-1)" in line:
                 found = True
             if found and line == "\n":
@@ -286,7 +300,9 @@ class OrcaResults(Results):
         Orca removes rotations/vibrations before printing
         """
         ints = []
-        for line in self.read():
+        found = False
+        start = self._offset("frequencies")
+        for line in self.read_from(start) if start is not None else ():
             if "Mode    freq (cm**-1)" in line:
                 found = True
             if found and line == "\n":
@@ -306,7 +322,7 @@ class OrcaResults(Results):
         so returns a list of temperatures in Kelvin
         """
         temps = []
-        for line in self.eof(0.5):
+        for line in self._lines("thermo_temp"):
             match = re.match('THERMOCHEMISTRY AT (.*)K', line)
             if match is not None:
                 temps.append(match.group(1) + ' K')
@@ -319,11 +335,10 @@ class OrcaResults(Results):
         in kJ/mol.
         """
         zpves = []
-        for line in self.eof(0.5):
-            if 'Zero point energy' in line:
-                zpve = float(line.split()[4])
-                zpve *= 2625.5
-                zpves.append(zpve)    
+        for line in self._lines("zero_point"):
+            zpve = float(line.split()[4])
+            zpve *= 2625.5
+            zpves.append(zpve)
         return zpves
 
     @property
@@ -333,11 +348,10 @@ class OrcaResults(Results):
         Thermal energy = E(el) + E(ZPE) + E(vib) + E(rot) + E(trans)
         """
         energies = []
-        for line in self.eof(0.5):
-            if 'Total thermal energy' in line:
-                energy = float(line.split()[3])
-                energy *= 2625.5
-                energies.append(energy)
+        for line in self._lines("thermal_energy"):
+            energy = float(line.split()[3])
+            energy *= 2625.5
+            energies.append(energy)
         return energies
 
     ########################
@@ -374,7 +388,8 @@ class OrcaResults(Results):
         waves_per_iter = []
         found = False
         regex = "^\s+[0-9]+(\s+-?[0-9]+\.[0-9]+){7}$"
-        for line in self.read():
+        start = self._offset("transitions")
+        for line in self.read_from(start) if start is not None else ():
             if "TRANSITION ELECTRIC" in line:
                 found = True
             if found:
@@ -397,7 +412,8 @@ class OrcaResults(Results):
         ints_per_iter = []
         found = False
         regex = "^\s+[0-9]+(\s+-?[0-9]+\.[0-9]+){7}$"
-        for line in self.read():
+        start = self._offset("transitions")
+        for line in self.read_from(start) if start is not None else ():
             if "TRANSITION ELECTRIC" in line:
                 found = True
             if found:
@@ -422,7 +438,8 @@ class OrcaResults(Results):
         vals_per_iter = []
         found = False
         regex = "^\s+[0-9]+(\s+-?[0-9]+\.[0-9]+){7}$"
-        for line in self.read():
+        start = self._offset("transitions")
+        for line in self.read_from(start) if start is not None else ():
             if "TRANSITION ELECTRIC" in line:
                 found = True
             if found:
@@ -8,29 +8,38 @@ __all__ = ["PsiResults"]
 class PsiResults(Results):
     """Class defining the results of a PSI4 calculation."""
 
+    markers = {
+        "success": ("exiting successfully", "last"),
+        "call": (re.compile(rb"[A-z]*\('[A-z0-9]*'(.?[ \t]*[A-z]*='[A-z]*')*\)"), "all"),
+        "geometry": ("Geometry (in Angstrom)", "first"),
+        "orbital_energies": ("Orbital Energies", "first"),
+        "singly_occupied": ("Singly Occupied", "first"),
+        "virtual": ("Virtual", "first"),
+        "basis": (re.compile(rb"(?m)basis[ \t]\w*(\-?\w*){1,2}\r?$"), "first"),
+        "total_energy": ("Total Energy =", "last"),
+        "reference_energy": ("Reference Energy          =", "last"),
+        "opposite_spin": ("Opposite-Spin Energy      =", "last"),
+        "same_spin": ("Same-Spin Energy          =", "last"),
+    }
+
     def __init__(self, log):
         super().__init__(log)
 
     def completed(self):
-        complete = False
-        for line in self.read():
-            if "exiting successfully" in line:
-                complete = True
-        return complete
+        return self._last("success") is not None
 
     def get_runtype(self):
         """
         Returns runtype. For example, for MP2 single points, the line `energy('mp2')` is used. 
         This method returns the string 'energy'.
         """
-        for line in self.read():
-            # need regex for energy('mp2') or optimize('scf', dertype='hess') (any number of k-v pairs)
-            if re.search("[A-z]*\('[A-z0-9]*'(.?\s*[A-z]*='[A-z]*')*\)", line):
-                if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
-                    return line.split("(")[0]
-                else:  # optimize('scf', dertype='hess'......)
-                    return line.split("(")[0]  
-                    # add to this later, using the collect additional data
+        # need regex for energy('mp2') or optimize('scf', dertype='hess') (any number of k-v pairs)
+        for line in self._lines("call"):
+            if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
+                return line.split("(")[0]
+            else:  # optimize('scf', dertype='hess'......)
+                return line.split("(")[0]
+                # add to this later, using the collect additional data
 
     @property
     def method(self):
@@ -38,13 +47,12 @@ class PsiResults(Results):
         Returns energy type. For example, for MP2 single points, the line `energy('mp2')` is used. 
         This method returns the string 'mp2'.
         """
-        for line in self.read():
-            # need regex for energy('mp2') or optimize('scf', dertype='hess') (any number of k-v pairs)
-            if re.search("[A-z]*\('[A-z0-9]*'(.?\s*[A-z]*='[A-z]*')*\)", line):
-                if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
-                    return re.search("[A-z]*\('([A-z0-9]*)'\)", line).group(1)
-                # else: #optimize('scf', dertype='hess'......)
-                # return line.split('(')[0] #add to this later,
+        # need regex for energy('mp2') or optimize('scf', dertype='hess') (any number of k-v pairs)
+        for line in self._lines("call"):
+            if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
+                return re.search("[A-z]*\('([A-z0-9]*)'\)", line).group(1)
+            # else: #optimize('scf', dertype='hess'......)
+            # return line.split('(')[0] #add to this later,
 
     def is_optimisation(self):
         return self.get_runtype() == "optimize"
@@ -57,9 +65,9 @@ class PsiResults(Results):
 
     @property
     def multiplicity(self):
-        for line in self.read():
-            if "Geometry (in Angstrom)" in line:
-                return int(line.split()[-1].replace(":", ""))
+        line = self._first("geometry")
+        if line is not None:
+            return int(line.split()[-1].replace(":", ""))
 
     def _neutral_homo_lumo(self):
         """
@@ -67,7 +75,8 @@ class PsiResults(Results):
         """
         found_region = False
         energies = []
-        for line in self.read():
+        start = self._offset("orbital_energies")
+        for line in self.read_from(start) if start is not None else ():
             if "Orbital Energies" in line:
                 found_region = True
             if "Final Occupation" in line:
@@ -90,7 +99,10 @@ class PsiResults(Results):
         found_virtual = False
         singly = []
         virtual = []
-        for line in self.read():
+        # nothing is collected before the first of either marker
+        starts = [self._offset("singly_occupied"), self._offset("virtual")]
+        starts = [start for start in starts if start is not None]
+        for line in self.read_from(min(starts)) if starts else ():
             if "Singly Occupied" in line:
                 found_singly_occupied = True
             if "Virtual" in line:
@@ -159,20 +171,17 @@ class PsiResults(Results):
         """
         Returns basis set.
         """
-        for line in self.read():
-            if re.search("basis\s\w*(\-?\w*){1,2}$", line):
-                return line.split()[-1]
+        line = self._first("basis")
+        if line is not None:
+            return line.split()[-1]
 
     @property
     def total_energy(self):
         """
         Returns total energy, printed for scf calculations.
         """
-        total = ""
-        for line in self.read():
-            if "Total Energy =" in line:
-                total = float(line.split("=")[1].strip())
-        return total
+        line = self._last("total_energy")
+        return float(line.split("=")[1].strip()) if line is not None else ""
 
     def _scf_data(self):
         """
@@ -195,33 +204,24 @@ class PsiResults(Results):
         """
         Returns 'reference energy' from MP2 calculations.
         """
-        HF = ""
-        for line in self.read():
-            if "Reference Energy          =" in line:
-                HF = float(line.split("=")[1].split()[0].strip())
-        return HF
+        line = self._last("reference_energy")
+        return float(line.split("=")[1].split()[0].strip()) if line is not None else ""
 
     @property
     def mp2_opp(self):
         """
         Returns MP2 opposite spin energy.
         """
-        opp = ""
-        for line in self.read():
-            if "Opposite-Spin Energy      =" in line:
-                opp = float(line.split("=")[1].split()[0].strip())
-        return opp
+        line = self._last("opposite_spin")
+        return float(line.split("=")[1].split()[0].strip()) if line is not None else ""
 
     @property
     def mp2_same(self):
         """
         Returns MP2 same spin energy.
         """
-        same = ""
-        for line in self.read():
-            if "Same-Spin Energy          =" in line:
-                same = float(line.split("=")[1].split()[0].strip())
-        return same
+        line = self._last("same_spin")
+        return float(line.split("=")[1].split()[0].strip()) if line is not None else ""
 
     def _mp2_data(self):
         """
@@ -1,18 +1,24 @@
 from .check_frags import *
+from .duplicates import *
 from .fluorescence import *
 from .free_energy_interactions import *
 from .grep_results import *
 from .int_energies import *
 from .make_dir_tree import *
 from .make_files_meta import *
+from .screening import *
+from .solvation_shells import *
 from .structures import *
 
 __all__ = []
 __all__ += check_frags.__all__
+__all__ += duplicates.__all__
 __all__ += fluorescence.__all__
 __all__ += free_energy_interactions.__all__
 __all__ += grep_results.__all__
 __all__ += int_energies.__all__
 __all__ += make_dir_tree.__all__
 __all__ += make_files_meta.__all__
+__all__ += screening.__all__
+__all__ += solvation_shells.__all__
 __all__ += structures.__all__
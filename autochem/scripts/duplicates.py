@@ -0,0 +1,101 @@
+from ..core.molecule import Molecule
+from ..core.rmsd import canonical_coords, kabsch_rmsd, matched_rmsd
+from ..core.utils import parallel_map
+
+import os
+import shutil
+import numpy as np
+
+__all__ = ["find_duplicates", "remove_duplicates"]
+
+
+def _canonical(file):
+    return canonical_coords(Molecule(using=file))
+
+
+def _radial_profile(coords, groups):
+    """
+    Distance of each atom from the centre, sorted within each group. The RMS
+    difference between the profiles of two configurations is never more than
+    the RMSD between them, however their atoms are matched or rotated.
+    """
+    radii = np.linalg.norm(coords - coords.mean(axis=0), axis=1)
+    return radii[np.lexsort((radii, groups))]
+
+
+def find_duplicates(files, threshold=0.1, jobs=1):
+    """
+    Finds configurations that are the same to within `threshold` Å RMSD,
+    after matching atoms fragment by fragment and element by element, and
+    aligning with the Kabsch algorithm. Files are read and fragmented on a
+    pool of `jobs` processes (serially by default, 0 or None for every core).
+    Configurations are only compared with those of the same composition,
+    and each is compared with all of the configurations kept so far in one
+    batch. Returns a dictionary of {duplicate file: (file kept, rmsd)}.
+    """
+    files = list(files)
+    results = parallel_map(_canonical, files, jobs=jobs)
+
+    compositions = {}
+    for file, (key, coords, groups) in zip(files, results):
+        compositions.setdefault(key, []).append((file, coords, groups))
+
+    duplicates = {}
+    for members in compositions.values():
+        kept_files = []
+        kept = np.empty((len(members), *members[0][1].shape))
+        profiles = np.empty((len(members), len(members[0][1])))
+        for file, coords, groups in members:
+            match = None
+            profile = _radial_profile(coords, groups)
+            n = len(kept_files)
+            if n:
+                rmsd = kabsch_rmsd(coords, kept[:n])
+                best = rmsd.argmin()
+                if rmsd[best] < threshold:
+                    match = best, rmsd[best]
+                else:
+                    # equivalent atoms, or whole fragments, may be swapped
+                    # over; only configurations whose radial profiles are
+                    # close enough can be under the threshold once matched
+                    diff = profiles[:n] - profile
+                    bound = np.sqrt((diff * diff).mean(axis=1))
+                    for other in np.argsort(bound).tolist():
+                        if bound[other] >= threshold:
+                            break
+                        refined = matched_rmsd(kept[other], coords, groups)
+                        if refined < threshold:
+                            match = other, refined
+                            break
+            if match is not None:
+                duplicates[file] = (kept_files[match[0]], float(match[1]))
+                continue
+            kept[n] = coords
+            profiles[n] = profile
+            kept_files.append(file)
+    return duplicates
+
+
+def remove_duplicates(directory=".", threshold=0.1, jobs=1):
+    """
+    Moves xyz files of duplicate configurations out of `directory` into a
+    ``duplicates`` subdirectory, so that jobs are only made for unique
+    configurations when `xyz_to_tree` is run afterwards. Two configurations
+    are duplicates if the RMSD between them is under `threshold` Å once atoms
+    are matched and aligned (see `find_duplicates`). The first file, in
+    alphabetical order, of each set of duplicates is kept.
+
+    >>> remove_duplicates('files', threshold=0.1)
+    """
+    files = sorted(
+        os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".xyz")
+    )
+    duplicates = find_duplicates(files, threshold=threshold, jobs=jobs)
+    if duplicates:
+        dest = os.path.join(directory, "duplicates")
+        os.makedirs(dest, exist_ok=True)
+        for file, (original, rmsd) in sorted(duplicates.items()):
+            print(f"{os.path.basename(file)} duplicates {os.path.basename(original)} (RMSD {rmsd:.3f} Å)")
+            shutil.move(file, os.path.join(dest, os.path.basename(file)))
+    print(f"{len(duplicates)} duplicates of {len(files)} configurations moved")
+    return duplicates
@@ -1,13 +1,16 @@
 from ..core.atom import Atom
+from ..core.cache import ResultsCache
 from ..core.molecule import Molecule
 from ..core.thermo import thermo_data, freq_data_gamess, freq_data_gauss
 from ..core.utils import (
     check_user_input,
-    eof,
+    find_last,
     get_files,
     list_of_dicts_to_one_level_dict,
+    parallel_map,
     read_file,
     responsive_table,
+    sniff_log_type,
     write_csv_from_dict,
     write_csv_from_nested,
 )
@@ -15,6 +18,7 @@ from ..interfaces.gamess_results import GamessResults
 from ..interfaces.orca_results import OrcaResults
 from ..interfaces.psi_results import PsiResults
 from ..interfaces.gaussian_results import GaussianResults
+from functools import partial
 import os
 import re
 import sys
@@ -27,6 +31,7 @@ __all__ = [
     "energies",
     "print_freqs",
     "print_freqs_to_csv",
+    "read_charges",
     "energy_table",
     "search_for_coords",
     "thermochemistry",
@@ -63,31 +68,29 @@ def search_for_coords(dir):
                 print()
 
 
-def file_as_results_class(log):
-    """Return an instance of the desired class- |GamessResults|, |PsiResults|"""
-    log_type = get_type(log)
-    logs = {
-        "gamess": GamessResults(log),
-        "orca": OrcaResults(log),
-        "psi": PsiResults(log),
-        "gaussian": GaussianResults(log),
-    }
-    return logs.get(log_type, None)
+RESULTS_CLASSES = {
+    "gamess": GamessResults,
+    "orca": OrcaResults,
+    "psi": PsiResults,
+    "gaussian": GaussianResults,
+}
+
+
+def file_as_results_class(log, log_type=None):
+    """
+    Return an instance of the desired class- |GamessResults|, |PsiResults|.
+    Give `log_type` if already known, to save looking at the file again.
+    """
+    cls = RESULTS_CLASSES.get(log_type or get_type(log))
+    return None if cls is None else cls(log)
 
 
 def get_type(filepath):
     """
-    Read in file, determine calculation type
+    Determine calculation type from the banner near the start (or end) of
+    the file, see |sniff_log_type|
     """
-    for line in read_file(filepath):
-        if "GAMESS" in line:
-            return "gamess"
-        elif "Psi4" in line or "PSI4" in line:
-            return "psi"
-        elif "Gaussian" in line:
-            return "gaussian"
-        elif "O   R   C   A" in line:
-            return "orca"
+    return sniff_log_type(filepath)
 
 
 def need_gauss_energy(calc):
@@ -100,29 +103,39 @@ def need_gauss_energy(calc):
         calc, GaussianResults) and calc.is_optimisation() or calc.is_spec()
 
 
-def energies(dir, filepath_includes):
+def _energy_data(log, filetype):
+    calc = file_as_results_class(log, filetype)
+    if calc is None:  # if log/out files are not logs of calculations
+        return None
+    if (
+            calc.completed()
+    ):  # add provision for energies of opts only if equilibrium found
+        if not calc.is_hessian() or need_gauss_energy(calc):
+            return {"data": list(calc.get_data()), "type": filetype}
+    return None
+
+
+def energies(dir, filepath_includes, use_cache=True, jobs=1):
     """
-    Used internally to parse log files for energies
+    Used internally to parse log files for energies. Logs are parsed on
+    `jobs` processes (0 or None for every core), and results are kept in the |ResultsCache| unless
+    `use_cache` is False.
     """
     output = []
-    for log in get_files(dir, (".out", ".log"),
-                         filepath_includes=filepath_includes):
-        calc = file_as_results_class(log)
-        filetype = get_type(log)
-        try:
-            if (
-                    calc.completed()
-            ):  # add provision for energies of opts only if equilibrium found
-                if not calc.is_hessian() or need_gauss_energy(calc):
-                    print(log)
-                    data = calc.get_data()
-                    output.append({"data": data, "type": filetype})
-        except AttributeError:  # if log/out files are not logs of calculations
-            continue
+    logs = get_files(dir, (".out", ".log"), filepath_includes=filepath_includes)
+    with ResultsCache(enabled=use_cache) as cache:
+        logs = cache.calculations(logs)
+        results = cache.map(_energy_data, logs, "energies", jobs=jobs)
+    for log, result in zip(logs, results):
+        if result is not None:
+            print(log)
+            # file and path as found this time
+            result["data"][:2] = reversed(os.path.split(log))
+            output.append(result)
     return output
 
 
-def energy_table(dir, file_name, string_to_find=None, autosave=None):
+def energy_table(dir, file_name, string_to_find=None, autosave=None, use_cache=True, jobs=1):
     """
     Prints energies of all log/out files in current and any sub directories to the screen,
     with the option of saving to csv.
@@ -132,7 +145,7 @@ def energy_table(dir, file_name, string_to_find=None, autosave=None):
     data = [[], [], [], [], [], [], [], []]
     # at some point, will make this a dictionary, loads clearer that way.
 
-    output = energies(dir, filepath_includes=string_to_find)
+    output = energies(dir, filepath_includes=string_to_find, use_cache=use_cache, jobs=jobs)
 
     def add_data(data, vals):
         """
@@ -175,7 +188,16 @@ def energy_table(dir, file_name, string_to_find=None, autosave=None):
     write_csv_from_dict(table_data, filename=file_name, autosave=autosave)
 
 
-def homo_lumo_gaps(dir, output, string_to_find=None, autosave=None):
+def _homo_lumo_data(log, log_type):
+    calc = file_as_results_class(log, log_type)
+    if calc is None:  # if log/out files are not logs of calculations
+        return None
+    if calc.completed() and calc.is_spec():
+        return calc.homo_lumo_info
+    return None
+
+
+def homo_lumo_gaps(dir, output, string_to_find=None, autosave=None, use_cache=True, jobs=1):
     """
     Returns HOMO-LUMO or SOMO-LUMO gaps for each single point calculation
     found in any subdirectory. Currently restricted to single points for
@@ -183,16 +205,14 @@ def homo_lumo_gaps(dir, output, string_to_find=None, autosave=None):
     would have to check the log files first.
     """
     info = []
-    for log in get_files(dir, (".out", ".log"),
-                         filepath_includes=string_to_find):
-        calc = file_as_results_class(log)
-        filetype = get_type(log)
-        try:
-            if calc.completed() and calc.is_spec():
-                data = calc.homo_lumo_info
-                info.append(data)
-        except AttributeError:  # if log/out files are not logs of calculations
-            continue
+    logs = get_files(dir, (".out", ".log"), filepath_includes=string_to_find)
+    with ResultsCache(enabled=use_cache) as cache:
+        logs = cache.calculations(logs)
+        results = cache.map(_homo_lumo_data, logs, "homo_lumo", jobs=jobs)
+    for log, data in zip(logs, results):
+        if data is not None:
+            data["Path"], data["File"] = os.path.split(log)
+            info.append(data)
     if len(info) == 0:
         sys.exit("Error: No single points found")
     info = list_of_dicts_to_one_level_dict(info)
@@ -201,7 +221,20 @@ def homo_lumo_gaps(dir, output, string_to_find=None, autosave=None):
     return info
 
 
-def thermochemistry(dir, string_to_find, mult, temp, output, autosave=None):
+def _thermo_data(log, log_type, mult, temp):
+    r = file_as_results_class(log, log_type)
+    if r is None:
+        return None
+    if r.completed():
+        if r.is_hessian():
+            res = thermo_data(r.log, mult, temp)
+            res["Method"] = r.method
+            res["Basis"] = r.basis
+            return res
+    return None
+
+
+def thermochemistry(dir, string_to_find, mult, temp, output, autosave=None, use_cache=True, jobs=1):
     """
     Returns thermochemical data for all the relevant hessian log files in the given directory and
     subdirectories. Saves to csv file.
@@ -222,26 +255,19 @@ def thermochemistry(dir, string_to_find, mult, temp, output, autosave=None):
         "TC - TS": [],
     }
     print("Print csv for more info")
-    for log in get_files(dir, (".log", ".out"),
-                         filepath_includes=string_to_find):
-        r = file_as_results_class(log)
-        try:
-            if r.completed():
-                if r.is_hessian():
-                    res = thermo_data(r.log, mult, temp)
-                    res["File"] = r.log
-                    res["Method"] = r.method
-                    res["Basis"] = r.basis
-                    res["Temperature [K]"] = temp
-                    res["Multiplicity given"] = mult
-
-                    for k, v in res.items():
-                        collected[k].append(v)
-        except AttributeError:
-            continue
-        except UnicodeDecodeError:
-            print(f"{log}- UnicodeDecodeError")
-            continue
+    logs = get_files(dir, (".log", ".out"), filepath_includes=string_to_find)
+    with ResultsCache(enabled=use_cache) as cache:
+        logs = cache.calculations(logs)
+        results = cache.map(partial(_thermo_data, mult=mult, temp=temp), logs,
+                            f"thermo {mult} {temp}", jobs=jobs)
+    for log, res in zip(logs, results):
+        if res is not None:
+            res["File"] = log
+            res["Temperature [K]"] = temp
+            res["Multiplicity given"] = mult
+
+            for k, v in res.items():
+                collected[k].append(v)
 
     # add units to dict keys
 
@@ -270,7 +296,14 @@ def thermochemistry(dir, string_to_find, mult, temp, output, autosave=None):
     name = write_csv_from_dict(collected, filename=output, autosave=autosave)
 
 
-def print_freqs(dir, output, string_to_find=None, autosave=None):
+def _freq_data(file, log_type):
+    calc = file_as_results_class(file, log_type)
+    if calc is not None and calc.is_hessian():
+        return calc.frequencies, calc.intensities
+    return None
+
+
+def print_freqs(dir, output, string_to_find=None, autosave=None, use_cache=True, jobs=1):
     """
     Writes frequencies and intensities of GAMESS/Gaussian frequency calculations
     to a csv. Works recursively through the file system.
@@ -279,14 +312,17 @@ def print_freqs(dir, output, string_to_find=None, autosave=None):
     data["File"] = []
     data["Frequencies"] = []
     data["Intensities"] = []
-    for file in get_files(dir, ["log", "out"],
-                          filepath_includes=string_to_find):
-        if "slurm" not in file:
-            calc = file_as_results_class(file)
-            if calc.is_hessian():
-                data["Frequencies"] += calc.frequencies
-                data["Intensities"] += calc.intensities
-                data["File"] += [calc.log] * len(calc.frequencies)
+    files = [file for file in get_files(dir, ["log", "out"], filepath_includes=string_to_find)
+             if "slurm" not in file]
+    with ResultsCache(enabled=use_cache) as cache:
+        files = cache.calculations(files)
+        results = cache.map(_freq_data, files, "freqs", jobs=jobs)
+    for file, found in zip(files, results):
+        if found is not None:
+            frequencies, intensities = found
+            data["Frequencies"] += frequencies
+            data["Intensities"] += intensities
+            data["File"] += [file] * len(frequencies)
     responsive_table(data, strings=[1])
     write_csv_from_dict(data, filename=output, autosave=autosave)
 
@@ -383,23 +419,103 @@ def get_h_bonds(dir, output=None, string_to_find=None, autosave=None):
         )
 
 
-def file_is_gamess(file):
-    """ Check first line of file for 'rungms' string """
-    with open(file, "r") as f:
-        return "rungms" in f.readline()
+def _log_charges(logfile, log_type=None):
+    """
+    Reads what |read_charges| needs from the log itself: the charge on each
+    atom and, for Gaussian, the coordinates, as a dictionary of "charges"
+    and "atoms" (a list of [symbol, x, y, z], or None to take them from the
+    inp file). Returns None for other log files.
+    """
+    log_type = log_type or get_type(logfile)
+    if log_type == "gaussian":
+        atoms = []
+        atom_regex = "^\s?[A-z]{1,2}(\s+-?[0-9]+\.[0-9]+){3}"
+        charge_regex = "^\s+[0-9]+\s+[A-z]{1,2}\s+-?[0-9]+\.[0-9]+"
+        #     1  C   -0.122119
+        for line in read_file(logfile):
+            if re.search(atom_regex, line):
+                sym, x, y, z = line.split()
+                atoms.append([sym, float(x), float(y), float(z)])
+        charges = []
+        # last block of charges, searched for from the end of the log
+        last = find_last(logfile, "Mulliken charges:")
+        if last is not None:
+            with open(logfile, "rb") as f:
+                f.seek(last[0])
+                for raw in f:
+                    line = raw.decode(errors="replace")
+                    if "Sum of Mulliken charges" in line:
+                        break
+                    if re.search(charge_regex, line):
+                        charges.append(float(line.split()[-1]))
+        return {"atoms": atoms, "charges": charges}
+
+    if log_type == "gamess":
+        charge_regex = "^\s[A-Za-z]{1,2}(\s*-?[0-9]*.[0-9]*){2}$"
+        found = False
+        charges = []
+        for line in read_file(logfile):
+            if "NET CHARGES:" in line:
+                found = True
+            if "RMS DEVIATION" in line:
+                break
+            if found:
+                if re.search(charge_regex, line):
+                    charges.append(float(line.split()[1]))
+        return {"atoms": None, "charges": charges}
+    return None
+
+
+def _charged_molecule(logfile, found):
+    """
+    Builds the fragmented |Molecule| for the charges from |_log_charges|,
+    taking coordinates of GAMESS calculations from the matching inp file
+    """
+    atoms = found["atoms"]
+    if atoms is None:
+        atom_regex = "^\s[A-Za-z]{1,2}\s*[0-9]*.[0-9]*(\s*-?[0-9]*.[0-9]*){3}$"
+        atoms = []
+        for line in read_file(logfile[:-3] + "inp"):
+            if re.search(atom_regex, line):
+                sym, atnum, x, y, z = line.split()
+                atoms.append([sym, float(x), float(y), float(z)])
+    if len(atoms) != len(found["charges"]):
+        raise ValueError(
+            f"read_charges: {len(found['charges'])} charges for {len(atoms)} atoms in {logfile}"
+        )
+    mol = Molecule(atoms=[Atom(sym, coords=(x, y, z)) for sym, x, y, z in atoms])
+    mol.separate()
+    return mol, found["charges"]
 
 
-def file_is_gaussian(file):
-    """ Check for the word Gaussian in the first 5 lines """
-    for number, line in enumerate(read_file(file)):
-        if "gaussian" in line.lower():
-            return True
-        if number == 5:
-            break
-    return False
+def read_charges(logfile):
+    """
+    Reads the charge on each atom of one calculation: geodesic charges from
+    a GAMESS log (with coordinates from the matching inp file) or Mulliken
+    charges from a Gaussian log. Returns a fragmented |Molecule| and a list
+    of charges in the order of its atoms, or None for other log files.
+    """
+    found = _log_charges(logfile)
+    if found is None:
+        return None
+    return _charged_molecule(logfile, found)
+
+
+def _charge_rows(args):
+    logfile, found = args
+    try:
+        mol, atom_charges = _charged_molecule(logfile, found)
+    except (OSError, ValueError) as e:
+        print(f"{logfile}: skipped, {e}")
+        return None
+    labels = mol.fragment_labels()
+    return [
+        [atom.index, atom.symbol, charge, atom.x, atom.y, atom.z, label or "NA"]
+        for atom, charge, label in zip(mol.coords, atom_charges, labels)
+    ]
 
 
-def charges(dir, output, string_to_find=None, autosave=None):
+def charges(dir, output, string_to_find=None, autosave=None, use_cache=True, jobs=1):
     """
     Recursively pulls geodesic charges from GAMESS calculations.
     Pulls mulliken charges from Gaussian calculations.
@@ -408,111 +524,17 @@ def charges(dir, output, string_to_find=None, autosave=None):
     results = []
 
     files = get_files(dir, ["log"], filepath_includes=string_to_find)
-    for logfile in files:
-        if file_is_gaussian(logfile):
-            res = []
-            assigned = []
-            print(logfile)
-            atom_regex = "^\s?[A-z]{1,2}(\s+-?[0-9]+\.[0-9]+){3}"
-            charge_regex = "^\s+[0-9]+\s+[A-z]{1,2}\s+-?[0-9]+\.[0-9]+"
-            #     1  C   -0.122119
-            for line in read_file(logfile):
-                if re.search(atom_regex, line):
-                    sym, x, y, z = line.split()
-                    x, y, z = map(float, (x, y, z))
-                    res.append([logfile, Atom(sym, coords=(x, y, z))
-                                ])  # new key for each coord
-            found = False
-            counter = 0
-            for line in eof(logfile, 0.20):
-                if "Mulliken charges:" in line:
-                    found = True
-                if "Sum of Mulliken charges" in line:
-                    break
-                if found:
-                    if re.search(charge_regex, line):
-                        res[counter].append(float(line.split()[-1]))
-                        counter += 1
-            coordinates = [atom[1] for atom in res]
-            mol = Molecule(atoms=coordinates)
-            mol.separate()
-            for atom, r in zip(mol.coords, res):
-                path, _, charge = r
-                try:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        f"{mol.fragments[atom.mol]['name']}_{atom.mol}",
-                    ])
-                except KeyError:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        geodesic_charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        "NA",
-                    ])
-
-        if file_is_gamess(logfile):
-            atom_regex = "^\s[A-Za-z]{1,2}\s*[0-9]*.[0-9]*(\s*-?[0-9]*.[0-9]*){3}$"
-            charge_regex = "^\s[A-Za-z]{1,2}(\s*-?[0-9]*.[0-9]*){2}$"
-            print(logfile)
-            inpfile = logfile[:-3] + "inp"
-
-            res = []
-
-            for line in read_file(inpfile):
-                if re.search(atom_regex, line):
-                    sym, atnum, x, y, z = line.split()
-                    x, y, z = map(float, (x, y, z))
-                    res.append([logfile, Atom(sym, coords=(x, y, z))
-                                ])  # new key for each coord
-            found = False
-            counter = 0
-            for line in read_file(logfile):
-                if "NET CHARGES:" in line:
-                    found = True
-                if "RMS DEVIATION" in line:
-                    break
-                if found:
-                    if re.search(charge_regex, line):
-                        res[counter].append(float(line.split()[1]))
-                        counter += 1
-            coordinates = [atom[1] for atom in res]
-            mol = Molecule(atoms=coordinates)
-            mol.separate()
-            for atom, r in zip(mol.coords, res):
-                path, _, geodesic_charge = r
-                try:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        geodesic_charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        f"{mol.fragments[atom.mol]['name']}_{atom.mol}",
-                    ])
-                except KeyError:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        geodesic_charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        "NA",
-                    ])
+    # only what is read from the log is cached: coordinates in inp files and
+    # the molecules known for labelling fragments may change on their own
+    with ResultsCache(enabled=use_cache) as cache:
+        files = cache.calculations(files)
+        found = cache.map(_log_charges, files, "charges", jobs=jobs)
+    found = [(logfile, data) for logfile, data in zip(files, found) if data is not None]
+    for (logfile, _), rows in zip(found, parallel_map(_charge_rows, found, jobs=jobs)):
+        if rows is None:
+            continue
+        print(logfile)
+        results += [[logfile] + row for row in rows]
 
     # nested list (one level) to dict
     data = {}
@@ -0,0 +1,160 @@
+from ..core.atom import AtomTable
+from ..core.electrostatics import (
+    charge_templates,
+    coulomb_matrix,
+    fragment_charges,
+    fragment_positions,
+    template_charges,
+)
+from ..core.graph import connected_components
+from ..core.molecule import Molecule
+from ..core.neighbours import bonded_pairs
+from ..core.periodic_table import PeriodicTable as PT
+from ..core.utils import get_files, parallel_map
+from ..core.xyz import read_xyz_arrays
+from .grep_results import read_charges
+
+import os
+import shutil
+import numpy as np
+
+__all__ = ["estimate_interaction_energy", "screen_configurations"]
+
+
+def _fragment_positions(mol):
+    """
+    |fragment_positions| of a |Molecule|, refusing molecules with atoms in
+    no known fragment, whose interactions would be left out of the estimate
+    """
+    keys, labels = fragment_positions(mol)
+    unknown = np.count_nonzero(labels < 0)
+    if unknown:
+        raise ValueError(f"{unknown} atoms are in no known fragment")
+    return keys, labels
+
+
+def estimate_interaction_energy(mol, templates, orders=None):
+    """
+    Cheap estimate of the interaction energy of a |Molecule|, in kJ/mol: the
+    sum of the point charge interactions between every pair of fragments,
+    with charges from |charge_templates| (see |template_charges| for
+    `orders`). Raises a ValueError if any atom is in no known fragment.
+    """
+    keys, labels = _fragment_positions(mol)
+    charges = template_charges(mol, templates, orders)
+    energies = coulomb_matrix(mol.coord_array, charges, labels, len(keys), cell=mol.cell)
+    return float(np.triu(energies, 1).sum())
+
+
+def _read(file):
+    try:
+        return read_xyz_arrays(file)
+    except (OSError, ValueError) as e:
+        print(f"Skipping {os.path.basename(file)}: {e}")
+        return None
+
+
+def _estimate_batch(mol, coords, templates, orders):
+    """
+    Estimates for an (M, N, 3) array of configurations of the atoms of a
+    |Molecule|, all split into the same fragments as it
+    """
+    fragments = [(frag["name"], [atom.index - 1 for atom in frag["atoms"]])
+                 for frag in mol.fragments.values()]
+    keys, labels = _fragment_positions(mol)
+    charges = fragment_charges(coords, mol.atnums, fragments, templates, orders)
+    energies = coulomb_matrix(coords, charges, labels, len(keys))
+    return np.triu(energies, 1).sum(axis=(1, 2)).tolist()
+
+
+def _estimate_group(files, symbols, coords, templates, orders):
+    """
+    Estimates for configurations of the same atoms, an (M, N, 3) array of
+    coordinates. Each configuration's bonded atoms are found once, with a
+    cell list, and configurations whose atoms join up into the same
+    molecules are worked out together, with the fragments of the first.
+    """
+    atnums = PT.get_atnums(symbols)
+    radii = PT.vdw_radii[atnums]
+    batches = {}
+    for frame in range(len(files)):
+        i, j, _ = bonded_pairs(coords[frame], radii)
+        pieces = connected_components(len(atnums), i, j)
+        batches.setdefault(pieces.tobytes(), []).append(frame)
+
+    energies = [None] * len(files)
+    for frames in batches.values():
+        try:
+            mol = Molecule(atoms=AtomTable(atnums, coords[frames[0]]).atoms())
+            found = _estimate_batch(mol, coords[frames], templates, orders)
+            for frame, energy in zip(frames, found):
+                energies[frame] = energy
+        except ValueError as e:
+            for frame in frames:
+                print(f"Skipping {os.path.basename(files[frame])}: {e}")
+    return energies
+
+
+def screen_configurations(directory=".", reference=".", keep=None, jobs=1):
+    """
+    Ranks the xyz files in `directory` by an electrostatic estimate of
+    their interaction energy, most negative first, so that only the most
+    promising configurations need FMO/MP2 calculations. Charges for each
+    kind of fragment are taken from the GAMESS and Gaussian log files found
+    under `reference` (see |read_charges|), averaged over every fragment of
+    the same name. Files are read on a pool of `jobs` processes (serially
+    by default, 0 or None for every core).
+
+    Files with the same atoms in the same order, whose atoms join up into
+    the same molecules, are estimated together: the first is split into
+    fragments, and the rest share those fragments. Their charges (see
+    |fragment_charges|) and interactions (see |coulomb_matrix|) are then
+    worked out for all of them at once.
+
+    If `keep` is given, all but the best `keep` configurations are moved
+    into a ``screened_out`` subdirectory, ready for `xyz_to_tree`. Returns a
+    list of (file, energy) from best to worst. Files with fragments that
+    have no charges, or with atoms in no known fragment, are reported and
+    left out, and never moved.
+
+    >>> screen_configurations('files', reference='charges', keep=20)
+    """
+    calculations = []
+    for logfile in get_files(reference, ["log"]):
+        found = read_charges(logfile)
+        if found is not None:
+            calculations.append(found)
+    if not calculations:
+        raise ValueError(f"screen_configurations: No charges found in log files under {reference}")
+    templates = charge_templates(calculations)
+
+    files = sorted(
+        os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".xyz")
+    )
+    groups = {}
+    for file, found in zip(files, parallel_map(_read, files, jobs=jobs)):
+        if found is not None:
+            symbols, coords = found
+            members = groups.setdefault(tuple(symbols), ([], []))
+            members[0].append(file)
+            members[1].append(coords)
+    energies = {}
+    orders = {}
+    for symbols, (members, coords) in groups.items():
+        found = _estimate_group(members, list(symbols), np.stack(coords), templates, orders)
+        energies.update(zip(members, found))
+
+    ranked = sorted(
+        ((file, energies[file]) for file in files if energies.get(file) is not None),
+        key=lambda pair: pair[1],
+    )
+    for rank, (file, energy) in enumerate(ranked, 1):
+        print(f"{rank:>5}  {energy:>12.1f} kJ/mol  {os.path.basename(file)}")
+
+    if keep is not None and len(ranked) > keep:
+        dest = os.path.join(directory, "screened_out")
+        os.makedirs(dest, exist_ok=True)
+        for file, _ in ranked[keep:]:
+            shutil.move(file, os.path.join(dest, os.path.basename(file)))
+        print(f"{len(ranked) - keep} of {len(ranked)} configurations moved to {dest}")
+    return ranked
@@ -0,0 +1,140 @@
+from ..core.atom import AtomTable
+from ..core.graph import connected_components
+from ..core.molecule import Molecule
+from ..core.neighbours import as_cell, make_whole, minimum_image, neighbour_pairs
+from ..core.periodic_table import PeriodicTable as PT
+from ..core.utils import write_xyz
+from ..core.xyz import iter_xyz_frames
+from .make_dir_tree import make_dir_list
+
+import os
+import numpy as np
+
+__all__ = ["extract_shells"]
+
+
+class _Topology:
+    """
+    Fragments of one frame, kept for the frames after it for as long as all
+    of its bonds hold. Shells are cut along the bonds themselves, so that
+    molecules missing from molecules.txt are kept whole too. Only bonds that break are noticed: fragments that
+    come within bonding distance of each other are kept apart until a bond
+    breaks somewhere, as finding new contacts would take a neighbour search
+    of the whole box every frame.
+    """
+
+    def __init__(self, atnums, coords, cell):
+        self.atnums = atnums
+        self.mol = Molecule(atoms=AtomTable(atnums, coords).atoms(), cell=cell)
+        self.labels = self.mol.fragment_keys
+        self.i, self.j = self.mol.find_bonded_pairs()
+        self.components = connected_components(len(atnums), self.i, self.j)
+        radii = PT.vdw_radii[self.mol.atnums]
+        self.cutoff = radii[self.i] + radii[self.j]
+
+    def target_rows(self, target):
+        """Rows of the atoms of `target`, a fragment name (the first of that name) or number"""
+        fragments = self.mol.fragments
+        keys = list(fragments)
+        if isinstance(target, str):
+            names = [fragments[key]["name"] for key in keys]
+            if target not in names:
+                raise ValueError(f"extract_shells: No {target} fragment found, only {sorted(set(names))}")
+            target = keys[names.index(target)]
+        elif target not in fragments:
+            raise ValueError(f"extract_shells: No fragment numbered {target}")
+        return np.nonzero(self.labels == target)[0]
+
+    def shell_rows(self, coords, target_rows, radius, cell):
+        """
+        Rows of the atoms of `target_rows`, and of every molecule with an
+        atom within `radius` of one of them, in ascending order. Only atoms
+        close enough to the target's first atom to be in range are passed
+        to the cell list search.
+        """
+        centre = coords[target_rows[0]]
+        diff = minimum_image(coords - centre, cell)
+        from_centre = np.sqrt((diff * diff).sum(axis=1))
+        candidates = np.nonzero(from_centre < from_centre[target_rows].max() + radius)[0]
+        i, j, _ = neighbour_pairs(coords[candidates], radius, cell)
+        in_target = np.isin(candidates, target_rows)
+        close = np.concatenate([candidates[j[in_target[i]]], candidates[i[in_target[j]]],
+                                target_rows])
+        near = np.unique(self.components[close])
+        return np.union1d(np.nonzero(np.isin(self.components, near))[0], target_rows)
+
+    def holds(self, coords, cell):
+        diff = minimum_image(coords[self.i] - coords[self.j], cell)
+        return bool(np.all((diff * diff).sum(axis=1) < self.cutoff ** 2))
+
+
+def extract_shells(
+    xyz, target, radius=5.0, output=".", prefix=None, cell=None, every=1, use_mmap=True
+):
+    """
+    Cuts solvation shells out of every frame of a multi-frame xyz file, such
+    as an MD trajectory. Each cluster is the `target` fragment, given as a
+    fragment name (the first fragment of that name) or number, along with
+    every whole molecule that has an atom within `radius` Å of any atom of
+    the target, whether or not it is in molecules.txt. Frames are read one at a time, so memory use does not grow
+    with the length of the trajectory.
+
+    The system is fragmented on the first frame, and again only when a bond
+    of the current fragments breaks, so every frame must hold the same atoms
+    in the same order; a ValueError is raised otherwise. The target is
+    picked out on the first frame, and the same atoms are followed after
+    that, whichever fragments they end up in. Fragments that come within
+    bonding distance of each other are only merged once a bond breaks
+    somewhere. For periodic boxes, pass the `cell` (see |Molecule|), and
+    each cluster is written out whole around the target; `radius` must
+    then be under half the smallest width of the cell.
+
+    Clusters are written in the layout made by `make_tree_and_copy`, ready
+    for `make_job_files`: frame 10 of md.xyz with a c1mim target becomes
+    md/c1mim/f10/md_c1mim_f10.xyz, under `output`. Only every `every`th
+    frame is used. Returns the paths of the files written.
+
+    >>> extract_shells('md.xyz', 'c1mim', radius=6.0, cell=[40.0, 40.0, 40.0])
+    """
+    cell = as_cell(cell)
+    if prefix is None:
+        prefix = os.path.splitext(os.path.basename(xyz))[0]
+    topology = None
+    target_rows = None
+    symbols = None
+    written = []
+    for number, frame in enumerate(iter_xyz_frames(xyz, use_mmap=use_mmap)):
+        if number % every != 0:
+            continue
+        # rows of the topology are only meaningful for the same atoms
+        if symbols is None:
+            symbols = frame.symbols
+        elif frame.symbols != symbols:
+            raise ValueError(
+                f"extract_shells: Frame {number + 1} of {xyz} has different atoms to the first frame"
+            )
+        coords = frame.coords
+        if topology is None or not topology.holds(coords, cell):
+            topology = _Topology(PT.get_atnums(frame.symbols), coords, cell)
+            # the target is found once, then followed atom by atom
+            if target_rows is None:
+                target_rows = topology.target_rows(target)
+
+        rows = topology.shell_rows(coords, target_rows, radius, cell)
+        # each atom at its image nearest the target, then each fragment
+        # joined up along its bonds
+        centre = coords[target_rows[0]]
+        shifted = centre + minimum_image(coords[rows] - centre, cell)
+        if cell is not None:
+            keep = np.isin(topology.i, rows) & np.isin(topology.j, rows)
+            shifted = make_whole(shifted, cell, np.searchsorted(rows, topology.i[keep]),
+                                 np.searchsorted(rows, topology.j[keep]))
+
+        name = f"{prefix}_{target}_f{number}"
+        directory = os.path.join(output, *make_dir_list(f"{name}.xyz"))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.xyz")
+        atoms = AtomTable(topology.atnums[rows], shifted).atoms()
+        write_xyz(atoms=atoms, filename=path)
+        written.append(path)
+    return written
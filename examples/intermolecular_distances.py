@@ -51,39 +51,46 @@ def interatomic_dist(mol, i, j):
     j_mol = mol.fragments[j.mol]['name']
     dist = i.distance_to(j)
     if dist < 2.2 and not i.symbol == j.symbol == 'H': # two hydrogens were being found...
-        if i_mol in ca.Molecule.Cations and j_mol is 'water':
+        if i_mol in ca.Molecule.Cations and j_mol == 'water':
             if not_alkyl(i) or imid_c2_h(i):
                 return 'Cation-Water', dist
-        if i_mol in ca.Molecule.Anions and j_mol is 'water':
+        if i_mol in ca.Molecule.Anions and j_mol == 'water':
             if not_alkyl(i):
                 return 'Anion-Water', dist
         if i_mol in ca.Molecule.Cations and j_mol in ca.Molecule.Anions:
             if not_alkyl(i) or imid_c2_h(i):
                 return 'Cation-Anion', dist
-        if i_mol is 'water' and j_mol is 'water':
+        if i_mol == 'water' and j_mol == 'water':
             return 'Water-Water', dist
 
 
 bonds = {}
 for f in sorted(files):
-    atoms_already_considered = []
+    atoms_already_considered = set()
     bonds[f] = {}
     print(f)
     mol = ca.Molecule(using=f)
     mol.separate()
-    for i in mol.coords:
-        for j in mol.coords:
-            if i.mol != j.mol:  # different fragments
-                indices = sorted([i.index, j.index])
-                if indices not in atoms_already_considered:
-                    ret = interatomic_dist(mol, i, j)
-                    if ret is not None:
-                        bond, dist = ret
-                        if bond not in bonds[f]:
-                            bonds[f][bond] = [dist]
-                        else:
-                            bonds[f][bond].append(dist)
-                        atoms_already_considered.append(indices)
+    # only pairs of atoms under 2.2 Å can count, so take them from a
+    # neighbour search rather than checking every pair of atoms
+    close = mol.distance_matrix(cutoff=2.2)
+    pairs = sorted(
+        [(a, b) for a, b in zip(close.i.tolist(), close.j.tolist())] +
+        [(b, a) for a, b in zip(close.i.tolist(), close.j.tolist())]
+    )
+    for a, b in pairs:
+        i, j = mol.coords[a], mol.coords[b]
+        if i.mol != j.mol:  # different fragments
+            indices = tuple(sorted([i.index, j.index]))
+            if indices not in atoms_already_considered:
+                ret = interatomic_dist(mol, i, j)
+                if ret is not None:
+                    bond, dist = ret
+                    if bond not in bonds[f]:
+                        bonds[f][bond] = [dist]
+                    else:
+                        bonds[f][bond].append(dist)
+                    atoms_already_considered.add(indices)
 
     # if any are not found, still need to add an empty list
     for bond in ('Cation-Water', 'Anion-Water', 'Cation-Anion', 'Water-Water'):
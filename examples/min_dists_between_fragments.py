@@ -6,19 +6,27 @@ from collections import namedtuple
 info = namedtuple("info", "xyz atom1 mol1 atom2 mol2 dist")
 
 def distances(namedtup, molecule):
-    return [
-        namedtup(
-            molecule.xyz,
-            f"{atom1.symbol}_{atom1.index}",
-            atom1.fragment,
-            f"{atom2.symbol}_{atom2.index}",
-            atom2.fragment,
-            atom1.distance_to(atom2),
+    """
+    Shortest distance between each pair of fragments, along with the atoms
+    involved
+    """
+    contacts = molecule.fragment_contacts()
+    frags = [molecule.fragments[key] for key in contacts.keys]
+    names = [frag["atoms"][0].fragment for frag in frags]
+    rows = []
+    for a, b in itertools.combinations(range(len(frags)), 2):
+        atom1, atom2 = (molecule.coords[i] for i in contacts.closest[a, b])
+        rows.append(
+            namedtup(
+                molecule.xyz,
+                f"{atom1.symbol}_{atom1.index}",
+                names[a],
+                f"{atom2.symbol}_{atom2.index}",
+                names[b],
+                float(contacts.min_dist[a, b]),
+            )
         )
-        for frag1, frag2 in itertools.combinations(molecule.fragments.values(), 2)
-        for atom1 in frag1["atoms"]
-        for atom2 in frag2["atoms"]
-    ]
+    return rows
 
 dists = []
 for xyz in glob('*xyz'):
@@ -26,7 +34,5 @@ for xyz in glob('*xyz'):
     dists += distances(info, mol)
 
 df = df_from_namedtuples(info, dists)
-mindists = df.groupby(["xyz", "mol1", "mol2"])["dist"].min().reset_index().sort_values(
-    ["xyz", "mol1", "mol2"]
-)
+mindists = df.sort_values(["xyz", "mol1", "mol2"])
 mindists.to_csv('min_dists_between_frags.csv', index=False)
@@ -0,0 +1,107 @@
+"""The on-disk cache of results parsed from logs"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from autochem.core.cache import ResultsCache
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def _energy(log, log_type):
+    with open(log) as f:
+        return [log_type, len(f.read())]
+
+
+def _fails(log, log_type):
+    raise RuntimeError('cannot parse')
+
+
+class TestResultsCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmp, 'water.out')
+        shutil.copy(os.path.join(DATA, 'orca.out'), self.log)
+        self.db = os.path.join(self.tmp, 'cache', 'results.sqlite')
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def compute(self, value):
+        def compute():
+            self.calls += 1
+            return value
+        return compute
+
+    def test_stored(self):
+        with ResultsCache(self.db) as cache:
+            self.assertEqual(cache.get(self.log, 'energy', self.compute(-76.3)), -76.3)
+        # a new cache on the same database parses nothing again
+        with ResultsCache(self.db) as cache:
+            self.assertEqual(cache.get(self.log, 'energy', self.compute(None)), -76.3)
+            self.assertEqual(cache.get(self.log, 'other', self.compute(None)), None)
+            self.assertEqual(cache.get(self.log, 'other', self.compute(1)), None)
+        self.assertEqual(self.calls, 2)
+
+    def test_log_changed(self):
+        with ResultsCache(self.db) as cache:
+            cache.get(self.log, 'energy', self.compute(-76.3))
+            with open(self.log, 'a') as f:
+                f.write('more\n')
+            self.assertEqual(cache.get(self.log, 'energy', self.compute(-76.4)), -76.4)
+            # same size, later modification time
+            stat = os.stat(self.log)
+            os.utime(self.log, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self.assertEqual(cache.get(self.log, 'energy', self.compute(-76.5)), -76.5)
+        self.assertEqual(self.calls, 3)
+
+    def test_numpy_values(self):
+        value = {'freqs': np.array([1600.5, 3700.25]), 'count': np.int64(3)}
+        with ResultsCache(self.db) as cache:
+            self.assertIs(cache.get(self.log, 'freqs', self.compute(value)), value)
+        with ResultsCache(self.db) as cache:
+            self.assertEqual(cache.get(self.log, 'freqs', self.compute(None)),
+                             {'freqs': [1600.5, 3700.25], 'count': 3})
+
+    def test_unserialisable(self):
+        value = {'atoms': object()}
+        output = io.StringIO()
+        with ResultsCache(self.db) as cache, redirect_stdout(output):
+            self.assertIs(cache.get(self.log, 'atoms', self.compute(value)), value)
+            self.assertIs(cache.get(self.log, 'atoms', self.compute(value)), value)
+        self.assertEqual(self.calls, 2)
+        self.assertIn('atoms not cached', output.getvalue())
+
+    def test_disabled(self):
+        with ResultsCache(self.db, enabled=False) as cache:
+            cache.get(self.log, 'energy', self.compute(1))
+            cache.get(self.log, 'energy', self.compute(1))
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(os.path.exists(self.db))
+
+    def test_map(self):
+        other = os.path.join(self.tmp, 'other.out')
+        shutil.copy(os.path.join(DATA, 'psi.out'), other)
+        logs = [self.log, other]
+        with ResultsCache(self.db) as cache:
+            first = cache.map(_energy, logs, 'size', jobs=1)
+            self.assertEqual(first, [['orca', os.path.getsize(self.log)],
+                                     ['psi', os.path.getsize(other)]])
+            self.assertEqual(cache.map(_fails, logs, 'size', jobs=1), first)
+            # a log that fails gives None and is not stored
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(cache.map(_fails, logs, 'broken', jobs=1), [None, None])
+            self.assertIn('skipped, RuntimeError: cannot parse', output.getvalue())
+            self.assertEqual(cache.map(_energy, logs, 'broken', jobs=1), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""Point charge interactions between fragments, and screening configurations with them"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from autochem import Molecule
+from autochem.core.electrostatics import (COULOMB_CONSTANT, charge_templates, coulomb_matrix,
+                                          fragment_charges, fragment_positions)
+from autochem.core.rmsd import element_order
+from autochem.scripts.screening import screen_configurations
+
+from .test_rmsd import ACETIC_ACID, ELEMENTS, _rotation
+
+WATER = np.array([[0.0, 0.0, 0.0], [0.96, 0.0, 0.0], [-0.24, 0.93, 0.0]])
+CHARGES = np.array([-0.8, 0.4, 0.4])
+
+GAUSSIAN_LOG = """\
+ Entering Gaussian System, Link 0=g16
+{atoms}
+ Mulliken charges:
+               1
+{charges}
+ Sum of Mulliken charges =   0.00000
+ Normal termination of Gaussian 16 at Mon
+"""
+
+
+def _waters(*shifts):
+    return np.concatenate([WATER + shift for shift in shifts])
+
+
+def _brute_force(coords, charges, labels):
+    energy = 0.0
+    for a in range(len(coords)):
+        for b in range(a + 1, len(coords)):
+            if labels[a] != labels[b]:
+                energy += charges[a] * charges[b] / np.linalg.norm(coords[a] - coords[b])
+    return COULOMB_CONSTANT * energy
+
+
+class TestCoulomb(unittest.TestCase):
+
+    def test_matrix(self):
+        rng = np.random.default_rng(0)
+        coords = rng.uniform(0, 10, (5, 12, 3))
+        charges = rng.normal(size=12)
+        labels = np.repeat([0, 1, 2, -1], 3)
+        energies = coulomb_matrix(coords, charges, labels)
+        self.assertEqual(energies.shape, (5, 3, 3))
+        np.testing.assert_allclose(energies, energies.transpose(0, 2, 1))
+        np.testing.assert_array_equal(energies[:, [0, 1, 2], [0, 1, 2]], 0.0)
+        for config, matrix in zip(coords, energies):
+            # atoms labelled -1 are left out
+            kept = labels >= 0
+            expected = _brute_force(config[kept], charges[kept], labels[kept])
+            self.assertAlmostEqual(np.triu(matrix, 1).sum(), expected)
+        np.testing.assert_allclose(coulomb_matrix(coords[2], charges, labels), energies[2])
+
+    def test_fragment_positions(self):
+        mol = Molecule(atoms=[('O', *xyz) for xyz in WATER[:1]] + [('Xe', 5.0, 0.0, 0.0)]
+                       + [(symbol, *xyz) for symbol, xyz in zip('OHH', WATER + [0, 4.0, 0])])
+        keys, labels = fragment_positions(mol)
+        self.assertEqual(len(keys), 1)
+        np.testing.assert_array_equal(labels, [-1, -1, 0, 0, 0])
+
+
+class TestCharges(unittest.TestCase):
+
+    def test_templates(self):
+        mol = Molecule(atoms=[(symbol, *xyz) for symbol, xyz in
+                              zip('OHHOHH', _waters([0, 0, 0], [0, 4.0, 0]))])
+        templates = charge_templates([(mol, [-0.7, 0.3, 0.4, -0.9, 0.5, 0.2])])
+        atnums, charges, coords = templates['water']
+        self.assertEqual(atnums, (1, 1, 8))
+        # averaged over both waters, atom by atom
+        np.testing.assert_allclose(sorted(charges), [-0.8, 0.3, 0.4])
+
+    def test_atoms_in_another_order(self):
+        charges = np.array([-0.5, 0.1, 0.15, 0.2, 0.7, -0.55, -0.65, 0.45])
+        order = element_order(ACETIC_ACID, ELEMENTS)
+        templates = {'acid': (tuple(ELEMENTS[order].tolist()), charges[order], ACETIC_ACID[order])}
+        for rows in ([0, 1, 2, 3, 4, 6, 5, 7], [0, 2, 3, 1, 4, 6, 5, 7], [4, 7, 3, 2, 0, 6, 5, 1]):
+            coords = np.stack([ACETIC_ACID, (ACETIC_ACID @ _rotation(3))[rows] + 2.0])
+            found = fragment_charges(coords, ELEMENTS, [('acid', list(range(8)))], templates)
+            np.testing.assert_allclose(found, [charges, charges[rows]])
+
+class TestScreening(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reference = os.path.join(self.tmp.name, 'charges')
+        self.files = os.path.join(self.tmp.name, 'files')
+        os.makedirs(self.reference)
+        os.makedirs(self.files)
+        coords = _waters([0, 0, 0], [0, 4.0, 0])
+        atoms = '\n'.join(f' {symbol}  {x:.6f}  {y:.6f}  {z:.6f}'
+                          for symbol, (x, y, z) in zip('OHHOHH', coords))
+        charges = '\n'.join(f'     {n}  {symbol}  {charge:.6f}' for n, (symbol, charge)
+                             in enumerate(zip('OHHOHH', np.tile(CHARGES, 2)), 1))
+        with open(os.path.join(self.reference, 'dimer.log'), 'w') as f:
+            f.write(GAUSSIAN_LOG.format(atoms=atoms, charges=charges))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, symbols, coords):
+        with open(os.path.join(self.files, name), 'w') as f:
+            f.write(f'{len(symbols)}\n\n')
+            for symbol, xyz in zip(symbols, coords):
+                f.write(f'{symbol} {xyz[0]:.6f} {xyz[1]:.6f} {xyz[2]:.6f}\n')
+
+    def screen(self, keep=None):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            ranked = screen_configurations(self.files, reference=self.reference, keep=keep)
+        return ranked, output.getvalue()
+
+    def test_ranking(self):
+        expected = {}
+        for name, shift in (('a', [3.0, 0, 0]), ('b', [0, 3.5, 0]), ('c', [0, 0, 5.0]),
+                            ('d', [-3.2, 0.5, 0])):
+            coords = _waters([0, 0, 0], shift)
+            self.write(f'{name}.xyz', 'OHHOHH', coords)
+            expected[name] = _brute_force(coords, np.tile(CHARGES, 2), np.repeat([0, 1], 3))
+        # the water molecules close enough to join up into one unknown molecule
+        self.write('e.xyz', 'OHHOHH', _waters([0, 0, 0], [1.5, 0.5, 0]))
+        ranked, output = self.screen()
+        names = [os.path.basename(file)[0] for file, _ in ranked]
+        self.assertEqual(names, sorted(expected, key=expected.get))
+        for file, energy in ranked:
+            self.assertAlmostEqual(energy, expected[os.path.basename(file)[0]])
+        self.assertIn('Skipping e.xyz', output)
+
+    def test_unknown_atoms(self):
+        coords = _waters([0, 0, 0], [3.0, 0, 0])
+        self.write('a.xyz', 'OHHOHH', coords)
+        self.write('b.xyz', 'OHHOHH', _waters([0, 0, 0], [0, 0, 5.0]))
+        # a xenon atom that is in no known fragment, so cannot be estimated
+        self.write('c.xyz', list('OHHOHH') + ['Xe'], np.concatenate([coords, [[0.0, 0.0, 8.0]]]))
+        ranked, output = self.screen(keep=1)
+        self.assertEqual([os.path.basename(file) for file, _ in ranked], ['a.xyz', 'b.xyz'])
+        self.assertIn('Skipping c.xyz: 1 atoms are in no known fragment', output)
+        # left where it is, rather than screened out on a partial energy
+        self.assertEqual(sorted(os.listdir(self.files)), ['a.xyz', 'c.xyz', 'screened_out'])
+        self.assertEqual(os.listdir(os.path.join(self.files, 'screened_out')), ['b.xyz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
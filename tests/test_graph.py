@@ -0,0 +1,76 @@
+"""Union-find and connected components, checked against a breadth-first search"""
+import unittest
+from collections import deque
+
+import numpy as np
+
+from autochem.core.graph import DisjointSet, connected_components
+
+
+def _components(num_nodes, i, j):
+    """Labels by breadth-first search, numbered in order of the lowest node"""
+    neighbours = [[] for _ in range(num_nodes)]
+    for a, b in zip(i, j):
+        neighbours[a].append(b)
+        neighbours[b].append(a)
+    labels = [-1] * num_nodes
+    count = 0
+    for start in range(num_nodes):
+        if labels[start] >= 0:
+            continue
+        labels[start] = count
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for other in neighbours[node]:
+                if labels[other] < 0:
+                    labels[other] = count
+                    queue.append(other)
+        count += 1
+    return labels
+
+
+class TestDisjointSet(unittest.TestCase):
+
+    def test_union_find(self):
+        ds = DisjointSet(6)
+        ds.union(0, 2)
+        ds.union(4, 5)
+        ds.union(2, 5)
+        self.assertEqual(ds.find(4), ds.find(0))
+        self.assertNotEqual(ds.find(1), ds.find(0))
+        self.assertEqual(ds.labels().tolist(), [0, 1, 0, 2, 0, 0])
+
+    def test_repeated_union(self):
+        ds = DisjointSet(3)
+        ds.union(1, 2)
+        ds.union(2, 1)
+        ds.union(1, 1)
+        self.assertEqual(ds.size[ds.find(1)], 2)
+        self.assertEqual(ds.labels().tolist(), [0, 1, 1])
+
+
+class TestConnectedComponents(unittest.TestCase):
+
+    def test_random_graphs(self):
+        rng = np.random.default_rng(0)
+        for num_nodes, num_edges in ((1, 0), (10, 4), (200, 150), (500, 800)):
+            i = rng.integers(0, num_nodes, num_edges)
+            j = rng.integers(0, num_nodes, num_edges)
+            labels = connected_components(num_nodes, i, j)
+            self.assertEqual(labels.tolist(), _components(num_nodes, i.tolist(), j.tolist()))
+
+    def test_long_chain(self):
+        # joined from the far end, so that roots are deep without compression
+        num_nodes = 100000
+        i = np.arange(num_nodes - 1)[::-1]
+        labels = connected_components(num_nodes, i, i + 1)
+        self.assertTrue((labels == 0).all())
+
+    def test_no_edges(self):
+        labels = connected_components(4, [], [])
+        self.assertEqual(labels.tolist(), [0, 1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+"""
+Fragmentation and hydrogen bonds of a cluster of 88 molecules, compared
+with the output of the original pairwise (O(N^2)) implementation in
+data/cluster_baseline.json, in open and periodic boundaries
+"""
+import itertools
+import json
+import os
+import unittest
+
+import numpy as np
+
+from autochem import Atom, Molecule
+from autochem.core.neighbours import as_cell
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+CLUSTER = os.path.join(DATA, 'cluster.xyz')
+
+with open(os.path.join(DATA, 'cluster_baseline.json')) as f:
+    BASELINE = json.load(f)
+
+
+# large enough that no molecule is near one of its own periodic images
+CELLS = {
+    'orthorhombic': [40.0, 40.0, 40.0],
+    'triclinic': [[40.0, 0.0, 0.0], [8.0, 40.0, 0.0], [-5.0, 6.0, 40.0]],
+}
+
+
+def _fragments(mol):
+    return [[key, frag['name'], frag['type'], frag['charge'], frag['multiplicity'],
+             [atom.index for atom in frag['atoms']]] for key, frag in mol.fragments.items()]
+
+
+def _wrapped_cluster(cell):
+    """The cluster moved across the cell boundaries, with every atom wrapped into the cell"""
+    mol = Molecule(using=CLUSTER)
+    cell = as_cell(cell)
+    fractions = (mol.coord_array + [28.0, 20.0, 31.0]) @ np.linalg.inv(cell)
+    wrapped = (fractions - np.floor(fractions)) @ cell
+    atoms = [(atom.symbol, *xyz) for atom, xyz in zip(mol.coords, wrapped.tolist())]
+    return Molecule(atoms=atoms, cell=cell)
+
+
+class TestFragmentation(unittest.TestCase):
+
+    def check_h_bonds(self, mol):
+        for distance in (2.0, 2.5, 3.0):
+            expected = BASELINE[f'h_bonds_{distance}']
+            found = mol.find_h_bonds(distance)
+            self.assertEqual([row[:4] for row in found], [row[:4] for row in expected])
+            np.testing.assert_allclose([row[4:] for row in found], [row[4:] for row in expected],
+                                       atol=1e-4)
+
+    def test_cluster(self):
+        mol = Molecule(using=CLUSTER)
+        self.assertEqual(_fragments(mol), BASELINE['fragments'])
+        self.assertEqual([sorted(other.index for other in atom.connected_atoms)
+                          for atom in mol.coords], BASELINE['connected'])
+        self.assertEqual([mol.overall_charge, mol.overall_mult], BASELINE['charge'])
+        self.check_h_bonds(mol)
+
+    def test_periodic_cluster(self):
+        for name, cell in CELLS.items():
+            with self.subTest(name):
+                mol = _wrapped_cluster(cell)
+                self.assertEqual(_fragments(mol), BASELINE['fragments'])
+                self.check_h_bonds(mol)
+
+    def test_make_whole(self):
+        original = Molecule(using=CLUSTER).coord_array
+        for name, cell in CELLS.items():
+            with self.subTest(name):
+                mol = _wrapped_cluster(cell)
+                mol.make_whole()
+                # every molecule is back in one piece, as in the original
+                for frag in mol.fragments.values():
+                    rows = [atom.index - 1 for atom in frag['atoms']]
+                    np.testing.assert_allclose(mol.coord_array[rows] - mol.coord_array[rows[0]],
+                                               original[rows] - original[rows[0]], atol=1e-9)
+                self.assertEqual(_fragments(mol), BASELINE['fragments'])
+
+    def test_translate_keeps_fragments(self):
+        mol = Molecule(using=CLUSTER)
+        fragments = mol.fragments
+        mol.translate([1.0, -2.0, 0.5])
+        self.assertIs(mol.fragments, fragments)
+        self.assertEqual(_fragments(mol), BASELINE['fragments'])
+
+
+    def test_translate_fragment(self):
+        mol = Molecule(using=CLUSTER)
+        fragments = mol.fragments
+        # well clear of everything else, so no bond changes
+        mol.translate([100.0, 0.0, 0.0], frag=1)
+        self.assertIs(mol.fragments, fragments)
+        # onto another molecule, so the fragments must be found again
+        centres = [np.mean([atom.coords for atom in mol.fragments[key]['atoms']], axis=0)
+                   for key in (1, 2)]
+        mol.translate(centres[1] - centres[0], frag=1)
+        fresh = Molecule(atoms=[(atom.symbol, *atom.coords) for atom in mol.coords])
+        self.assertIsNot(mol.fragments, fragments)
+        self.assertEqual(len(mol.fragments), len(fresh.fragments))
+        self.assertLess(len(mol.fragments), len(BASELINE['fragments']))
+
+    def test_move_through_views(self):
+        mol = Molecule(using=CLUSTER)
+        fragments = mol.fragments
+        atom = mol.coords[0]
+        # writing in place would leave the fragments out of date unseen
+        with self.assertRaises(ValueError):
+            atom.coords[:] += 50.0
+        with self.assertRaises(ValueError):
+            mol.coord_array[0] += 50.0
+        np.testing.assert_array_equal(mol.coord_array, Molecule(using=CLUSTER).coord_array)
+        self.assertIs(mol.fragments, fragments)
+        atom.coords = atom.coords + 50.0
+        fresh = Molecule(atoms=[(other.symbol, *other.coords) for other in mol.coords])
+        self.assertIsNot(mol.fragments, fragments)
+        self.assertEqual(_fragments(mol), _fragments(fresh))
+
+
+class TestDistanceMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.mol = Molecule(using=CLUSTER)
+        coords = np.array([atom.coords for atom in self.mol.coords])
+        self.expected = np.sqrt(((coords[:, None, :] - coords[None, :, :]) ** 2).sum(axis=2))
+
+    def test_full(self):
+        np.testing.assert_allclose(self.mol.distance_matrix(), self.expected, atol=1e-12)
+
+    def test_condensed(self):
+        i, j = np.triu_indices(len(self.expected), 1)
+        np.testing.assert_allclose(self.mol.distance_matrix(condensed=True),
+                                   self.expected[i, j], atol=1e-12)
+
+    def test_sparse(self):
+        for cutoff in (2.0, 5.0):
+            pairs = self.mol.distance_matrix(cutoff=cutoff)
+            i, j = np.nonzero(np.triu(self.expected < cutoff, 1))
+            np.testing.assert_array_equal(pairs.i, i)
+            np.testing.assert_array_equal(pairs.j, j)
+            np.testing.assert_allclose(pairs.dist, self.expected[i, j], atol=1e-12)
+
+    def test_float32(self):
+        matrix = self.mol.distance_matrix(dtype=np.float32)
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_allclose(matrix, self.expected, atol=1e-4)
+
+    def test_blocks(self):
+        blocks = list(self.mol.distance_matrix(block_size=100))
+        self.assertEqual([start for start, _ in blocks], [0, 100, 200, 300, 400])
+        np.testing.assert_allclose(np.concatenate([block for _, block in blocks]),
+                                   self.expected, atol=1e-12)
+
+    def test_periodic(self):
+        cell = CELLS['triclinic']
+        mol = _wrapped_cluster(cell)
+        coords = mol.coord_array
+        diff = coords[:, None, :] - coords[None, :, :]
+        expected = np.full(diff.shape[:2], np.inf)
+        for step in itertools.product((-1, 0, 1), repeat=3):
+            image = diff + np.array(step) @ as_cell(cell)
+            np.minimum(expected, np.sqrt((image ** 2).sum(axis=-1)), out=expected)
+        np.testing.assert_allclose(mol.distance_matrix(), expected, atol=1e-9)
+        pairs = mol.distance_matrix(cutoff=3.0)
+        np.testing.assert_allclose(pairs.dist, expected[pairs.i, pairs.j], atol=1e-9)
+        self.assertEqual(len(pairs.i), np.triu(expected < 3.0, 1).sum())
+
+    def test_coord_array_follows_atoms(self):
+        atom = self.mol.coords[4]
+        atom.coords = (1.0, 2.0, 3.0)
+        np.testing.assert_array_equal(self.mol.coord_array[4], [1.0, 2.0, 3.0])
+        self.mol.translate([0.5, 0.0, -1.0])
+        np.testing.assert_allclose(atom.coords, [1.5, 2.0, 2.0])
+
+
+class TestFragmentContacts(unittest.TestCase):
+
+    def test_cluster(self):
+        mol = Molecule(using=CLUSTER)
+        contacts = mol.fragment_contacts(cutoff=2.5)
+        self.assertEqual(contacts.keys, list(mol.fragments))
+        dists = mol.distance_matrix()
+        rows = [[atom.index - 1 for atom in mol.fragments[key]['atoms']] for key in contacts.keys]
+        for a, b in itertools.combinations(range(len(rows)), 2):
+            block = dists[np.ix_(rows[a], rows[b])]
+            self.assertAlmostEqual(contacts.min_dist[a, b], block.min())
+            self.assertAlmostEqual(contacts.min_dist[b, a], block.min())
+            first, second = contacts.closest[a, b]
+            self.assertIn(first, rows[a])
+            self.assertIn(second, rows[b])
+            self.assertAlmostEqual(dists[first, second], block.min())
+            self.assertEqual(contacts.contacts[a, b], (block < 2.5).sum())
+            self.assertEqual(contacts.contacts[b, a], contacts.contacts[a, b])
+        np.testing.assert_array_equal(np.diag(contacts.min_dist), 0.0)
+        np.testing.assert_array_equal(contacts.closest[range(len(rows)), range(len(rows))], -1)
+        np.testing.assert_array_equal(np.diag(contacts.contacts), 0)
+        self.assertIsNone(mol.fragment_contacts().contacts)
+
+class TestFragmentIndex(unittest.TestCase):
+    """The atom to fragment index follows edits made to self.fragments in place"""
+
+    def setUp(self):
+        self.mol = Molecule(using=CLUSTER)
+        # built before the edits
+        self.mol.fragment_keys
+
+    def rows(self, key):
+        return [atom.index - 1 for atom in self.mol.fragments[key]['atoms']]
+
+    def test_delete(self):
+        frag = self.mol.fragments[1]
+        atom = frag['atoms'][0]
+        rows = self.rows(1)
+        self.assertEqual(self.mol.frag_name(atom), frag['name'])
+        del self.mol.fragments[1]
+        self.assertIsNone(self.mol.frag_name(atom))
+        np.testing.assert_array_equal(self.mol.fragment_keys[rows], -1)
+        self.assertFalse(self.mol.category_masks[frag['type']][rows].any())
+
+    def test_merge(self):
+        fragments = self.mol.fragments
+        rows = self.rows(1) + self.rows(2)
+        # as group_frags_together does
+        new_key = max(fragments) + 1
+        fragments[new_key] = dict(fragments[1], type='merged', name='pair',
+                                  atoms=fragments[1]['atoms'] + fragments[2]['atoms'])
+        del fragments[1], fragments[2]
+        np.testing.assert_array_equal(self.mol.fragment_keys[rows], new_key)
+        self.assertEqual(self.mol.frag_name(self.mol.coords[rows[-1]]), 'pair')
+        self.assertTrue(self.mol.category_masks['merged'][rows].all())
+        # atoms moved into a fragment's own list are seen too
+        fragments[new_key]['atoms'].append(self.mol.coords[self.rows(3)[0]])
+        self.assertEqual(self.mol.fragment_keys[self.rows(3)[0]], new_key)
+
+
+class TestAtomList(unittest.TestCase):
+    """Changes to the list of atoms are seen by the molecule's atom table"""
+
+    def setUp(self):
+        self.mol = Molecule(atoms=[('O', 0.0, 0.0, 0.0), ('H', 0.96, 0.0, 0.0),
+                                   ('H', -0.24, 0.93, 0.0)])
+
+    def check(self):
+        table = self.mol.atom_table
+        self.assertEqual(len(table), len(self.mol.coords))
+        for row, atom in enumerate(self.mol.coords):
+            self.assertEqual(table.atnum[row], atom.atnum)
+            np.testing.assert_array_equal(table.coords[row], atom.coords)
+
+    def test_mutators(self):
+        self.check()
+        self.mol.coords.append(Atom('N', coords=(5, 0, 0)))
+        self.check()
+        self.mol.coords += [Atom('C', coords=(6, 0, 0))]
+        self.check()
+        self.mol.coords[1:3] = [Atom('He', coords=(7, 0, 0))]
+        self.check()
+        del self.mol.coords[0]
+        self.check()
+        self.mol.coords.insert(0, Atom('Ne', coords=(8, 0, 0)))
+        self.check()
+        self.mol.coords.reverse()
+        self.check()
+        self.mol.coords.sort(key=lambda atom: atom.atnum)
+        self.check()
+        self.mol.coords.pop()
+        self.check()
+
+    def test_atoms_shared_with_another_molecule(self):
+        table = self.mol.atom_table
+        other = Molecule(atoms=self.mol.coords[1:])
+        self.assertEqual(len(other.atom_table), 2)
+        # the first molecule's atoms are now spread over two tables
+        self.assertIsNot(self.mol.atom_table, table)
+        self.check()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Cell list pair search, minimum images and make_whole, checked against
+brute force over every pair of atoms and every periodic image
+"""
+import itertools
+import unittest
+
+import numpy as np
+
+from autochem.core.neighbours import (as_cell, bonded_pairs, make_whole, minimum_image,
+                                      neighbour_pairs)
+
+CELLS = {
+    'orthorhombic': [12.0, 14.0, 13.0],
+    'triclinic': [[12.0, 0.0, 0.0], [5.0, 11.0, 0.0], [-3.0, 4.0, 12.0]],
+}
+
+
+def _shifts(cell, reach=2):
+    steps = np.array(list(itertools.product(range(-reach, reach + 1), repeat=3)))
+    return steps @ as_cell(cell)
+
+
+def _all_distances(coords, cell=None):
+    """N x N distances, to the nearest image of every atom if `cell` is given"""
+    diff = coords[:, None, :] - coords[None, :, :]
+    if cell is None:
+        return np.sqrt((diff ** 2).sum(axis=-1))
+    images = diff[:, :, None, :] + _shifts(cell)
+    return np.sqrt((images ** 2).sum(axis=-1)).min(axis=-1)
+
+
+def _pairs_below(dists, limit):
+    i, j = np.nonzero(np.triu(dists < limit, 1))
+    return i, j
+
+
+def _random_coords(num_atoms, cell=None, seed=0):
+    rng = np.random.default_rng(seed)
+    if cell is None:
+        return rng.uniform(0, 15, (num_atoms, 3))
+    return rng.uniform(0, 1, (num_atoms, 3)) @ as_cell(cell)
+
+
+class TestNeighbourPairs(unittest.TestCase):
+
+    def check(self, coords, cutoff, cell=None):
+        i, j, dists = neighbour_pairs(coords, cutoff, cell)
+        expected = _all_distances(coords, cell)
+        bi, bj = _pairs_below(expected, cutoff)
+        np.testing.assert_array_equal(i, bi)
+        np.testing.assert_array_equal(j, bj)
+        np.testing.assert_allclose(dists, expected[bi, bj])
+
+    def test_open(self):
+        coords = _random_coords(400)
+        for cutoff in (0.5, 1.7, 3.0, 20.0):
+            self.check(coords, cutoff)
+
+    def test_periodic(self):
+        for name, cell in CELLS.items():
+            with self.subTest(name):
+                coords = _random_coords(300, cell, seed=1)
+                for cutoff in (1.0, 2.5, 4.0):
+                    self.check(coords, cutoff, cell)
+
+    def test_atoms_outside_cell(self):
+        cell = CELLS['triclinic']
+        coords = _random_coords(200, cell, seed=2)
+        shifted = coords + np.random.default_rng(3).integers(-2, 3, (200, 1)) * as_cell(cell)[0]
+        i, j, dists = neighbour_pairs(shifted, 3.0, cell)
+        # whole lattice vectors make no difference to the nearest images
+        expected = _all_distances(coords, cell)
+        bi, bj = _pairs_below(expected, 3.0)
+        np.testing.assert_array_equal(i, bi)
+        np.testing.assert_array_equal(j, bj)
+        np.testing.assert_allclose(dists, expected[bi, bj])
+
+    def test_no_pairs(self):
+        i, j, dists = neighbour_pairs(np.zeros((1, 3)), 2.0)
+        self.assertEqual(len(i), 0)
+        i, j, dists = neighbour_pairs(_random_coords(10), 0.0)
+        self.assertEqual(len(dists), 0)
+
+
+class TestBondedPairs(unittest.TestCase):
+
+    def test_radii(self):
+        rng = np.random.default_rng(4)
+        coords = _random_coords(300, seed=5)
+        radii = rng.uniform(0.5, 1.6, len(coords))
+        i, j, dists = bonded_pairs(coords, radii)
+        expected = _all_distances(coords)
+        bi, bj = np.nonzero(np.triu(expected < radii[:, None] + radii[None, :], 1))
+        np.testing.assert_array_equal(i, bi)
+        np.testing.assert_array_equal(j, bj)
+
+    def test_radii_periodic(self):
+        cell = CELLS['triclinic']
+        rng = np.random.default_rng(6)
+        coords = _random_coords(300, cell, seed=7)
+        radii = rng.uniform(0.5, 1.6, len(coords))
+        i, j, dists = bonded_pairs(coords, radii, cell)
+        expected = _all_distances(coords, cell)
+        bi, bj = np.nonzero(np.triu(expected < radii[:, None] + radii[None, :], 1))
+        np.testing.assert_array_equal(i, bi)
+        np.testing.assert_array_equal(j, bj)
+
+
+class TestMinimumImage(unittest.TestCase):
+
+    def test_shortest_image(self):
+        skewed = [[10.0, 0.0, 0.0], [9.0, 3.0, 0.0], [4.0, 2.0, 8.0]]
+        for cell in list(CELLS.values()) + [skewed]:
+            cell = as_cell(cell)
+            rng = np.random.default_rng(8)
+            vectors = rng.uniform(-15, 15, (2000, 3))
+            lengths = np.linalg.norm(minimum_image(vectors, cell), axis=1)
+            images = vectors[:, None, :] + _shifts(cell, reach=8)
+            shortest = np.linalg.norm(images, axis=-1).min(axis=1)
+            np.testing.assert_allclose(lengths, shortest)
+
+    def test_same_image(self):
+        # every result is the original vector moved by whole lattice vectors
+        cell = as_cell(CELLS['triclinic'])
+        vectors = np.random.default_rng(9).uniform(-30, 30, (500, 3))
+        steps = (vectors - minimum_image(vectors, cell)) @ np.linalg.inv(cell)
+        np.testing.assert_allclose(steps, np.round(steps), atol=1e-9)
+
+    def test_no_cell(self):
+        vectors = np.arange(12.0).reshape(4, 3)
+        np.testing.assert_array_equal(minimum_image(vectors, None), vectors)
+
+
+class TestMakeWhole(unittest.TestCase):
+
+    def chain(self):
+        # zig-zag chain of 20 atoms, 1.2 Å apart, longer than the cell
+        steps = np.tile([[1.0, 0.6, 0.3], [1.0, -0.6, -0.3]], (10, 1))
+        return np.cumsum(steps, axis=0) - steps[0]
+
+    def test_restores_bonds(self):
+        for name, cell in CELLS.items():
+            with self.subTest(name):
+                whole = self.chain()
+                cell = as_cell(cell)
+                # wrap every atom into the cell
+                fractions = whole @ np.linalg.inv(cell)
+                wrapped = (fractions - np.floor(fractions)) @ cell
+                i = np.arange(len(whole) - 1)
+                j = i + 1
+                fixed = make_whole(wrapped, cell, i, j)
+                np.testing.assert_allclose(fixed[0], wrapped[0])
+                np.testing.assert_allclose(fixed - fixed[0], whole - whole[0], atol=1e-9)
+
+    def test_bond_order_does_not_matter(self):
+        whole = self.chain()
+        cell = as_cell(CELLS['orthorhombic'])
+        wrapped = whole % np.diag(cell)
+        i = np.arange(len(whole) - 1)
+        order = np.random.default_rng(10).permutation(len(i))
+        first = make_whole(wrapped, cell, i, i + 1)
+        second = make_whole(wrapped, cell, (i + 1)[order], i[order])
+        np.testing.assert_allclose(first, second)
+
+    def test_separate_molecules(self):
+        cell = as_cell(CELLS['orthorhombic'])
+        water = np.array([[0.0, 0.0, 0.0], [0.96, 0.0, 0.0], [-0.24, 0.93, 0.0]])
+        coords = np.concatenate([water + [0.1, 5.0, 5.0], water + [11.95, 7.0, 2.0]])
+        wrapped = coords % np.diag(cell)
+        i, j = np.array([0, 0, 3, 3]), np.array([1, 2, 4, 5])
+        fixed = make_whole(wrapped, cell, i, j)
+        np.testing.assert_allclose(fixed[:3] - fixed[0], water, atol=1e-9)
+        np.testing.assert_allclose(fixed[3:] - fixed[3], water, atol=1e-9)
+
+    def test_no_cell(self):
+        coords = self.chain()
+        np.testing.assert_array_equal(make_whole(coords, None, [0], [1]), coords)
+
+
+if __name__ == '__main__':
+    unittest.main()
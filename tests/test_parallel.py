@@ -0,0 +1,67 @@
+"""Parsing on a pool of processes gives the same results as parsing serially"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from autochem.core.utils import parallel_map
+from autochem.scripts.grep_results import energies
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA = os.path.join(ROOT, 'tests', 'data')
+LOGS = ('gamess.log', 'gaussian.log', 'orca.out', 'psi.out')
+
+
+def _square(x):
+    return x * x
+
+
+class TestParallelMap(unittest.TestCase):
+
+    def test_order(self):
+        items = list(range(50))
+        expected = [x * x for x in items]
+        for jobs in (1, 2, 0, None):
+            for chunksize in (None, 1, 7):
+                self.assertEqual(parallel_map(_square, items, jobs=jobs, chunksize=chunksize),
+                                 expected)
+
+    def test_serial_in_process(self):
+        # a lambda cannot be sent to another process, so this only works serially
+        self.assertEqual(parallel_map(lambda x: x + 1, [1, 2, 3], jobs=1), [2, 3, 4])
+        self.assertEqual(parallel_map(_square, [], jobs=2), [])
+
+
+class TestParallelParsing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        for name in LOGS:
+            shutil.copy(os.path.join(DATA, name), self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_energies(self):
+        serial = energies(self.tmp, None, use_cache=False, jobs=1)
+        self.assertEqual(len(serial), 3)
+        self.assertEqual(energies(self.tmp, None, use_cache=False, jobs=2), serial)
+
+    def test_jobs_option(self):
+        env = dict(os.environ, PYTHONPATH=ROOT, HOME=self.tmp)
+        tables = []
+        for jobs in ('1', '2'):
+            output = f'energies_{jobs}.csv'
+            subprocess.run([sys.executable, os.path.join(ROOT, 'bin', 'autochem'), '-r',
+                            '--no-cache', '-j', jobs, '-o', output],
+                           cwd=self.tmp, env=env, check=True, stdout=subprocess.DEVNULL)
+            with open(os.path.join(self.tmp, output)) as f:
+                tables.append(f.read())
+        self.assertIn('gamess.log', tables[0])
+        self.assertEqual(tables[0], tables[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Radial distribution functions: pair counts against brute force, and normalisation"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from autochem import RDF, Molecule
+from autochem.core.rdf import rdf_from_files
+
+CLUSTER = os.path.join(os.path.dirname(__file__), 'data', 'cluster.xyz')
+
+
+def _pair_histogram(first, second, edges, exclude):
+    """Counts of every pair of points, from all N x M distances"""
+    dists = np.linalg.norm(first[:, None, :] - second[None, :, :], axis=-1)
+    return np.histogram(dists[~exclude], bins=edges)[0]
+
+
+class TestRDF(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mol = Molecule(using=CLUSTER)
+        cls.mol.fragments
+
+    def element(self, symbol):
+        rows = np.nonzero(self.mol.atnums == {'O': 8, 'F': 9, 'N': 7}[symbol])[0]
+        return self.mol.coord_array[rows], self.mol.fragment_keys[rows], rows
+
+    def test_same_selection(self):
+        coords, keys, rows = self.element('O')
+        for intermolecular in (False, True):
+            rdf = RDF('O', r_max=8.0, bin_width=0.1, intermolecular=intermolecular)
+            rdf.add(self.mol, volume=1000.0)
+            exclude = rows[:, None] == rows[None, :]
+            if intermolecular:
+                exclude |= keys[:, None] == keys[None, :]
+            np.testing.assert_array_equal(rdf.counts,
+                                          _pair_histogram(coords, coords, rdf.edges, exclude))
+            self.assertEqual(rdf.num_first, len(rows))
+            pairs = len(rows) ** 2 - exclude.sum()
+            self.assertAlmostEqual(rdf.pair_density, pairs / 1000.0)
+
+    def test_two_selections(self):
+        oxygens, o_keys, _ = self.element('O')
+        fluorines, f_keys, _ = self.element('F')
+        rdf = RDF('O', 'F', r_max=6.0, bin_width=0.2)
+        rdf.add(self.mol, volume=1000.0)
+        exclude = o_keys[:, None] == f_keys[None, :]
+        np.testing.assert_array_equal(rdf.counts,
+                                      _pair_histogram(oxygens, fluorines, rdf.edges, exclude))
+        self.assertAlmostEqual(rdf.pair_density, (exclude.size - exclude.sum()) / 1000.0)
+
+    def test_fragment_centres(self):
+        rdf = RDF('water', r_max=10.0, bin_width=0.5)
+        rdf.add(self.mol, volume=1000.0)
+        centres = np.array([np.mean([atom.coords for atom in frag['atoms']], axis=0)
+                            for frag in self.mol.fragments.values() if frag['name'] == 'water'])
+        exclude = np.eye(len(centres), dtype=bool)
+        np.testing.assert_array_equal(rdf.counts,
+                                      _pair_histogram(centres, centres, rdf.edges, exclude))
+
+    def test_adding_rdfs(self):
+        both = RDF('O', 'N', r_max=6.0)
+        both.add(self.mol, volume=1000.0)
+        both.add(self.mol, volume=2000.0)
+        first = RDF('O', 'N', r_max=6.0).add(self.mol, volume=1000.0)
+        first += RDF('O', 'N', r_max=6.0).add(self.mol, volume=2000.0)
+        np.testing.assert_array_equal(first.counts, both.counts)
+        np.testing.assert_allclose(first.g(), both.g())
+        np.testing.assert_allclose(first.coordination_number(), both.coordination_number())
+        with self.assertRaises(ValueError):
+            first += RDF('O', 'F', r_max=6.0)
+
+    def test_needs_volume(self):
+        rdf = RDF('O').add(self.mol)
+        with self.assertRaises(ValueError):
+            rdf.g()
+        rdf.coordination_number(3.5)
+
+
+    def test_from_files(self):
+        expected = RDF('O', 'N', r_max=6.0)
+        for volume in (1000.0, 1000.0, 1000.0):
+            expected.add(self.mol, volume=volume)
+        with tempfile.TemporaryDirectory() as tmp:
+            files = [shutil.copy(CLUSTER, os.path.join(tmp, f'{n}.xyz')) for n in range(3)]
+            for jobs in (1, 2):
+                rdf = rdf_from_files(files, 'O', 'N', volume=1000.0, jobs=jobs, r_max=6.0)
+                np.testing.assert_array_equal(rdf.counts, expected.counts)
+                np.testing.assert_allclose(rdf.g(), expected.g())
+
+class TestIdealGas(unittest.TestCase):
+    """Points spread at random through a periodic box have g(r) = 1"""
+
+    def test_uniform(self):
+        length = 14.0
+        points = np.random.default_rng(0).uniform(0, length, (1000, 3))
+        mol = Molecule(atoms=[('Ar', *xyz) for xyz in points.tolist()], cell=[length] * 3)
+        rdf = RDF('Ar', r_max=6.0, bin_width=0.5)
+        rdf.add(mol)
+        g = rdf.g()
+        self.assertLess(abs(g[4:].mean() - 1), 0.02)
+        self.assertTrue(np.all(abs(g[4:] - 1) < 0.1))
+        density = (len(points) - 1) / length ** 3
+        self.assertAlmostEqual(rdf.coordination_number(6.0) / (density * 4 / 3 * np.pi * 6.0 ** 3),
+                               1.0, delta=0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Parsing of small logs from each package. The values expected are those the
+original line-by-line parsers found in the same logs, except where noted
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from autochem.interfaces import GamessResults, GaussianResults, OrcaResults, PsiResults
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def _data(name):
+    return os.path.join(DATA, name)
+
+
+class TestGamess(unittest.TestCase):
+
+    def setUp(self):
+        self.r = GamessResults(_data('gamess.log'))
+
+    def test_run(self):
+        r = self.r
+        self.assertTrue(r.completed())
+        self.assertEqual(r.get_runtype(), 'energy')
+        self.assertEqual(r.title, ' c1mim water cluster\n')
+        self.assertEqual(r.version, '30 SEP 2019 (R2)')
+        self.assertEqual(r.fmo_level, 3)
+        self.assertEqual(r.basis, 'cc-pVDZ')
+        self.assertEqual(r.method, 'Scaled MP2')
+        self.assertEqual(r.multiplicity, 1)
+        self.assertFalse(r.solvent_calc)
+        self.assertTrue(r.is_spec())
+        self.assertFalse(r.is_optimisation())
+        self.assertFalse(r.is_hessian())
+
+    def test_energies(self):
+        r = self.r
+        self.assertEqual(r.total_energy, -500.654321)
+        self.assertEqual(r.fmo_mp2_data('SCS'), (-499.6, -1.15))
+        self.assertEqual(r.fmo_mp2_data('MP2'), (-499.6, -1.3))
+        self.assertEqual(r.non_fmo_mp2_gas_data_for_spec(), (-499.9, -0.9, -0.3))
+        self.assertEqual(r.fmo_dft_energy, -501.1)
+        self.assertEqual(r.get_data()[2:], ('Scaled MP2', 'cc-pVDZ', -499.6, -1.15, 'NA', 'NA'))
+
+    def test_orbitals_and_frequencies(self):
+        r = self.r
+        self.assertEqual(r.num_orbitals_occupied, 50)
+        self.assertEqual(r._homo_lumo(), (3.4, 3.5))
+        self.assertEqual(r.frequencies, [3.21, 1500.5])
+        self.assertEqual(r.intensities, [0.02315, 1.25])
+
+    def test_lower_case_input(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, 'lower.log')
+            with open(_data('gamess.log')) as f, open(log, 'w') as new:
+                new.write(f.read().replace('RUNTYP=ENERGY', 'runtyp=energy'))
+            self.assertEqual(GamessResults(log).get_runtype(), 'energy')
+
+
+class TestGaussian(unittest.TestCase):
+
+    def setUp(self):
+        self.r = GaussianResults(_data('gaussian.log'))
+
+    def test_run(self):
+        r = self.r
+        self.assertTrue(r.completed())
+        self.assertFalse(r.errored())
+        self.assertEqual(r.user_commands, '#P wB97xD/aug-cc-pVDZ opt freq')
+        self.assertEqual(r.get_runtype(), 'opt-freq')
+        self.assertEqual(r.title, 'mytitle')
+        self.assertEqual(r.method, 'WB97XD')
+        self.assertEqual(r.basis, 'aug-cc-pVDZ')
+        self.assertEqual(r.multiplicity, 1)
+        self.assertTrue(r.is_optimisation())
+        self.assertTrue(r.is_hessian())
+        self.assertFalse(r.is_spec())
+
+    def test_energies(self):
+        r = self.r
+        self.assertEqual(r.hf_energy, -76.1)
+        self.assertEqual(r.dft_energy, -76.4)
+        self.assertEqual(r.get_data()[2:], ('WB97XD', 'aug-cc-pVDZ', -76.4, 'NA', 'NA', 'NA'))
+        self.assertEqual(r._homo_lumo(), (-0.3, 0.1))
+
+    def test_spectra(self):
+        r = self.r
+        self.assertEqual(r.frequencies, [1600.1, 3700.2, 3800.3])
+        self.assertEqual(r.intensities, [50.1, 2.2, 30.3])
+        self.assertEqual(r.td_dft_wavelengths, [[242.0]])
+        self.assertEqual(r.td_dft_intensities, [[0.0123]])
+        self.assertEqual(r.td_dft_transition_energies, [[5.1234]])
+
+    def test_link1_steps(self):
+        # only the last step of a multi-step job says how it ended
+        done = GaussianResults(_data('gaussian_link1_done.log'))
+        died = GaussianResults(_data('gaussian_link1_died.log'))
+        running = GaussianResults(_data('gaussian_link1_running.log'))
+        self.assertEqual((done.completed(), done.errored()), (True, False))
+        self.assertEqual((died.completed(), died.errored()), (False, True))
+        self.assertEqual((running.completed(), running.errored()), (False, False))
+
+    def test_log_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, 'job.log')
+            shutil.copy(_data('gaussian_link1_running.log'), log)
+            r = GaussianResults(log)
+            self.assertFalse(r.completed())
+            with open(log, 'a') as f:
+                f.write(' Normal termination of Gaussian 16 at Tue\n')
+            self.assertTrue(r.completed())
+
+
+class TestOrca(unittest.TestCase):
+
+    def setUp(self):
+        self.r = OrcaResults(_data('orca.out'))
+
+    def test_run(self):
+        r = self.r
+        self.assertTrue(r.completed())
+        self.assertEqual(r.get_runtype(), 'opt-freq')
+        self.assertEqual(r.title, 'water')
+        self.assertEqual(r.user_commands, '|  1> ! b3lyp def2-svp opt freq\n')
+        self.assertTrue(r.is_dft)
+        self.assertEqual(r.method, 'B88')
+        self.assertEqual(r.basis, 'def2-SVP')
+        self.assertEqual(r.num_atoms, 3)
+        self.assertEqual(r.multiplicity, 1)
+
+    def test_energies(self):
+        r = self.r
+        self.assertEqual(r.total_energy, -76.3)
+        # the last of the two energies, as documented; the original parser
+        # took the first one in the last 20% of the log
+        self.assertEqual(r.final_single_point_energy, -76.32)
+        self.assertEqual(r.get_data()[2:], ('B88', 'def2-SVP', -76.32, 'NA', 'NA'))
+        self.assertEqual(r._homo_lumo(), (-8.1, 2.7))
+        self.assertEqual(r.frequencies, [])
+
+
+class TestPsi(unittest.TestCase):
+
+    def setUp(self):
+        self.r = PsiResults(_data('psi.out'))
+
+    def test_run(self):
+        r = self.r
+        self.assertTrue(r.completed())
+        self.assertEqual(r.get_runtype(), 'energy')
+        self.assertEqual(r.method, 'mp2')
+        self.assertEqual(r.basis, 'cc-pvdz')
+        self.assertEqual(r.multiplicity, 1)
+        self.assertTrue(r.is_spec())
+
+    def test_energies(self):
+        r = self.r
+        self.assertEqual(r.total_energy, -76.02)
+        self.assertEqual(r.hf_energy_for_mp2, -76.0267)
+        self.assertEqual(r.mp2_opp, -0.15)
+        self.assertEqual(r.mp2_same, -0.05)
+        self.assertEqual(r._neutral_homo_lumo(), (-0.5, 0.2))
+        self.assertEqual(r.get_data()[2:], ('mp2', 'cc-pvdz', -76.0267, 'NA', -0.15, -0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
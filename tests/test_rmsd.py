@@ -0,0 +1,158 @@
+"""Kabsch fitting, matching up atoms listed in a different order, and duplicates"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from autochem.core.rmsd import fit_deviations, kabsch_rmsd, matched_order, rmsd_matrix
+from autochem.scripts.duplicates import find_duplicates, remove_duplicates
+
+# acetic acid: C, H, H, H, C, O, O, H
+ACETIC_ACID = np.array([
+    [-1.385, -0.142, 0.000],
+    [-1.718, -1.180, 0.000],
+    [-1.769, 0.365, 0.889],
+    [-1.769, 0.365, -0.889],
+    [0.105, -0.036, 0.000],
+    [0.734, 1.013, 0.000],
+    [0.741, -1.220, 0.000],
+    [1.697, 0.803, 0.000],
+])
+ELEMENTS = np.array([6, 1, 1, 1, 6, 8, 8, 1])
+
+# a water molecule and two xenon atoms, which are in no known fragment
+WATER_XE = [('O', 0.0, 0.0, 0.0), ('H', 0.96, 0.0, 0.0), ('H', -0.24, 0.93, 0.0),
+            ('Xe', 8.0, 0.0, 0.0), ('Xe', 0.0, 8.0, 0.0)]
+
+
+def _rotation(seed):
+    q, _ = np.linalg.qr(np.random.default_rng(seed).normal(size=(3, 3)))
+    return q * np.sign(np.linalg.det(q))
+
+
+def _fitted_rmsd(reference, other):
+    """RMSD worked out from the coordinates of `other` once rotated onto `reference`"""
+    a = reference - reference.mean(axis=0)
+    b = other - other.mean(axis=0)
+    u, _, vt = np.linalg.svd(b.T @ a)
+    d = np.sign(np.linalg.det(u @ vt))
+    rotation = u @ np.diag([1, 1, d]) @ vt
+    return np.sqrt(((b @ rotation - a) ** 2).sum() / len(a))
+
+
+class TestKabsch(unittest.TestCase):
+
+    def test_rigid_motion(self):
+        moved = ACETIC_ACID @ _rotation(0) + [3.0, -1.0, 7.0]
+        self.assertAlmostEqual(kabsch_rmsd(ACETIC_ACID, moved), 0.0, places=6)
+
+    def test_mirror_image(self):
+        # a reflection is not a rotation, so does not fit
+        mirrored = ACETIC_ACID * [1, 1, -1]
+        mirrored[[2, 3]] += [0, 0.3, 0]
+        self.assertGreater(kabsch_rmsd(ACETIC_ACID, mirrored), 0.05)
+
+    def test_against_direct_fit(self):
+        rng = np.random.default_rng(1)
+        others = ACETIC_ACID + rng.normal(scale=0.2, size=(20, 8, 3))
+        others = np.stack([other @ _rotation(n) for n, other in enumerate(others)])
+        expected = [_fitted_rmsd(ACETIC_ACID, other) for other in others]
+        np.testing.assert_allclose(kabsch_rmsd(ACETIC_ACID, others), expected, atol=1e-9)
+        self.assertAlmostEqual(kabsch_rmsd(ACETIC_ACID, others[3]), expected[3], places=9)
+
+    def test_fit_deviations(self):
+        rng = np.random.default_rng(2)
+        others = ACETIC_ACID + rng.normal(scale=0.1, size=(5, 8, 3))
+        deviations = fit_deviations(ACETIC_ACID, others @ _rotation(3))
+        self.assertEqual(deviations.shape, (5, 8))
+        np.testing.assert_allclose(np.sqrt((deviations ** 2).mean(axis=1)),
+                                   kabsch_rmsd(ACETIC_ACID, others), atol=1e-9)
+
+    def test_rmsd_matrix(self):
+        rng = np.random.default_rng(4)
+        structures = ACETIC_ACID + rng.normal(scale=0.1, size=(4, 8, 3))
+        matrix = rmsd_matrix(structures)
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 0.0)
+        self.assertAlmostEqual(matrix[1, 3], kabsch_rmsd(structures[1], structures[3]))
+
+
+class TestMatchedOrder(unittest.TestCase):
+
+    def check(self, order, axes=False):
+        order = np.array(order)
+        for seed in range(10):
+            noise = np.random.default_rng(seed).normal(scale=0.05, size=(8, 3))
+            other = ((ACETIC_ACID + noise) @ _rotation(seed) + [2.0, 0.0, -1.0])[order]
+            found = matched_order(ACETIC_ACID, other, ELEMENTS, axes=axes)
+            np.testing.assert_array_equal(order[found], np.arange(8))
+
+    def test_swapped_hydrogens(self):
+        self.check([0, 2, 1, 3, 4, 5, 6, 7])
+        self.check([0, 1, 3, 2, 4, 5, 6, 7])
+
+    def test_no_swaps(self):
+        other = ACETIC_ACID @ _rotation(6)
+        np.testing.assert_array_equal(matched_order(ACETIC_ACID, other, np.arange(8)),
+                                      np.arange(8))
+
+    def test_axes(self):
+        # methyl hydrogens turned round and the oxygens swapped over, which
+        # the search from the order given does not get out of
+        self.check([0, 3, 1, 2, 4, 6, 5, 7], axes=True)
+        self.check([4, 7, 3, 2, 0, 6, 5, 1], axes=True)
+
+
+
+class TestDuplicates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        symbols = [atom[0] for atom in WATER_XE]
+        coords = np.array([atom[1:] for atom in WATER_XE])
+        self.write('a.xyz', symbols, coords)
+        # the xenons somewhere else
+        moved = coords.copy()
+        moved[3:] = [[-8.0, 0.0, 0.0], [0.0, 0.0, 8.0]]
+        self.write('b.xyz', symbols, moved)
+        # a listed in another order, rotated and moved
+        order = [4, 0, 2, 1, 3]
+        self.write('c.xyz', [symbols[k] for k in order], (coords @ _rotation(11) + 3.0)[order])
+        # a with a little noise
+        noise = np.random.default_rng(12).normal(scale=0.01, size=coords.shape)
+        self.write('d.xyz', symbols, coords + noise)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, symbols, coords):
+        with open(os.path.join(self.tmp.name, name), 'w') as f:
+            f.write(f'{len(symbols)}\n\n')
+            for symbol, xyz in zip(symbols, coords):
+                f.write(f'{symbol} {xyz[0]:.6f} {xyz[1]:.6f} {xyz[2]:.6f}\n')
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_find_duplicates(self):
+        duplicates = find_duplicates([self.path(f'{name}.xyz') for name in 'abcd'])
+        self.assertEqual(sorted(duplicates), [self.path('c.xyz'), self.path('d.xyz')])
+        for file, (kept, rmsd) in duplicates.items():
+            self.assertEqual(kept, self.path('a.xyz'))
+            self.assertLess(rmsd, 0.1)
+
+    def test_unknown_atoms_compared(self):
+        self.assertEqual(find_duplicates([self.path('a.xyz'), self.path('b.xyz')]), {})
+
+    def test_remove_duplicates(self):
+        with redirect_stdout(io.StringIO()):
+            remove_duplicates(self.tmp.name)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['a.xyz', 'b.xyz', 'duplicates'])
+        self.assertEqual(sorted(os.listdir(self.path('duplicates'))), ['c.xyz', 'd.xyz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
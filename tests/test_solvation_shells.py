@@ -0,0 +1,93 @@
+"""Cutting solvation shells out of the frames of a periodic box"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from autochem.core.xyz import read_xyz_arrays
+from autochem.scripts.solvation_shells import extract_shells
+
+BOX = 14.0
+WATER = np.array([[0.0, 0.0, 0.0], [0.96, 0.0, 0.0], [-0.24, 0.93, 0.0]])
+# the target; one water near the edge of the shell, crossing half a box
+# length from the target; one across the periodic boundary; one out of range
+CENTRES = np.array([[0.5, 0.5, 0.5], [7.2, 0.5, 0.5], [11.0, 0.5, 0.5], [8.0, 8.0, 8.0]])
+
+
+def _frame(shift):
+    coords = (CENTRES[:, None, :] + WATER + shift).reshape(-1, 3)
+    return coords % BOX
+
+
+def _bonds_intact(coords):
+    """Every water written in one piece, as in WATER"""
+    for rows in np.arange(len(coords)).reshape(-1, 3):
+        np.testing.assert_allclose(coords[rows] - coords[rows[0]], WATER, atol=1e-6)
+
+
+class TestExtractShells(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.xyz = os.path.join(self.tmp.name, 'md.xyz')
+        with open(self.xyz, 'w') as f:
+            for number, shift in enumerate(([0.0, 0.0, 0.0], [6.0, 13.0, 3.5])):
+                f.write(f'12\nframe {number}\n')
+                for symbol, xyz in zip('OHH' * 4, _frame(shift)):
+                    f.write(f'{symbol} {xyz[0]:.6f} {xyz[1]:.6f} {xyz[2]:.6f}\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shells(self):
+        written = extract_shells(self.xyz, 'water', radius=6.9, output=self.tmp.name,
+                                 cell=[BOX, BOX, BOX])
+        self.assertEqual([os.path.relpath(path, self.tmp.name) for path in written],
+                         [os.path.join('md', 'water', f'f{n}', f'md_water_f{n}.xyz')
+                          for n in range(2)])
+        clusters = [read_xyz_arrays(path) for path in written]
+        for symbols, coords in clusters:
+            # the three waters in range, each in one piece around the target
+            self.assertEqual(symbols, list('OHH' * 3))
+            _bonds_intact(coords)
+            np.testing.assert_allclose(coords[::3] - coords[0],
+                                       [[0.0, 0.0, 0.0], [6.7, 0.0, 0.0], [-3.5, 0.0, 0.0]],
+                                       atol=1e-6)
+        # the same cluster, wherever the box boundaries fall
+        np.testing.assert_allclose(clusters[1][1] - clusters[1][1][0],
+                                   clusters[0][1] - clusters[0][1][0], atol=1e-6)
+
+    def test_radius(self):
+        path, = extract_shells(self.xyz, 'water', radius=4.0, output=self.tmp.name,
+                               cell=[BOX, BOX, BOX], every=2)
+        symbols, coords = read_xyz_arrays(path)
+        self.assertEqual(len(symbols), 6)
+        _bonds_intact(coords)
+        np.testing.assert_allclose(coords[3] - coords[0], [-3.5, 0.0, 0.0], atol=1e-6)
+
+    def test_molecule_not_in_database(self):
+        # chlorine monofluoride, split across the periodic boundary, is in
+        # no fragment of molecules.txt but is still in range of the target
+        path = os.path.join(self.tmp.name, 'impure.xyz')
+        cl_f = np.array([[12.5, 5.0, 0.5], [14.13, 5.0, 0.5]]) % BOX
+        with open(path, 'w') as f:
+            f.write('14\nframe 0\n')
+            for symbol, xyz in zip(list('OHH' * 4) + ['Cl', 'F'],
+                                   np.concatenate([_frame([0.0, 0.0, 0.0]), cl_f])):
+                f.write(f'{symbol} {xyz[0]:.6f} {xyz[1]:.6f} {xyz[2]:.6f}\n')
+        path, = extract_shells(path, 'water', radius=4.0, output=self.tmp.name,
+                               cell=[BOX, BOX, BOX])
+        symbols, coords = read_xyz_arrays(path)
+        self.assertEqual(symbols, list('OHH' * 2) + ['Cl', 'F'])
+        _bonds_intact(coords[:6])
+        np.testing.assert_allclose(coords[7] - coords[6], [1.63, 0.0, 0.0], atol=1e-6)
+        np.testing.assert_allclose(coords[6] - coords[0], [-2.0, 4.5, 0.0], atol=1e-6)
+
+    def test_unknown_target(self):
+        with self.assertRaises(ValueError):
+            extract_shells(self.xyz, 'c1mim', output=self.tmp.name, cell=[BOX, BOX, BOX])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Frames of the cluster sharing the fragments of the first frame"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from autochem import Molecule
+from autochem.core.trajectory import Trajectory
+from autochem.core.xyz import read_xyz_arrays
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+CLUSTER = os.path.join(DATA, 'cluster.xyz')
+SHIFT = np.array([1.0, -2.0, 2.0])
+
+
+def _fragments(mol):
+    return {key: (frag['name'], [atom.index for atom in frag['atoms']])
+            for key, frag in mol.fragments.items()}
+
+
+class TestTrajectory(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.symbols, coords = read_xyz_arrays(CLUSTER)
+        cls.first = Molecule(using=CLUSTER)
+        # frame 1: moved rigidly; frame 2: a hydrogen of the first water
+        # pulled off; frame 3: fragment 1 moved onto fragment 2
+        broken = coords.copy()
+        broken[1] += [3.0, 0.0, 0.0]
+        rows = [atom.index - 1 for atom in cls.first.fragments[1]['atoms']]
+        other = [atom.index - 1 for atom in cls.first.fragments[2]['atoms']]
+        touching = coords.copy()
+        touching[rows] += coords[other].mean(axis=0) - coords[rows].mean(axis=0)
+        cls.coords = np.stack([coords, coords + SHIFT, broken, touching])
+        cls.traj = Trajectory(symbols=cls.symbols, coords=cls.coords)
+
+    def test_topology_holds(self):
+        np.testing.assert_array_equal(self.traj.topology_holds(), [True, True, False, True])
+        np.testing.assert_array_equal(self.traj.topology_holds(contacts=True),
+                                      [True, True, False, False])
+        np.testing.assert_array_equal(self.traj.topology_holds([1, 2]), [True, False])
+
+    def test_shared_fragments(self):
+        mol = self.traj[1]
+        self.assertEqual(_fragments(mol), _fragments(self.first))
+        # the fragments hold this frame's atoms, not those of the first frame
+        frag = mol.fragments[mol.fragment_keys[0]]
+        self.assertTrue(any(atom is mol.coords[0] for atom in frag['atoms']))
+        np.testing.assert_allclose(mol.coord_array, self.coords[1])
+
+    def test_h_bonds(self):
+        expected = self.first.find_h_bonds()
+        found = self.traj.h_bonds()[1]
+        self.assertEqual([row[:4] for row in found], [row[:4] for row in expected])
+        np.testing.assert_allclose([row[4:] for row in found], [row[4:] for row in expected],
+                                   atol=1e-9)
+
+    def test_own_fragments(self):
+        # a broken bond means the frame is separated again
+        mol = self.traj[2]
+        self.assertNotEqual(_fragments(mol), _fragments(self.first))
+        fresh = Molecule(atoms=[(symbol, *xyz) for symbol, xyz in
+                                zip(self.symbols, self.coords[2].tolist())])
+        self.assertEqual(_fragments(mol), _fragments(fresh))
+
+    def test_centroids(self):
+        displacements = self.traj.centroid_displacements()
+        self.assertEqual(displacements.shape, (4, len(self.first.fragments)))
+        np.testing.assert_allclose(displacements[1], np.linalg.norm(SHIFT))
+        distances = self.traj.centroid_distances()
+        np.testing.assert_allclose(distances[1], distances[0], atol=1e-9)
+        keys = list(self.first.fragments)
+        self.assertAlmostEqual(distances[3, keys.index(1), keys.index(2)], 0.0)
+
+    def test_read_xyz(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'md.xyz')
+            with open(path, 'w') as f:
+                for frame, coords in enumerate(self.coords[:2]):
+                    f.write(f'{len(self.symbols)}\nframe {frame}\n')
+                    for symbol, xyz in zip(self.symbols, coords):
+                        f.write(f'{symbol} {xyz[0]:.6f} {xyz[1]:.6f} {xyz[2]:.6f}\n')
+            traj = Trajectory(using=path)
+            self.assertEqual(len(traj), 2)
+            self.assertEqual(traj.comments, ['frame 0', 'frame 1'])
+            self.assertEqual(_fragments(traj[-1]), _fragments(self.first))
+            with open(path, 'a') as f:
+                f.write('1\nframe 2\nXe 0.0 0.0 0.0\n')
+            with self.assertRaises(ValueError):
+                Trajectory(using=path)
+
+
+if __name__ == '__main__':
+    unittest.main()
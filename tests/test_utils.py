@@ -0,0 +1,133 @@
+"""Finding which package wrote a log, and the last lines of a log, without reading all of it"""
+import os
+import tempfile
+import unittest
+
+from autochem.core.cache import ResultsCache
+from autochem.core.utils import eof, find_last, get_log_type, reverse_lines, sniff_log_type
+from autochem.interfaces import GamessResults, GaussianResults, OrcaResults, PsiResults
+from autochem.scripts.grep_results import file_as_results_class
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def _data(name):
+    return os.path.join(DATA, name)
+
+
+class TestLogType(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, name='job.out'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_logs(self):
+        for name, log_type in (('gamess.log', 'gamess'), ('gaussian.log', 'gaussian'),
+                               ('orca.out', 'orca'), ('psi.out', 'psi')):
+            self.assertEqual(sniff_log_type(_data(name)), log_type)
+        self.assertEqual(get_log_type(_data('psi.out')), 'psi4')
+
+    def test_classes(self):
+        for name, cls in (('gamess.log', GamessResults), ('gaussian.log', GaussianResults),
+                          ('orca.out', OrcaResults), ('psi.out', PsiResults)):
+            self.assertIsInstance(file_as_results_class(_data(name)), cls)
+            self.assertIsInstance(file_as_results_class(_data(name), sniff_log_type(_data(name))),
+                                  cls)
+
+    def test_not_a_log(self):
+        self.assertIsNone(sniff_log_type(self.write('step 1\n' * 1000)))
+        self.assertIsNone(sniff_log_type(self.write('')))
+
+    def test_head_and_tail(self):
+        filler = 'x' * 99 + '\n'
+        # banner in the last block only
+        path = self.write(filler * 50 + ' Entering Gaussian System\n')
+        self.assertEqual(sniff_log_type(path, size=1000), 'gaussian')
+        # banner in the middle of a long file is not looked for
+        path = self.write(filler * 50 + ' Entering Gaussian System\n' + filler * 50)
+        self.assertIsNone(sniff_log_type(path, size=1000))
+        self.assertEqual(sniff_log_type(path), 'gaussian')
+
+    def test_several_banners(self):
+        # a line naming more than one package goes to the first in order of preference
+        path = self.write('header\n Gaussian basis sets, as used by GAMESS\n')
+        self.assertEqual(sniff_log_type(path), 'gamess')
+
+    def test_cached(self):
+        path = self.write(' Entering Gaussian System\n', name='job.log')
+        db = os.path.join(self.tmp.name, 'results.sqlite')
+        with ResultsCache(db) as cache:
+            self.assertEqual(cache.log_type(path), 'gaussian')
+        with ResultsCache(db) as cache:
+            # read from the cache, without looking at the log again
+            self.assertEqual(cache.get(path, 'type', lambda: self.fail('log read again')),
+                             'gaussian')
+            self.assertEqual(cache.calculations([path, _data('cluster.xyz')]), [path])
+
+
+class TestReverseLines(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, name='job.out'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_order(self):
+        text = 'one\ntwo\n\nthree\n'
+        path = self.write(text)
+        found = list(reverse_lines(path))
+        self.assertEqual([line for _, line in found], ['three\n', '\n', 'two\n', 'one\n'])
+        for offset, line in found:
+            self.assertEqual(text[offset:offset + len(line)], line)
+        # the last line, without a newline, is still found
+        path = self.write('one\ntwo')
+        self.assertEqual([line for _, line in reverse_lines(path)], ['two', 'one\n'])
+        self.assertEqual(list(reverse_lines(self.write(''))), [])
+
+    def test_text(self):
+        lines = [f'step {n}\n' if n % 3 else f'ENERGY = {n}\n' for n in range(10000)]
+        path = self.write(''.join(lines))
+        found = list(reverse_lines(path, 'ENERGY ='))
+        self.assertEqual([line for _, line in found], [line for line in reversed(lines)
+                                                       if line.startswith('ENERGY')])
+        # matches the lines read forwards, far from the end of the file
+        offset, line = found[-1]
+        self.assertEqual((offset, line), (0, 'ENERGY = 0\n'))
+        self.assertEqual(list(reverse_lines(path, 'missing')), [])
+
+    def test_find_last(self):
+        path = self.write('a = 1\nb = 2\na = 3\nc = 4\n')
+        self.assertEqual(find_last(path, 'a ='), (12, 'a = 3\n'))
+        # the whole line, wherever in it the text falls
+        self.assertEqual(find_last(path, '= 2'), (6, 'b = 2\n'))
+        self.assertIsNone(find_last(path, 'd ='))
+        self.assertIsNone(find_last(self.write(''), 'a ='))
+
+    def test_log(self):
+        path = _data('gaussian.log')
+        with open(path, 'rb') as f:
+            data = f.read()
+        offset, line = find_last(path, 'SCF Done:')
+        self.assertEqual(offset, data.rfind(b'\n', 0, data.rfind(b'SCF Done:')) + 1)
+        self.assertIn('-76.4000', line)
+        # the same lines as found by reading the file forwards
+        self.assertEqual([line for _, line in reverse_lines(path)], eof(path, 1.0)[::-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Reading single and multi-frame xyz files"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from autochem.core.xyz import iter_xyz_frames, read_xyz_arrays
+
+WATER = """\
+3
+frame {n}
+O    0.000000    0.000000    {z:.6f}
+H    0.960000    0.000000    {z:.6f}
+H   -0.240000    0.930000    {z:.6f}
+"""
+
+
+class TestXYZ(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, name='test.xyz'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_frames(self):
+        path = self.write(''.join(WATER.format(n=n, z=0.5 * n) for n in range(4)))
+        for use_mmap in (False, True):
+            frames = list(iter_xyz_frames(path, use_mmap=use_mmap))
+            self.assertEqual(len(frames), 4)
+            for n, frame in enumerate(frames):
+                self.assertEqual(frame.symbols, ['O', 'H', 'H'])
+                self.assertEqual(frame.comment, f'frame {n}')
+                self.assertEqual(frame.coords.shape, (3, 3))
+                np.testing.assert_allclose(frame.coords[:, 2], 0.5 * n)
+            np.testing.assert_allclose(frames[0].coords[2], [-0.24, 0.93, 0.0])
+
+    def test_blank_lines_and_extra_columns(self):
+        text = ('2\n\nO 0 0 0 8 -0.8\nH 1 0 0 1 0.4\n\n'
+                '2\r\nsecond\r\nO 0 0 1\r\nH 1 0 1\r\n')
+        frames = list(iter_xyz_frames(self.write(text)))
+        self.assertEqual([frame.comment for frame in frames], ['', 'second'])
+        np.testing.assert_allclose(frames[0].coords, [[0, 0, 0], [1, 0, 0]])
+        np.testing.assert_allclose(frames[1].coords, [[0, 0, 1], [1, 0, 1]])
+
+    def test_empty_file(self):
+        path = self.write('')
+        self.assertEqual(list(iter_xyz_frames(path)), [])
+        self.assertEqual(list(iter_xyz_frames(path, use_mmap=True)), [])
+
+    def test_incomplete_frame(self):
+        path = self.write(WATER.format(n=0, z=0) + '3\ncut short\nO 0 0 0\n')
+        with self.assertRaises(ValueError):
+            list(iter_xyz_frames(path))
+
+    def test_bad_header(self):
+        with self.assertRaises(ValueError):
+            list(iter_xyz_frames(self.write('water\n\nO 0 0 0\n')))
+
+    def test_unknown_atom(self):
+        with self.assertRaises(ValueError):
+            list(iter_xyz_frames(self.write('2\n\nO 0 0 0\nQq 1 0 0\n')))
+
+    def test_read_xyz_arrays(self):
+        path = self.write(WATER.format(n=0, z=1.5) + '\n')
+        symbols, coords = read_xyz_arrays(path)
+        self.assertEqual(symbols, ['O', 'H', 'H'])
+        np.testing.assert_allclose(coords, [[0, 0, 1.5], [0.96, 0, 1.5], [-0.24, 0.93, 1.5]])
+
+
+if __name__ == '__main__':
+    unittest.main()